@@ -0,0 +1,95 @@
+# Benchmark: job list update cost as the number of rows grows
+# Run from the repository root: python benchmarks/bench_job_list.py [frames]
+#
+# For each list size, a playlist is loaded into the job list, a number of
+# rows are given jobs, and every frame each of those jobs reports progress
+# several times (as DownloadThread does). The frame time is the cost of
+# the updates plus the repaint of the view, measured with the model's
+# per-frame batching and with a dataChanged per update (no batching).
+
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+from PySide6.QtWidgets import QApplication, QTableView, QHeaderView  # noqa: E402
+from app.job_list import JobListModel, ProgressDelegate, COL_TITLE, COL_PROGRESS  # noqa: E402
+
+ROW_COUNTS = (100, 1000, 5000, 10000, 20000)
+ACTIVE_JOBS = 8
+UPDATES_PER_FRAME = 10  # progress reports per active job between two frames
+FRAME_BUDGET_MS = 1000 / 60
+
+
+def make_entries(count):
+    return [{'id': f'v{i:06d}', 'title': f'Video {i} - some reasonably long playlist entry title',
+             'url': f'https://www.youtube.com/watch?v=v{i:06d}', 'duration': 60 + i % 3600}
+            for i in range(count)]
+
+
+def make_view(model):
+    view = QTableView()
+    view.setModel(model)
+    view.setItemDelegateForColumn(COL_PROGRESS, ProgressDelegate(view))
+    view.verticalHeader().setVisible(False)
+    view.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
+    view.verticalHeader().setDefaultSectionSize(24)
+    view.horizontalHeader().setSectionResizeMode(COL_TITLE, QHeaderView.Stretch)
+    view.resize(900, 600)
+    view.show()
+    return view
+
+
+def run_frames(app, model, view, job_ids, frames, batched):
+    rng = random.Random(2026)
+    progress = {job_id: 0.0 for job_id in job_ids}
+    start = time.perf_counter()
+    for _ in range(frames):
+        for _ in range(UPDATES_PER_FRAME):
+            for job_id in job_ids:
+                progress[job_id] = min(100.0, progress[job_id] + rng.random() * 0.05)
+                model.set_progress(job_id, progress[job_id])
+                if not batched:
+                    model.flush()
+        model.flush()
+        # Deliver the resulting paint events, as the event loop does at the next frame
+        app.processEvents()
+    return (time.perf_counter() - start) * 1000 / frames
+
+
+def main():
+    frames = int(sys.argv[1]) if len(sys.argv) > 1 else 120
+    app = QApplication.instance() or QApplication(sys.argv)
+    print(f"{ACTIVE_JOBS} active jobs, {UPDATES_PER_FRAME} progress reports per job per frame, "
+          f"{frames} frames (budget {FRAME_BUDGET_MS:.1f} ms)\n")
+    print(f"{'rows':>7} {'load':>10} {'batched':>12} {'unbatched':>12}")
+    for count in ROW_COUNTS:
+        model = JobListModel(lambda key, default=None: default or key)
+        view = make_view(model)
+        start = time.perf_counter()
+        model.set_entries(make_entries(count))
+        app.processEvents()
+        load_ms = (time.perf_counter() - start) * 1000
+
+        # Spread the active jobs over the list, with one of them on screen
+        rows = [0] + random.Random(count).sample(range(1, count), ACTIVE_JOBS - 1)
+        job_ids = []
+        for position in rows:
+            job_id = f'job{position}'
+            model.attach_job(position, job_id, 'running')
+            job_ids.append(job_id)
+        model.flush()
+
+        batched = run_frames(app, model, view, job_ids, frames, batched=True)
+        unbatched = run_frames(app, model, view, job_ids, frames, batched=False)
+        print(f"{count:>7} {load_ms:>8.1f}ms {batched:>9.2f}ms/f {unbatched:>9.2f}ms/f")
+        view.close()
+        view.deleteLater()
+        app.processEvents()
+
+
+if __name__ == '__main__':
+    main()
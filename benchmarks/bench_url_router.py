@@ -0,0 +1,108 @@
+# Benchmark: URL classification and extractor dispatch
+# Run from the repository root: python benchmarks/bench_url_router.py [count]
+
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+import yt_dlp  # noqa: E402
+from app.url_router import route_url  # noqa: E402
+
+SAMPLE_URLS = [
+    'https://www.youtube.com/watch?v={yt}',
+    'https://youtu.be/{yt}',
+    'https://www.youtube.com/shorts/{yt}',
+    'https://www.youtube.com/watch?v={yt}&list=PL590L5WQmH8fJ54F369BLDSqIwcs-TCfs',
+    'https://www.bilibili.com/video/BV1{bv}',
+    'https://www.bilibili.com/video/av{av}?p=2',
+    'https://b23.tv/BV1{bv}',
+    'https://space.bilibili.com/{av}',
+    'https://vimeo.com/{av}',
+]
+ID_CHARS = 'abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789_-'
+
+
+def make_urls(count):
+    rng = random.Random(2026)
+    urls = []
+    for _ in range(count):
+        template = rng.choice(SAMPLE_URLS)
+        urls.append(template.format(
+            yt=''.join(rng.choice(ID_CHARS) for _ in range(11)),
+            bv=''.join(rng.choice(ID_CHARS[:62]) for _ in range(9)),
+            av=rng.randint(1, 10 ** 9),
+        ))
+    return urls
+
+
+def legacy_classify(url):
+    """The per-call classification the app used before the router"""
+    import re
+    youtube = 'youtube.com' in url or 'youtu.be' in url
+    video_id = None
+    for pattern in [r'(?:youtube\.com/watch\?v=|youtu\.be/|youtube\.com/embed/)([a-zA-Z0-9_-]{11})',
+                    r'youtube\.com/shorts/([a-zA-Z0-9_-]{11})']:
+        match = re.search(pattern, url)
+        if match:
+            video_id = match.group(1)
+            break
+    url_lower = url.lower()
+    bilibili = any(d in url_lower for d in ('bilibili.com', 'b23.tv', 'biligame.com',
+                                             'biligame.net', 'bilibili.tv'))
+    if not bilibili:
+        bilibili = bool(re.search(r'BV[a-zA-Z0-9]{10}', url_lower, re.IGNORECASE)
+                        or re.search(r'av\d+', url_lower, re.IGNORECASE))
+    return youtube, bilibili, video_id
+
+
+def timed(label, func, urls):
+    start = time.perf_counter()
+    for url in urls:
+        func(url)
+    elapsed = time.perf_counter() - start
+    print(f"{label:<40} {elapsed * 1000:9.1f} ms  {elapsed / len(urls) * 1e6:8.2f} us/url")
+    return elapsed
+
+
+def scan_extractors(ies, url):
+    """What extract_info() does without ie_key: try every extractor in order"""
+    for ie in ies.values():
+        if ie.suitable(url):
+            return ie
+    return None
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    urls = make_urls(count)
+    print(f"{count} URLs\n")
+
+    print("Classification")
+    timed("legacy (re-import + recompile per call)", legacy_classify, urls)
+    # Exclude the one-time loading of yt-dlp's extractor table
+    for template in SAMPLE_URLS:
+        route_url(template.format(yt='dQw4w9WgXcQ', bv='xx411c7mD', av=1))
+    route_url.cache_clear()
+    timed("router, cold cache", route_url, urls)
+    timed("router, warm cache", route_url, urls)
+
+    # Extractor dispatch only - no network. Sampled, since a full scan is slow.
+    sample = urls[:min(count, 2000)]
+    with yt_dlp.YoutubeDL({'quiet': True}) as ydl:
+        ies = ydl._ies
+        print(f"\nExtractor dispatch ({len(ies)} extractors, {len(sample)} URLs)")
+        timed("scan all extractors (no ie_key)", lambda url: scan_extractors(ies, url), sample)
+
+        def routed(url):
+            route = route_url(url)
+            if route.ie_key:
+                return ies[route.ie_key].suitable(route.url)
+            return scan_extractors(ies, route.url)
+        timed("routed ie_key lookup", routed, sample)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,162 @@
+# Audio-only downloads for Fast-Horse-2026
+# Keeps the original audio stream where possible, and pipes into ffmpeg when MP3 is required
+
+import os
+import subprocess
+from yt_dlp.networking import Request
+from yt_dlp.postprocessor.ffmpeg import FFmpegPostProcessor
+from yt_dlp.utils import DownloadCancelled
+
+# Format specs of the audio entries in the format combo box
+AUDIO_MP3_SPEC = 'bestaudio/best'
+AUDIO_ORIGINAL_SPEC = 'bestaudio[ext=m4a]/bestaudio[acodec=opus]/bestaudio/best'
+AUDIO_SPECS = (AUDIO_MP3_SPEC, AUDIO_ORIGINAL_SPEC)
+
+# LAME VBR quality 0 averages about 245 kbps - pick the source stream closest to it
+MP3_QUALITY = '0'
+MP3_TARGET_ABR = 256
+
+# Bytes read from the network per write into ffmpeg
+PIPE_CHUNK_SIZE = 64 * 1024
+
+
+def is_audio_spec(format_spec):
+    return format_spec in AUDIO_SPECS
+
+
+def audio_options(format_spec):
+    """yt-dlp options (besides 'format') for an audio-only format spec"""
+    if format_spec == AUDIO_ORIGINAL_SPEC:
+        # 'best' stream-copies: m4a stays m4a, opus in webm becomes .opus
+        return {
+            'postprocessors': [{
+                'key': 'FFmpegExtractAudio',
+                'preferredcodec': 'best',
+            }],
+        }
+    return {
+        'format_sort': [f'abr~{MP3_TARGET_ABR}'],
+        'extract_audio': True,
+        'audio_format': 'mp3',
+        'audio_quality': MP3_QUALITY,
+        'postprocessors': [{
+            'key': 'FFmpegExtractAudio',
+            'preferredcodec': 'mp3',
+            'preferredquality': MP3_QUALITY,
+        }],
+    }
+
+
+def can_pipe(ydl, info):
+    """True if the selected format is a single plain HTTP stream ffmpeg can read from a pipe"""
+    if info.get('_type', 'video') != 'video' or info.get('requested_formats'):
+        return False
+    if info.get('protocol') not in ('http', 'https') or not info.get('url'):
+        return False
+    return FFmpegPostProcessor(ydl).available
+
+
+def pipe_to_mp3(ydl, info, progress_callback=None, should_stop=None, part_files=None):
+    """Stream the selected audio format straight into ffmpeg's MP3 encoder
+
+    No intermediate audio file is written. The download goes through the
+    YoutubeDL's own networking (proxy, cookies, headers); formats that
+    require chunked requests are read range by range. Returns the MP3 path.
+    """
+    filename = os.path.splitext(ydl.prepare_filename(info))[0] + '.mp3'
+    if os.path.exists(filename):
+        return filename
+    os.makedirs(os.path.dirname(os.path.abspath(filename)), exist_ok=True)
+    part_file = filename + '.part'
+    if part_files is not None:
+        part_files.add(part_file)
+
+    ffmpeg = subprocess.Popen(
+        [FFmpegPostProcessor(ydl).executable, '-hide_banner', '-loglevel', 'error', '-y',
+         '-i', 'pipe:0', '-vn', '-c:a', 'libmp3lame', '-q:a', MP3_QUALITY, '-f', 'mp3', part_file],
+        stdin=subprocess.PIPE, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE,
+    )
+    # Ranged reads need the exact size - an estimate would stop early or run past the end
+    total_size = info.get('filesize') or 0
+    chunk_size = (info.get('downloader_options') or {}).get('http_chunk_size') if total_size else None
+    progress_total = total_size or info.get('filesize_approx') or 0
+    headers = info.get('http_headers') or {}
+    downloaded = 0
+    try:
+        while True:
+            request_headers = dict(headers)
+            if chunk_size:
+                end = min(downloaded + chunk_size, total_size) - 1
+                request_headers['Range'] = f'bytes={downloaded}-{end}'
+            received = 0
+            with ydl.urlopen(Request(info['url'], headers=request_headers)) as response:
+                if chunk_size:
+                    # "bytes 0-1048575/4567890": the server's total wins over the format's
+                    length = (response.headers.get('Content-Range') or '').rpartition('/')[2]
+                    if length.isdigit():
+                        total_size = progress_total = int(length)
+                while True:
+                    if should_stop and should_stop():
+                        raise DownloadCancelled('Download interrupted by user')
+                    chunk = response.read(PIPE_CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    ffmpeg.stdin.write(chunk)
+                    received += len(chunk)
+                    downloaded += len(chunk)
+                    if progress_callback and progress_total:
+                        progress_callback(min(downloaded / progress_total * 100, 100.0))
+            if not chunk_size or downloaded >= total_size:
+                break
+            if not received:
+                raise Exception(f"Empty response for audio range starting at byte {downloaded}")
+        _, stderr = ffmpeg.communicate()
+    except BrokenPipeError:
+        _, stderr = ffmpeg.communicate()
+        raise Exception(f"ffmpeg stopped while encoding MP3: {stderr.decode(errors='replace').strip()}")
+    except BaseException:
+        ffmpeg.kill()
+        ffmpeg.wait()
+        raise
+    if ffmpeg.returncode != 0:
+        raise Exception(f"ffmpeg failed to encode MP3: {stderr.decode(errors='replace').strip()}")
+    os.replace(part_file, filename)
+    return filename
+
+
+def encode_mp3_file(path, ydl=None, should_stop=None):
+    """Encode an already downloaded audio file to MP3 next to it
+
+    For downloads that did not go through yt-dlp (the Invidious fallback).
+    The source file is removed once the MP3 is in place. Returns the MP3 path.
+    """
+    ffmpeg_pp = FFmpegPostProcessor(ydl)
+    if not ffmpeg_pp.available:
+        raise Exception("ffmpeg is required to convert the audio to MP3")
+    filename = os.path.splitext(path)[0] + '.mp3'
+    part_file = filename + '.part'
+    ffmpeg = subprocess.Popen(
+        [ffmpeg_pp.executable, '-hide_banner', '-loglevel', 'error', '-y',
+         '-i', path, '-vn', '-c:a', 'libmp3lame', '-q:a', MP3_QUALITY, '-f', 'mp3', part_file],
+        stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE,
+    )
+    try:
+        while True:
+            try:
+                _, stderr = ffmpeg.communicate(timeout=0.5)
+                break
+            except subprocess.TimeoutExpired:
+                if should_stop and should_stop():
+                    raise DownloadCancelled('Download interrupted by user')
+    except BaseException:
+        ffmpeg.kill()
+        ffmpeg.wait()
+        if os.path.exists(part_file):
+            os.remove(part_file)
+        raise
+    if ffmpeg.returncode != 0:
+        raise Exception(f"ffmpeg failed to encode MP3: {stderr.decode(errors='replace').strip()}")
+    os.replace(part_file, filename)
+    if os.path.abspath(path) != os.path.abspath(filename):
+        os.remove(path)
+    return filename
@@ -0,0 +1,227 @@
+# Incremental channel/playlist sync for Fast-Horse-2026
+# Enumerates each source newest-first and stops at the first known entry
+
+import re
+import sqlite3
+import threading
+import time
+from PySide6.QtCore import QThread, Signal
+from .paths import get_data_path
+from .config import get_config
+from .ydl_pool import get_ydl_pool
+from .url_router import extract_routed
+from .download_archive import get_download_archive, entry_archive_id
+
+# Safety limit for a source's first sync (no last-seen entry yet)
+FIRST_SYNC_LIMIT = 500
+
+
+class SyncStateStore:
+    """Last-seen entry and upload date for each sync source"""
+
+    def __init__(self, path=None):
+        self.path = path or get_data_path('sync.db')
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS sync_sources ('
+            ' source_url TEXT PRIMARY KEY,'
+            ' last_entry_id TEXT,'
+            ' last_upload_date TEXT,'
+            ' last_synced_at REAL'
+            ')'
+        )
+        self._conn.commit()
+
+    def get(self, source_url):
+        """Return (last_entry_id, last_upload_date) for a source"""
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT last_entry_id, last_upload_date FROM sync_sources WHERE source_url = ?',
+                (source_url,)
+            ).fetchone()
+        return row if row else (None, None)
+
+    def update(self, source_url, last_entry_id, last_upload_date):
+        with self._lock:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO sync_sources VALUES (?, ?, ?, ?)',
+                (source_url, last_entry_id, last_upload_date, time.time())
+            )
+            self._conn.commit()
+
+
+_sync_state = None
+_sync_state_lock = threading.Lock()
+
+
+def get_sync_state():
+    """Return the shared SyncStateStore"""
+    global _sync_state
+    with _sync_state_lock:
+        if _sync_state is None:
+            _sync_state = SyncStateStore()
+        return _sync_state
+
+
+class SyncBatch:
+    """New entries of one source from one sync pass, newest first
+
+    The source's cursor only moves past an entry once that entry and every
+    older new entry have downloaded, so a failed or cancelled download is
+    offered again by the next sync (the archive skips the finished ones).
+    """
+
+    def __init__(self, source_url, entries, newest_id, last_upload_date):
+        self.source_url = source_url
+        self.newest_id = newest_id
+        self.last_upload_date = last_upload_date
+        entries = [(entry_url(entry), entry) for entry in entries]
+        entries = [(url, entry) for url, entry in entries if url]
+        self.urls = [url for url, _ in entries]
+        self._ids = [entry.get('id') for _, entry in entries]
+        self._upload_dates = [entry.get('upload_date') for _, entry in entries]
+        self._done = [False] * len(entries)
+
+    def mark_done(self, index):
+        """Record that urls[index] downloaded; advance the cursor if possible"""
+        self._done[index] = True
+        oldest_pending = max((i for i, done in enumerate(self._done) if not done), default=-1)
+        cursor = oldest_pending + 1
+        if cursor >= len(self._done):
+            return
+        # All new entries done: the newest entry seen (possibly an archived one) is the cursor
+        entry_id = self.newest_id if cursor == 0 else self._ids[cursor]
+        upload_dates = [date for date in self._upload_dates[cursor:] if date]
+        if self.last_upload_date:
+            upload_dates.append(self.last_upload_date)
+        get_sync_state().update(self.source_url, entry_id, max(upload_dates, default=None))
+
+
+def entry_url(entry):
+    """Best URL to download a flat playlist entry"""
+    url = entry.get('url') or entry.get('webpage_url')
+    if url and not url.startswith(('http://', 'https://')) and entry.get('ie_key') == 'Youtube':
+        url = f"https://www.youtube.com/watch?v={entry['id']}"
+    return url
+
+
+# A bare YouTube channel page lists its tabs (Videos, Shorts, Live) as sub-playlists
+_YT_CHANNEL_PAGE = re.compile(
+    r'^((?:https?://)?(?:www\.|m\.)?youtube\.com/(?:@[^/?#]+|channel/[^/?#]+|c/[^/?#]+|user/[^/?#]+))'
+    r'(?:/featured)?/?(?:[?#].*)?$')
+
+
+def sync_source_url(source_url):
+    """URL to enumerate for a sync source: a YouTube channel page becomes its Videos tab"""
+    match = _YT_CHANNEL_PAGE.match(source_url.strip())
+    return f"{match.group(1)}/videos" if match else source_url
+
+
+def _is_list_entry(entry):
+    """A nested playlist (e.g. a channel tab) rather than a video"""
+    return entry.get('_type') == 'playlist' or entry.get('ie_key') == 'YoutubeTab'
+
+
+def find_new_entries(ydl, source_url, last_entry_id, last_upload_date, archive=None):
+    """Enumerate a source lazily and return (new entries, newest entry ID)
+
+    Stops at the last-seen entry or at an entry older than the last seen
+    upload date, so the cost is proportional to the number of entries since
+    the last completed sync, not the size of the channel. Entries already in
+    the download archive are skipped.
+    """
+    info = extract_routed(ydl, sync_source_url(source_url), download=False, process=False)
+    # Channel pages may redirect to their videos tab first
+    for _ in range(3):
+        if not info or info.get('_type') not in ('url', 'url_transparent'):
+            break
+        info = ydl.extract_info(info['url'], download=False, process=False,
+                                ie_key=info.get('ie_key'))
+    if not info:
+        return [], None
+
+    entries = info.get('entries')
+    if entries is None:
+        # A single video rather than a list
+        entries = [info]
+
+    new_entries = []
+    newest_id = None
+    for entry in entries:
+        if not entry or _is_list_entry(entry):
+            # Never queue a whole tab or use its ID as the cursor
+            continue
+        if newest_id is None:
+            newest_id = entry.get('id')
+        if last_entry_id and entry.get('id') == last_entry_id:
+            break
+        upload_date = entry.get('upload_date')
+        if last_upload_date and upload_date and upload_date < last_upload_date:
+            break
+        if archive is not None and entry_archive_id(entry) in archive:
+            # Already downloaded (by hand, or a later entry of an unfinished sync)
+            continue
+        new_entries.append(entry)
+        if not last_entry_id and len(new_entries) >= FIRST_SYNC_LIMIT:
+            break
+    return new_entries, newest_id
+
+
+class SyncThread(QThread):
+    """Syncs a list of channel/playlist sources and reports new entries"""
+
+    # SyncBatch of a source with new entries; the receiver marks them done
+    source_synced = Signal(object)
+    status = Signal(str)
+    # Total number of new entries across all sources
+    finished = Signal(int)
+    error = Signal(str)
+
+    def __init__(self, sources, config=None):
+        super().__init__()
+        self.sources = sources
+        self.config = config or get_config()
+
+    def run(self):
+        try:
+            store = get_sync_state()
+            archive = get_download_archive()
+        except Exception as e:
+            self.error.emit(f"Sync state unavailable: {e}")
+            return
+
+        ydl_opts = {
+            'quiet': True,
+            'no_warnings': True,
+            'socket_timeout': 20,
+            'extract_flat': 'in_playlist',
+            'lazy_playlist': True,
+        }
+        if self.config.proxy_url:
+            ydl_opts['proxy'] = self.config.proxy_url
+
+        total = 0
+        with get_ydl_pool().checkout(ydl_opts) as ydl:
+            for source_url in self.sources:
+                self.status.emit(f"Syncing {source_url}...")
+                last_entry_id, last_upload_date = store.get(source_url)
+                try:
+                    entries, newest_id = find_new_entries(ydl, source_url, last_entry_id,
+                                                          last_upload_date, archive)
+                except Exception as e:
+                    print(f"DEBUG: SyncThread - {source_url} failed: {str(e)[:200]}", flush=True)
+                    self.status.emit(f"Sync failed for {source_url}")
+                    continue
+
+                print(f"DEBUG: SyncThread - {source_url}: {len(entries)} new", flush=True)
+                batch = SyncBatch(source_url, entries, newest_id, last_upload_date)
+                if batch.urls:
+                    # The cursor advances as the downloads finish
+                    self.source_synced.emit(batch)
+                elif newest_id:
+                    # Nothing new to download - everything up to the newest entry is done
+                    store.update(source_url, newest_id, last_upload_date)
+                total += len(batch.urls)
+
+        self.finished.emit(total)
@@ -0,0 +1,88 @@
+# Clip (time range) downloads for Fast-Horse-2026
+# Only the part of a video between start and end is fetched
+
+import os
+from yt_dlp.utils import download_range_func
+
+
+def parse_timestamp(text):
+    """Parse '90', '1:30', '1:02:03' or '75.5' into seconds"""
+    text = (text or '').strip()
+    if not text:
+        raise ValueError("empty time")
+    seconds = 0.0
+    for part in text.split(':'):
+        try:
+            value = float(part)
+        except ValueError:
+            raise ValueError(f"not a time: {text}") from None
+        if value < 0:
+            raise ValueError(f"negative time: {text}")
+        seconds = seconds * 60 + value
+    return seconds
+
+
+def parse_clip(start_text, end_text):
+    """Parse start/end fields into a (start, end) tuple in seconds
+
+    An empty end means 'until the end of the video' (None).
+    """
+    start = parse_timestamp(start_text) if (start_text or '').strip() else 0.0
+    end = parse_timestamp(end_text) if (end_text or '').strip() else None
+    if end is not None and end <= start:
+        raise ValueError("clip end must be after clip start")
+    return start, end
+
+
+def format_timestamp(seconds):
+    seconds = int(seconds)
+    hours, rest = divmod(seconds, 3600)
+    minutes, secs = divmod(rest, 60)
+    return f"{hours}:{minutes:02d}:{secs:02d}" if hours else f"{minutes}:{secs:02d}"
+
+
+def clip_label(clip):
+    """Short file-name-safe label such as '1.30-2.45' or '1.30-end'"""
+    start, end = clip
+    label = f"{format_timestamp(start)}-{format_timestamp(end) if end is not None else 'end'}"
+    return label.replace(':', '.')
+
+
+def clip_options(clip):
+    """yt-dlp options to download only the clip's range
+
+    yt-dlp hands sections to ffmpeg, which seeks with HTTP Range requests in
+    progressive files and only fetches the needed segments of HLS/DASH.
+    Without force_keyframes_at_cuts the cut is a stream copy that starts at
+    the keyframe before the requested start - no re-encode.
+    """
+    start, end = clip
+    return {
+        'download_ranges': download_range_func(None, [(start, end if end is not None else float('inf'))]),
+        'force_keyframes_at_cuts': False,
+    }
+
+
+def full_size_estimate(info):
+    """Bytes a full download of the selected format(s) would have fetched"""
+    formats = info.get('requested_formats') or [info]
+    total = 0
+    for fmt in formats:
+        size = fmt.get('filesize') or fmt.get('filesize_approx')
+        if not size and fmt.get('tbr') and info.get('duration'):
+            size = fmt['tbr'] * 1000 / 8 * info['duration']
+        total += size or 0
+    return int(total)
+
+
+def savings_report(full_bytes, clip_file):
+    """Human-readable 'bytes saved' line, or '' if the full size is unknown"""
+    try:
+        clip_bytes = os.path.getsize(clip_file)
+    except (OSError, TypeError):
+        return ''
+    if not full_bytes or clip_bytes >= full_bytes:
+        return ''
+    saved = full_bytes - clip_bytes
+    return (f"Clip: {clip_bytes / 1048576:.1f} MB instead of ~{full_bytes / 1048576:.1f} MB "
+            f"({saved / 1048576:.1f} MB, {saved * 100 / full_bytes:.0f}% saved)")
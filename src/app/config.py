@@ -0,0 +1,170 @@
+# Typed configuration for Fast-Horse-2026
+# Settings are loaded once into an immutable snapshot that jobs receive
+
+import dataclasses
+import threading
+from dataclasses import dataclass
+from enum import Enum
+from PySide6.QtCore import QSettings
+from .translations import translator
+
+
+class ProxyType(str, Enum):
+    """Proxy type, stored by value so it does not depend on the UI language"""
+    NONE = 'none'
+    SOCKS5 = 'socks5'
+    HTTP = 'http'
+
+
+# Order of the proxy type combo boxes
+PROXY_TYPES = (ProxyType.NONE, ProxyType.SOCKS5, ProxyType.HTTP)
+
+# Translation keys of the display strings older versions stored
+_PROXY_TYPE_LABELS = {
+    'settings_proxy_none': ProxyType.NONE,
+    'settings_proxy_socks5': ProxyType.SOCKS5,
+    'settings_proxy_http': ProxyType.HTTP,
+}
+
+
+@dataclass(frozen=True)
+class AppConfig:
+    """Immutable snapshot of the application settings"""
+    proxy_type: ProxyType = ProxyType.NONE
+    proxy_host: str = '127.0.0.1'
+    proxy_port: str = '10808'
+    proxy_pool: tuple = ()
+    proxy_strategy: str = 'round_robin'
+    download_threads: int = 1
+    show_thumbnail: bool = True
+    process_extraction: bool = False
+    # Optional budgets for format selection (0 = no limit)
+    size_budget_mb: int = 0
+    bitrate_budget_kbps: int = 0
+    # Directory on fast storage for intermediate files ('' = write to output_dir)
+    staging_dir: str = ''
+    # New jobs wait while the staging directory holds this much (0 = no limit)
+    staging_limit_gb: int = 20
+    output_dir: str = '.'
+    sync_sources: tuple = ()
+
+    @property
+    def proxy_url(self):
+        """Proxy URL for yt-dlp; empty string means use the system proxy"""
+        if self.proxy_type == ProxyType.SOCKS5:
+            return f"socks5://{self.proxy_host}:{self.proxy_port}"
+        if self.proxy_type == ProxyType.HTTP:
+            return f"http://{self.proxy_host}:{self.proxy_port}"
+        return ''
+
+
+def parse_proxy_type(value):
+    """Convert a stored proxy type (enum value or legacy display string) to ProxyType"""
+    if not value:
+        return ProxyType.NONE
+    try:
+        return ProxyType(value)
+    except ValueError:
+        pass
+    # Older versions stored the translated label, in whatever language was active
+    for strings in translator.translations.values():
+        for key, proxy_type in _PROXY_TYPE_LABELS.items():
+            if strings.get(key) == value:
+                return proxy_type
+    return ProxyType.NONE
+
+
+def _split_lines(value):
+    return tuple(line.strip() for line in str(value or '').splitlines() if line.strip())
+
+
+def load_config(settings=None):
+    """Read all settings once and return an AppConfig"""
+    settings = settings or QSettings("Fast-Horse-2026", "App")
+    raw_proxy_type = settings.value("proxy_type", None)
+    proxy_type = parse_proxy_type(raw_proxy_type)
+    if raw_proxy_type and raw_proxy_type != proxy_type.value:
+        # Migrate legacy display strings to language-independent values
+        settings.setValue("proxy_type", proxy_type.value)
+
+    try:
+        threads = int(settings.value("download_threads", "1"))
+    except (TypeError, ValueError):
+        threads = 1
+    
+    def int_setting(name, default=0):
+        try:
+            return max(0, int(settings.value(name, str(default))))
+        except (TypeError, ValueError):
+            return default
+
+    return AppConfig(
+        proxy_type=proxy_type,
+        proxy_host=str(settings.value("proxy_host", "127.0.0.1")),
+        proxy_port=str(settings.value("proxy_port", "10808")),
+        proxy_pool=_split_lines(settings.value("proxy_pool", "")),
+        proxy_strategy=str(settings.value("proxy_strategy", "round_robin")),
+        download_threads=threads,
+        show_thumbnail=settings.value("show_thumbnail", "true") != "false",
+        process_extraction=settings.value("process_extraction", "false") == "true",
+        size_budget_mb=int_setting("size_budget_mb"),
+        bitrate_budget_kbps=int_setting("bitrate_budget_kbps"),
+        staging_dir=str(settings.value("staging_dir", "")),
+        staging_limit_gb=int_setting("staging_limit_gb", 20),
+        output_dir=str(settings.value("output_dir", ".")),
+        sync_sources=_split_lines(settings.value("sync_sources", "")),
+    )
+
+
+def _to_setting(value):
+    """Convert a config field to the string form kept in QSettings"""
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, bool):
+        return str(value).lower()
+    if isinstance(value, tuple):
+        return "\n".join(value)
+    return str(value)
+
+
+_config = None
+_config_lock = threading.Lock()
+_listeners = []
+
+
+def get_config():
+    """Return the current settings snapshot (loaded on first use)"""
+    global _config
+    config = _config
+    if config is None:
+        with _config_lock:
+            if _config is None:
+                _config = load_config()
+            config = _config
+    return config
+
+
+def publish_config(config):
+    """Atomically replace the current snapshot and notify listeners"""
+    global _config
+    with _config_lock:
+        _config = config
+        listeners = list(_listeners)
+    for listener in listeners:
+        listener(config)
+
+
+def update_config(**changes):
+    """Persist changed fields to QSettings and publish a new snapshot"""
+    settings = QSettings("Fast-Horse-2026", "App")
+    for name, value in changes.items():
+        settings.setValue(name, _to_setting(value))
+    config = dataclasses.replace(get_config(), **changes)
+    publish_config(config)
+    return config
+
+
+def add_config_listener(listener):
+    """Call listener(config) whenever a new snapshot is published"""
+    with _config_lock:
+        _listeners.append(listener)
@@ -0,0 +1,162 @@
+# Disk-space preflight for Fast-Horse-2026
+# Checks free space before any bytes are fetched, reserves it, and applies size budgets
+
+import glob
+import os
+import shutil
+import threading
+import yt_dlp
+from .clip import full_size_estimate
+
+# Extra room kept free on top of the estimate (metadata, thumbnails, estimate error)
+SPACE_MARGIN_BYTES = 64 * 1024 * 1024
+# Merging needs the separate streams and the merged output at the same time
+MERGE_SPACE_FACTOR = 2
+# Error class recorded in the download history
+ERROR_DISK_SPACE = 'disk_space'
+
+
+class InsufficientDiskSpace(yt_dlp.utils.DownloadError):
+    """Raised before a download starts when the output disk is too full"""
+
+
+def expected_bytes(info, clip=None):
+    """Estimated bytes a download of the resolved info will fetch"""
+    size = full_size_estimate(info)
+    duration = info.get('duration')
+    if clip and size and duration:
+        start, end = clip
+        end = min(end if end is not None else duration, duration)
+        size = int(size * max(end - start, 0) / duration)
+    return size
+
+
+def partial_bytes(filename):
+    """Bytes already on disk in .part files and fragments of a download (resumed jobs)"""
+    stem = glob.escape(os.path.splitext(filename)[0])
+    total = 0
+    # X.mp4.part, and X.f137.mp4.part / X.f140.m4a.part-Frag3 for merged formats
+    for path in glob.glob(stem + '.*.part') + glob.glob(stem + '.*.part-Frag*'):
+        try:
+            total += os.path.getsize(path)
+        except OSError:
+            pass
+    return total
+
+
+def required_bytes(info, download_bytes, on_disk=0):
+    """Free space needed while downloading and post-processing
+
+    on_disk bytes (a resumed job's .part files) need no new space, but a
+    merge still writes the full merged output next to the streams.
+    """
+    merge = download_bytes * (MERGE_SPACE_FACTOR - 1) if info.get('requested_formats') else 0
+    return max(download_bytes - on_disk, 0) + merge + SPACE_MARGIN_BYTES
+
+
+def free_bytes(path):
+    """Free space on the filesystem holding path (or its nearest existing parent)"""
+    path = os.path.abspath(path)
+    while not os.path.exists(path):
+        parent = os.path.dirname(path)
+        if parent == path:
+            break
+        path = parent
+    return shutil.disk_usage(path).free
+
+
+class SpaceReservation:
+    """Holds disk space for a running download in a hidden sidecar file
+
+    The file is allocated up front and shrunk as the download grows, so the
+    download and the reservation together keep the estimated size claimed
+    on disk until the job finishes. yt-dlp's own .part files cannot be
+    preallocated - it treats an existing .part file as a partial download.
+    """
+
+    def __init__(self, directory, name, size, on_disk=0):
+        self.path = os.path.join(directory, f'.{name}.reserve')
+        self.initial_size = size
+        self.size = 0
+        self._downloaded = {}  # file -> bytes written so far (resumed bytes included)
+        self._lock = threading.Lock()
+        self._reserve(max(size - on_disk, 0))
+
+    def _reserve(self, size):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with open(self.path, 'wb') as f:
+            if size and hasattr(os, 'posix_fallocate'):
+                os.posix_fallocate(f.fileno(), 0, size)
+            else:
+                # NTFS allocates on extend; elsewhere this may be sparse
+                f.truncate(size)
+        self.size = size
+
+    def shrink_to(self, size):
+        """Give back everything above size bytes"""
+        with self._lock:
+            self._shrink_locked(size)
+
+    def _shrink_locked(self, size):
+        size = max(size, 0)
+        if size >= self.size or not os.path.exists(self.path):
+            return
+        try:
+            os.truncate(self.path, size)
+            self.size = size
+        except OSError:
+            pass
+
+    def update(self, filename, downloaded_bytes):
+        """Progress hook helper: shrink by what the download has written
+
+        Called from every stream thread of a parallel merge download.
+        """
+        with self._lock:
+            self._downloaded[filename] = downloaded_bytes
+            self._shrink_locked(self.initial_size - sum(self._downloaded.values()))
+
+    def release(self):
+        with self._lock:
+            try:
+                os.remove(self.path)
+            except OSError:
+                pass
+            self.size = 0
+
+
+def budget_format_selector(selector, max_bytes=0, max_kbps=0):
+    """Wrap a compiled yt-dlp format selector with a size/bitrate budget
+
+    The wrapped selector runs the original one, and while its choice is
+    over budget, drops the largest format involved and tries again. If
+    nothing fits, the smallest choice seen is used.
+    """
+    def size_of(fmt):
+        return fmt.get('filesize') or fmt.get('filesize_approx') or 0
+
+    def over_budget(fmt):
+        return ((max_bytes and size_of(fmt) > max_bytes)
+                or (max_kbps and (fmt.get('tbr') or 0) > max_kbps))
+
+    def select(ctx):
+        formats = list(ctx['formats'])
+        smallest = None
+        while formats:
+            chosen = list(selector({**ctx, 'formats': formats}))
+            if not chosen:
+                break
+            if not any(over_budget(f) for f in chosen):
+                yield from chosen
+                return
+            first = chosen[0]
+            if smallest is None or size_of(first) < size_of(smallest[0]):
+                smallest = chosen
+            # Formats making up the choice ('137+140' lists both)
+            parts = first.get('requested_formats') or [first]
+            largest = max(parts, key=lambda f: (size_of(f), f.get('tbr') or 0))
+            formats = [f for f in formats if f.get('format_id') != largest.get('format_id')]
+        if smallest:
+            yield from smallest
+
+    return select
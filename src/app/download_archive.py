@@ -0,0 +1,115 @@
+# Download archive index for Fast-Horse-2026
+# Records downloaded items by extractor and video ID so reruns can skip them
+
+import sqlite3
+import threading
+import time
+from .paths import get_data_path
+
+
+def make_archive_id(extractor, video_id):
+    """Build an archive ID the same way yt-dlp does ('youtube dQw4w9WgXcQ')"""
+    return f"{extractor.lower()} {video_id}"
+
+
+def entry_archive_id(entry):
+    """Archive ID for an info dict or flat playlist entry, or None"""
+    extractor = entry.get('extractor_key') or entry.get('ie_key')
+    video_id = entry.get('id')
+    if not extractor or not video_id:
+        return None
+    return make_archive_id(extractor, video_id)
+
+
+class DownloadArchive:
+    """SQLite-backed download archive with an in-memory index
+
+    Implements the set interface yt-dlp accepts for its download_archive
+    option (``in`` and ``add``), so yt-dlp checks playlist entries against it
+    before extracting them. Lookups hit an in-memory set first; misses fall
+    back to the database primary key, so items added by another process
+    sharing the same archive file are still found.
+    """
+
+    def __init__(self, path=None):
+        self.path = path or get_data_path('archive.db')
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS archive ('
+            ' archive_id TEXT PRIMARY KEY,'
+            ' added_at REAL NOT NULL'
+            ') WITHOUT ROWID'
+        )
+        self._conn.commit()
+        self._ids = {row[0] for row in self._conn.execute('SELECT archive_id FROM archive')}
+
+    def __contains__(self, archive_id):
+        if not archive_id:
+            return False
+        if archive_id in self._ids:
+            return True
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT 1 FROM archive WHERE archive_id = ?', (archive_id,)
+            ).fetchone()
+        if row:
+            self._ids.add(archive_id)
+            return True
+        return False
+
+    def __len__(self):
+        return len(self._ids)
+
+    def add(self, archive_id):
+        """Record an archive ID (called by yt-dlp after each download)"""
+        if not archive_id or archive_id in self._ids:
+            return
+        with self._lock:
+            self._conn.execute(
+                'INSERT OR IGNORE INTO archive (archive_id, added_at) VALUES (?, ?)',
+                (archive_id, time.time())
+            )
+            self._conn.commit()
+        self._ids.add(archive_id)
+
+    def contains(self, extractor, video_id):
+        return make_archive_id(extractor, video_id) in self
+
+    def record(self, extractor, video_id):
+        self.add(make_archive_id(extractor, video_id))
+
+    def count_archived(self, entries):
+        """Count how many playlist entries are already in the archive"""
+        return sum(1 for entry in entries if entry and entry_archive_id(entry) in self)
+
+
+class RecordOnlyArchive:
+    """Archive view that records downloads but never skips them
+
+    Used for downloads the user explicitly asked for (a single video), so
+    they are still added to the archive for later playlist runs.
+    """
+
+    def __init__(self, archive):
+        self._archive = archive
+
+    def __contains__(self, archive_id):
+        return False
+
+    def add(self, archive_id):
+        self._archive.add(archive_id)
+
+
+_archive = None
+_archive_lock = threading.Lock()
+
+
+def get_download_archive():
+    """Return the shared DownloadArchive (opened on first use)"""
+    global _archive
+    with _archive_lock:
+        if _archive is None:
+            _archive = DownloadArchive()
+        return _archive
@@ -1,9 +1,172 @@
 import yt_dlp
+import yt_dlp.postprocessor
 import sys
-import json
-import urllib.request
-from PySide6.QtCore import QThread, Signal, QSettings
-from .translations import translator
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from PySide6.QtCore import QThread, Signal
+from .config import get_config
+from .download_archive import get_download_archive, entry_archive_id, RecordOnlyArchive
+from .proxy_pool import get_proxy_pool
+from .ydl_pool import get_ydl_pool
+from .http_client import get_http_client
+from .url_router import (
+    is_youtube_url, is_bilibili_url, get_youtube_video_id, resolve_route, route_url,
+    extract_routed
+)
+from .extract_pool import extract_info
+from .format_index import FormatIndex
+from .history import get_history, STATUS_FINISHED, STATUS_FAILED
+from .library import get_library, new_hasher, place_copy
+from .clip import clip_options, full_size_estimate, savings_report
+from .staging import (
+    staging_enabled, job_staging_dir, split_output_template, move_to_destination,
+    remove_job_staging
+)
+from .disk_space import (
+    SPACE_MARGIN_BYTES, ERROR_DISK_SPACE, InsufficientDiskSpace, SpaceReservation, budget_format_selector, expected_bytes,
+    free_bytes, required_bytes, partial_bytes
+)
+from .audio_pipeline import (
+    AUDIO_MP3_SPEC, is_audio_spec, audio_options, can_pipe, pipe_to_mp3, encode_mp3_file
+)
+from .site_policy import (
+    site_policy, classify_error, site_for_url, BLOCKING_ERRORS,
+    ERROR_JS_CHALLENGE, ERROR_FORMAT_UNAVAILABLE,
+    ERROR_NETWORK, ERROR_CIRCUIT_OPEN, ERROR_UNKNOWN
+)
+
+# Socket timeout for downloads - also bounds how long a pause/cancel can block
+DOWNLOAD_SOCKET_TIMEOUT = 20
+
+# Minimum seconds between progress checkpoints sent to the job journal
+CHECKPOINT_INTERVAL = 2.0
+
+# Progress/status signals are sent at most once per GUI frame - yt-dlp calls
+# the progress hook for every block, far more often than the GUI can repaint
+UI_UPDATE_INTERVAL = 1 / 60
+
+class DownloadInterrupted(yt_dlp.utils.DownloadCancelled):
+    """Raised from progress hooks when a job is paused or cancelled"""
+    msg = 'Download interrupted by user'
+
+class FormatResolvedPP(yt_dlp.postprocessor.PostProcessor):
+    """Reports the resolved format (e.g. '137+140') before download starts"""
+    
+    def __init__(self, callback):
+        super().__init__()
+        self._callback = callback
+    
+    def run(self, info):
+        self._callback(info)
+        return [], info
+
+class _StreamAborted(yt_dlp.utils.DownloadCancelled):
+    """Stops a stream whose sibling stream of the same merge has failed"""
+
+
+class ParallelStreamsPP(yt_dlp.postprocessor.PostProcessor):
+    """Downloads the streams of a merged format (e.g. '137+140') at the same time
+
+    yt-dlp downloads each requested format in turn and merges them after
+    the last one. Installed on a YoutubeDL, this wraps its dl() so every
+    stream but the last is started on a background thread and the last
+    call waits for all of them - the merge then starts as soon as both
+    streams are complete.
+    """
+    
+    def __init__(self):
+        super().__init__()
+        self._lock = threading.Lock()
+        self._expected = set()
+        self._pending = []
+        # Set when a stream fails, so the other one stops at its next progress report
+        self._abort = threading.Event()
+        # Files of the streams currently downloading together
+        self.active = set()
+    
+    def run(self, info):
+        # before_dl: remember which format_ids belong to this merge
+        formats = info.get('requested_formats') or []
+        with self._lock:
+            self._expected = {f.get('format_id') for f in formats} if len(formats) > 1 else set()
+            self.active = set()
+        self._abort.clear()
+        return [], info
+    
+    def _abort_hook(self, d):
+        if self._abort.is_set() and d.get('status') == 'downloading':
+            raise _StreamAborted('Another stream of this download failed')
+    
+    @contextmanager
+    def installed(self, ydl):
+        """Add the postprocessor and the dl() wrapper to a YoutubeDL for one job"""
+        original_dl = ydl.dl
+        
+        def dl(name, info, subtitle=False, test=False):
+            format_id = info.get('format_id')
+            with self._lock:
+                parallel = (not subtitle and not test and name != '-'
+                            and 'requested_formats' not in info and format_id in self._expected)
+                if parallel:
+                    self._expected.discard(format_id)
+                    self.active.add(name)
+                    last = not self._expected
+            if not parallel:
+                return original_dl(name, info, subtitle=subtitle, test=test)
+            if not last:
+                outcome = {}
+                
+                def target():
+                    try:
+                        outcome['result'] = original_dl(name, info)
+                    except BaseException as e:
+                        outcome['error'] = e
+                        self._abort.set()
+                
+                thread = threading.Thread(target=target, name=f'stream-{format_id}', daemon=True)
+                self._pending.append((thread, outcome))
+                thread.start()
+                # The real result is reported by the last stream's call
+                return True, True
+            
+            error = None
+            try:
+                success, real_download = original_dl(name, info)
+            except BaseException as e:
+                error, success, real_download = e, False, False
+                self._abort.set()
+            pending, self._pending = self._pending, []
+            for thread, outcome in pending:
+                thread.join()
+                if 'error' in outcome:
+                    # Report the failure itself rather than the stream it stopped
+                    if error is None or isinstance(error, _StreamAborted):
+                        error = outcome['error']
+                else:
+                    success = success and outcome['result'][0]
+                    real_download = real_download or outcome['result'][1]
+            with self._lock:
+                self.active = set()
+            if error is not None:
+                raise error
+            return success, real_download
+        
+        ydl.add_post_processor(self, when='before_dl')
+        ydl.add_progress_hook(self._abort_hook)
+        ydl.dl = dl
+        try:
+            yield ydl
+        finally:
+            # Pooled instances go back without the wrapper
+            del ydl.dl
+            if self._abort_hook in ydl._progress_hooks:
+                ydl._progress_hooks.remove(self._abort_hook)
+            pending, self._pending = self._pending, []
+            for thread, _ in pending:
+                thread.join()
 
 # Invidious instances (public, no API key needed)
 INVIDIOUS_INSTANCES = [
@@ -13,69 +176,98 @@ INVIDIOUS_INSTANCES = [
     "https://watchapi.whatever.social",
 ]
 
+def invidious_format(fmt, muxed):
+    """Convert an Invidious format entry to a yt-dlp style format dict"""
+    # e.g. 'video/webm; codecs="vp9"' or 'video/mp4; codecs="avc1.42001E, mp4a.40.2"'
+    mime, _, params = fmt.get('type', '').partition(';')
+    media, _, ext = mime.strip().partition('/')
+    codecs = [c.strip() for c in params.partition('codecs=')[2].strip('" ').split(',') if c.strip()]
+    if muxed:
+        vcodec, acodec = (codecs + ['none', 'none'])[:2]
+    elif media == 'audio':
+        vcodec, acodec = 'none', (codecs or ['unknown'])[0]
+        ext = 'm4a' if ext == 'mp4' else ext
+    else:
+        vcodec, acodec = (codecs or ['unknown'])[0], 'none'
+    width, _, height = (fmt.get('size') or '').partition('x')
+    if not height.isdigit():
+        height = ''.join(ch for ch in fmt.get('resolution') or '' if ch.isdigit())
+    try:
+        filesize = int(fmt.get('clen') or fmt.get('contentLength') or 0)
+    except (TypeError, ValueError):
+        filesize = 0
+    try:
+        tbr = int(fmt.get('bitrate') or 0) / 1000
+    except (TypeError, ValueError):
+        tbr = 0
+    return {
+        'format_id': fmt.get('itag', 'unknown'),
+        'url': fmt['url'],
+        'ext': fmt.get('container') or ext or 'mp4',
+        'filesize': filesize,
+        'format_note': fmt.get('qualityLabel') or fmt.get('quality', ''),
+        'width': int(width) if width.isdigit() else None,
+        'height': int(height) if height else None,
+        'fps': fmt.get('fps'),
+        'tbr': tbr,
+        'vcodec': vcodec,
+        'acodec': acodec,
+        'type': 'stream' if muxed else 'video',
+    }
+
 def fetch_video_info_invidious(video_id):
     """Fetch video info via Invidious API as fallback"""
     for instance in INVIDIOUS_INSTANCES:
         try:
             url = f"{instance}/api/v1/videos/{video_id}"
-            req = urllib.request.Request(url, headers={
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-            })
-            with urllib.request.urlopen(req, timeout=10) as response:
-                data = json.loads(response.read().decode())
-                
-                # Convert Invidious format to yt-dlp compatible format
-                info = {
-                    'id': video_id,
-                    'title': data.get('title', 'Unknown'),
-                    'description': data.get('description', ''),
-                    'thumbnail': data.get('thumbnailUrl', ''),
-                    'duration': data.get('lengthSeconds', 0),
-                    'uploader': data.get('author', 'Unknown'),
-                    'uploader_url': data.get('authorUrl', ''),
-                    'view_count': data.get('viewCount', 0),
-                    'like_count': data.get('likeCount', 0),
-                    'upload_date': data.get('published', ''),
-                    'formats': [],
-                    '_invidious_instance': instance,
-                }
-                
-                # Convert video formats - use direct URLs from Invidious
-                for fmt in data.get('adaptiveFormats', []):
-                    direct_url = fmt.get('url', '')
-                    if direct_url:
-                        info['formats'].append({
-                            'format_id': fmt.get('itag', 'unknown'),
-                            'url': direct_url,
-                            'ext': fmt.get('type', '').split('/')[0] if '/' in fmt.get('type', 'mp4') else 'mp4',
-                            'filesize': fmt.get('contentLength', 0),
-                            'format_note': fmt.get('qualityLabel', ''),
-                            'type': 'video',
-                        })
+            # Pooled keep-alive connection - repeated lookups skip the TCP/TLS handshake
+            data = get_http_client().get_json(url, timeout=10)
+            # Convert Invidious format to yt-dlp compatible format
+            info = {
+                'id': video_id,
+                'title': data.get('title', 'Unknown'),
+                'description': data.get('description', ''),
+                'thumbnail': data.get('thumbnailUrl', ''),
+                'duration': data.get('lengthSeconds', 0),
+                'uploader': data.get('author', 'Unknown'),
+                'uploader_url': data.get('authorUrl', ''),
+                'view_count': data.get('viewCount', 0),
+                'like_count': data.get('likeCount', 0),
+                'upload_date': data.get('published', ''),
+                'formats': [],
+                '_invidious_instance': instance,
+            }
+            
+            # Convert formats - use direct URLs from Invidious
+            for fmt in data.get('adaptiveFormats', []):
+                if fmt.get('url'):
+                    info['formats'].append(invidious_format(fmt, muxed=False))
+            
+            # Add combined formats (video+audio)
+            for fmt in data.get('formatStreams', []):
+                if fmt.get('url'):
+                    info['formats'].append(invidious_format(fmt, muxed=True))
                 
-                # Add combined formats (video+audio)
-                for fmt in data.get('formatStreams', []):
-                    direct_url = fmt.get('url', '')
-                    if direct_url:
-                        info['formats'].append({
-                            'format_id': fmt.get('itag', 'unknown'),
-                            'url': direct_url,
-                            'ext': fmt.get('type', '').split('/')[0] if '/' in fmt.get('type', 'mp4') else 'mp4',
-                            'filesize': fmt.get('contentLength', 0),
-                            'format_note': fmt.get('quality', ''),
-                            'type': 'stream',
-                        })
-                    
-                return info
+            return info
         except Exception as e:
             print(f"DEBUG: Invidious instance {instance} failed: {e}", flush=True)
             continue
     
     return None
 
-def download_via_invidious(video_id, output_template, progress_callback, status_callback):
-    """Download video directly via Invidious - bypasses YouTube blocking"""
-    import urllib.request
+def download_via_invidious(video_id, output_template, progress_callback, status_callback,
+                           should_stop=None, part_files=None, format_spec='best', hasher=None):
+    """Download video directly via Invidious - bypasses YouTube blocking
+
+    The stream is chosen with FormatIndex for the job's format spec: a muxed
+    stream for video, an audio-only stream for audio.
+
+    Data is written to a .part file first so an interrupted download can be
+    resumed with a Range request. should_stop is polled between chunks and
+    the .part path is added to part_files (if given) for cleanup on cancel.
+    A hasher (if given) is fed every byte of the file as it is written.
+    """
+    import os
     
     info = fetch_video_info_invidious(video_id)
     if not info:
@@ -87,11 +279,9 @@ def download_via_invidious(video_id, output_template, progress_callback, status_
     if not formats:
         raise Exception("Invidious: No formats available")
     
-    # Sort by quality (prefer higher resolution)
-    formats_sorted = sorted(formats, key=lambda x: x.get('format_note', ''), reverse=True)
-    
-    # Get best format
-    best_format = formats_sorted[0]
+    best_format = FormatIndex(formats, info.get('duration') or 0).best(format_spec)
+    if not best_format:
+        raise Exception("Invidious: No suitable format for the selected quality")
     video_url = best_format.get('url', '')
     
     if not video_url:
@@ -99,55 +289,104 @@ def download_via_invidious(video_id, output_template, progress_callback, status_
     
     status_callback(f"Downloading via Invidious: {best_format.get('format_note', 'Unknown quality')}")
     
-    # Download the file directly
+    # Determine output filename
+    ext = best_format.get('ext', 'mp4')
+    if '%(title)s' in output_template:
+        output_template = output_template.replace('%(title)s', title[:50])
+    output_file = output_template.replace('%(ext)s', ext).replace('.%(ext)s', f'.{ext}')
+    part_file = output_file + '.part'
+    os.makedirs(os.path.dirname(os.path.abspath(output_file)), exist_ok=True)
+    if part_files is not None:
+        part_files.add(part_file)
+    
+    # Download the file directly, resuming a previous .part file if present
     try:
-        req = urllib.request.Request(video_url, headers={
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-        })
+        resume_from = os.path.getsize(part_file) if os.path.exists(part_file) else 0
+        headers = {}
+        if resume_from:
+            headers['Range'] = f'bytes={resume_from}-'
         
-        with urllib.request.urlopen(req) as response:
-            total_size = int(response.headers.get('Content-Length', 0))
-            downloaded = 0
-            chunk_size = 8192
-            
-            # Determine output filename
-            ext = best_format.get('ext', 'mp4')
-            if '%(title)s' in output_template:
-                output_template = output_template.replace('%(title)s', title[:50])
-            output_file = output_template.replace('%(ext)s', ext).replace('.%(ext)s', f'.{ext}')
-            
-            with open(output_file, 'wb') as f:
+        with get_http_client().request(video_url, headers=headers, timeout=DOWNLOAD_SOCKET_TIMEOUT) as response:
+            # Server ignored the Range header - start over
+            if resume_from and response.status != 206:
+                resume_from = 0
+            total_size = int(response.headers.get('Content-Length', 0)) + resume_from
+            downloaded = resume_from
+            chunk_size = 64 * 1024
+            if resume_from and hasher is not None:
+                # Bytes from the earlier attempt are already on disk
+                with open(part_file, 'rb') as f:
+                    for block in iter(lambda: f.read(1024 * 1024), b''):
+                        hasher.update(block)
+            
+            with open(part_file, 'ab' if resume_from else 'wb') as f:
                 while True:
+                    if should_stop and should_stop():
+                        raise DownloadInterrupted()
                     chunk = response.read(chunk_size)
                     if not chunk:
                         break
                     f.write(chunk)
+                    if hasher is not None:
+                        hasher.update(chunk)
                     downloaded += len(chunk)
                     if total_size > 0:
                         percent = (downloaded / total_size) * 100
                         progress_callback(percent)
+        
+        os.replace(part_file, output_file)
+        return output_file, title
             
-            return output_file, title
-            
+    except DownloadInterrupted:
+        raise
     except Exception as e:
         raise Exception(f"Invidious download failed: {e}")
 
-def is_youtube_url(url):
-    """Check if URL is from YouTube"""
-    return 'youtube.com' in url or 'youtu.be' in url
-
-def get_youtube_video_id(url):
-    """Extract video ID from YouTube URL"""
-    import re
-    patterns = [
-        r'(?:youtube\.com/watch\?v=|youtu\.be/|youtube\.com/embed/)([a-zA-Z0-9_-]{11})',
-        r'youtube\.com/shorts/([a-zA-Z0-9_-]{11})',
-    ]
-    for pattern in patterns:
-        match = re.search(pattern, url)
-        if match:
-            return match.group(1)
-    return None
+# Short timeout for the preview phase - a slow preview is skipped, not waited for
+PREVIEW_TIMEOUT = 5
+
+def fetch_preview_info(url, proxy_url=''):
+    """Fetch title/uploader/thumbnail (and duration/views where available) quickly
+
+    Uses YouTube's oEmbed endpoint or Bilibili's view API instead of a full
+    extraction, so the preview can be shown long before formats are resolved.
+    Returns a partial info dict marked with '_preview', or None.
+    """
+    route = route_url(url)
+    if not route.video_id:
+        return None
+    if route.site == 'youtube':
+        api_url = f"https://www.youtube.com/oembed?format=json&url={route.url}"
+    elif route.site == 'bilibili':
+        key = 'aid' if route.video_id.startswith('av') else 'bvid'
+        api_url = f"https://api.bilibili.com/x/web-interface/view?{key}={route.video_id.removeprefix('av')}"
+    else:
+        return None
+    
+    # Shared keep-alive pool: previews of consecutive URLs reuse one connection per API host
+    data = get_http_client().get_json(api_url, timeout=PREVIEW_TIMEOUT, proxy_url=proxy_url)
+    
+    if route.site == 'youtube':
+        return {
+            'id': route.video_id,
+            'title': data.get('title', 'Unknown'),
+            'uploader': data.get('author_name', 'Unknown'),
+            'thumbnail': data.get('thumbnail_url'),
+            '_preview': True,
+        }
+    
+    data = data.get('data') or {}
+    if not data:
+        return None
+    return {
+        'id': route.video_id,
+        'title': data.get('title', 'Unknown'),
+        'duration': data.get('duration'),
+        'uploader': (data.get('owner') or {}).get('name', 'Unknown'),
+        'view_count': (data.get('stat') or {}).get('view'),
+        'thumbnail': data.get('pic'),
+        '_preview': True,
+    }
 
 def get_browser_cookies_list():
     """Get list of browsers to try for cookies, based on platform"""
@@ -160,8 +399,12 @@ def get_browser_cookies_list():
         # Linux browsers
         return ['firefox', 'chrome', 'brave', 'opera']
 
-def cleanup_temp_files(output_template):
-    """Clean up temporary .part files after download"""
+def cleanup_temp_files(output_template, tmp_files=None):
+    """Clean up temporary .part files after download
+
+    If tmp_files is given, only the fragments and state files belonging to
+    those files are removed, so paused jobs sharing the folder keep theirs.
+    """
     import glob
     import os
     
@@ -174,10 +417,16 @@ def cleanup_temp_files(output_template):
         output_dir = '.'
     
     # Find and remove .part-Frag* files
-    patterns = [
-        os.path.join(output_dir, '*.part-Frag*'),
-        os.path.join(output_dir, '*.ytdl'),
-    ]
+    if tmp_files is None:
+        patterns = [
+            os.path.join(output_dir, '*.part-Frag*'),
+            os.path.join(output_dir, '*.ytdl'),
+        ]
+    else:
+        patterns = []
+        for tmp_file in tmp_files:
+            stem = glob.escape(tmp_file[:-len('.part')] if tmp_file.endswith('.part') else tmp_file)
+            patterns.extend([stem + '.part-Frag*', stem + '.ytdl'])
     
     for pattern in patterns:
         for temp_file in glob.glob(pattern):
@@ -187,68 +436,34 @@ def cleanup_temp_files(output_template):
             except Exception as e:
                 print(f"DEBUG: Failed to remove temp file {temp_file}: {e}", flush=True)
 
-def get_proxy_url():
-    """Get proxy URL from application settings"""
-    settings = QSettings("Fast-Horse-2026", "App")
-    
-    # Get proxy type, default to "None" (use system proxy)
-    proxy_type = settings.value("proxy_type", None)
-    
-    # If no proxy type is set or it's the "None" option, return empty string
-    # This tells yt-dlp to use system proxy settings (from HTTP_PROXY, HTTPS_PROXY env vars)
-    if not proxy_type or proxy_type == translator.get('settings_proxy_none'):
-        return ''
-    
-    proxy_host = settings.value("proxy_host", "127.0.0.1")
-    proxy_port = settings.value("proxy_port", "10808")
+def remove_partial_files(tmp_files):
+    """Remove the .part files of a cancelled download"""
+    import os
     
-    if proxy_type == translator.get('settings_proxy_socks5'):
-        return f"socks5://{proxy_host}:{proxy_port}"
-    elif proxy_type == translator.get('settings_proxy_http'):
-        return f"http://{proxy_host}:{proxy_port}"
-    else:
-        return ''  # Use system proxy for unknown types
+    for tmp_file in tmp_files:
+        if not tmp_file.endswith('.part'):
+            continue
+        try:
+            if os.path.exists(tmp_file):
+                os.remove(tmp_file)
+                print(f"DEBUG: Removed partial file: {tmp_file}", flush=True)
+        except Exception as e:
+            print(f"DEBUG: Failed to remove partial file {tmp_file}: {e}", flush=True)
 
-def is_bilibili_url(url):
-    """检测URL是否为B站URL"""
-    if not url:
-        return False
-    
-    # B站域名模式
-    bilibili_domains = [
-        'bilibili.com',
-        'b23.tv',
-        'biligame.com',
-        'biligame.net',
-        'bilibili.tv',
-    ]
-    
-    import re
-    url_lower = url.lower()
-    
-    # 检查是否包含B站域名
-    for domain in bilibili_domains:
-        if domain in url_lower:
-            return True
-    
-    # 检查B站视频ID模式 (BV开头)
-    bv_pattern = r'BV[a-zA-Z0-9]{10}'
-    if re.search(bv_pattern, url_lower, re.IGNORECASE):
-        return True
-    
-    # 检查B站av号模式
-    av_pattern = r'av\d+'
-    if re.search(av_pattern, url_lower, re.IGNORECASE):
-        return True
-    
-    return False
+def get_proxy_url(config=None):
+    """Get proxy URL from a settings snapshot (the current one by default)
+
+    An empty string tells yt-dlp to use system proxy settings
+    (from HTTP_PROXY, HTTPS_PROXY env vars).
+    """
+    return (config or get_config()).proxy_url
 
 def get_format_for_url(url, user_format_spec):
     """根据URL类型返回合适的格式选择"""
     if is_bilibili_url(url):
         # B站需要特殊的格式选择
         # 如果用户选择了音频格式，保持原样
-        if user_format_spec == 'bestaudio/best':
+        if is_audio_spec(user_format_spec):
             return user_format_spec
         # 否则使用B站兼容格式
         else:
@@ -257,15 +472,99 @@ def get_format_for_url(url, user_format_spec):
         # 其他网站使用用户选择的格式
         return user_format_spec
 
+def fetch_error_message(code, error_str, deno_available):
+    """Build the user-facing message for a classified fetch error"""
+    if code == ERROR_JS_CHALLENGE:
+        if not deno_available:
+            return (
+                "The video site requires JavaScript challenge solving.\n\n"
+                "Deno runtime is not available in PATH.\n"
+                "Solution:\n"
+                "1. Install Deno: curl -fsSL https://deno.land/install.sh | sh\n"
+                "2. Add to PATH: export PATH=\"$HOME/.deno/bin:$PATH\"\n"
+                "3. Restart the app"
+            )
+        return (
+            "JavaScript challenge solving failed.\n\n"
+            "Deno is installed but yt-dlp can't use it.\n"
+            "Try: pip install yt-dlp-ejs"
+        )
+    if code == ERROR_FORMAT_UNAVAILABLE:
+        if not deno_available:
+            return (
+                "The video site served restricted content.\n\n"
+                "With Firefox cookies + Clash VPN, the site may only serve images.\n"
+                "Solution:\n"
+                "1. Install Deno: curl -fsSL https://deno.land/install.sh | sh\n"
+                "2. The app will automatically detect Deno in ~/.deno/bin/\n"
+                "3. Deno solves JavaScript challenges to get video formats"
+            )
+        return (
+            "The video site served restricted content (no video formats).\n\n"
+            "This usually means:\n"
+            "1. The site detected bot-like behavior\n"
+            "2. Try refreshing Firefox cookies\n"
+            "3. Wait a few minutes and try again"
+        )
+    if code in BLOCKING_ERRORS:
+        return (
+            "Bot detection detected.\n\n"
+            "Try:\n"
+            "1. Use the site in Firefox first (refresh cookies)\n"
+            "2. Wait 5-10 minutes\n"
+            "3. Try a different video"
+        )
+    if code == ERROR_NETWORK:
+        return (
+            "Cannot connect through proxy.\n\n"
+            "Check:\n"
+            "1. Proxy server is running\n"
+            "2. Firefox can access the video site\n"
+            "3. Check proxy settings in the app"
+        )
+    return f"Failed to fetch video: {error_str[:100]}"
+
+def circuit_open_message(site):
+    """Message used when a site's circuit breaker rejects a request"""
+    wait = int(site_policy.retry_after(site)) + 1
+    return f"{site} is blocking requests ({site_policy.last_error(site)}). Retrying in {wait}s."
+
 class FetchInfoThread(QThread):
+    # Partial info for the preview, emitted before formats are resolved
+    preview = Signal(dict)
     finished = Signal(dict)
-    error = Signal(str)
+    # (error code from site_policy, user-facing message)
+    error = Signal(str, str)
+    # Emitted when run() returns, whatever the outcome ("finished" is taken)
+    done = Signal()
     
-    def __init__(self, url):
+    def __init__(self, url, config=None):
         super().__init__()
         self.url = url
+        # Settings snapshot taken when the fetch was started
+        self.config = config or get_config()
+        self._cancelled = False
+    
+    def cancel(self):
+        """Skip the rest of the fetch (e.g. the URL was edited); results are no longer wanted"""
+        self._cancelled = True
+    
+    def is_cancelled(self):
+        return self._cancelled
         
     def run(self):
+        # Spread fetches over the proxy pool (if one is configured)
+        pool = get_proxy_pool()
+        pooled_proxy = pool.acquire()
+        try:
+            if not self._cancelled:
+                self._fetch(pooled_proxy)
+        finally:
+            if pooled_proxy:
+                pool.release(pooled_proxy)
+            self.done.emit()
+    
+    def _fetch(self, pooled_proxy):
         import sys
         import threading
         import subprocess
@@ -273,6 +572,23 @@ class FetchInfoThread(QThread):
         print(f"DEBUG: FetchInfoThread.run() started for URL: {self.url}", flush=True)
         print(f"DEBUG: Python thread: {threading.current_thread().name}", flush=True)
         
+        # b23.tv short links without a video ID need one redirect to be routed
+        self.url = resolve_route(self.url, pooled_proxy or self.config.proxy_url).url
+        
+        # Phase 1: lightweight preview, so the UI is not blocked on format resolution
+        try:
+            preview_info = fetch_preview_info(self.url, pooled_proxy or self.config.proxy_url)
+            if preview_info:
+                print(f"DEBUG: Preview ready: {preview_info.get('title', '')[:50]}", flush=True)
+                self.preview.emit(preview_info)
+        except Exception as e:
+            print(f"DEBUG: Preview failed, waiting for full extraction: {str(e)[:80]}", flush=True)
+        
+        if self._cancelled:
+            print(f"DEBUG: Fetch cancelled after preview: {self.url}", flush=True)
+            return
+        
+        # Phase 2: full extraction with format resolution
         # Check if Deno is available (for YouTube JS challenges)
         deno_available = False
         deno_path = None
@@ -334,6 +650,15 @@ class FetchInfoThread(QThread):
         except Exception:
             print(f"DEBUG: Could not check for Deno", flush=True)
         
+        # Fail fast (or go straight to the fallback) while the site is blocking us
+        site = site_for_url(self.url)
+        if not site_policy.allow_request(site):
+            print(f"DEBUG: Circuit open for {site}, skipping direct extraction", flush=True)
+            if self.try_invidious_fallback(site):
+                return
+            self.error.emit(ERROR_CIRCUIT_OPEN, circuit_open_message(site))
+            return
+        
         try:
             # METHOD 1: Try with JS challenge solving (if Deno available)
             # 为B站URL使用智能格式选择
@@ -357,12 +682,14 @@ class FetchInfoThread(QThread):
                 user_agent = 'Mozilla/5.0 (X11; Linux x86_64; rv:109.0) Gecko/20100101 Firefox/115.0'
             
             import os
-            proxy_url = get_proxy_url()
+            proxy_url = pooled_proxy or self.config.proxy_url
             
             ydl_opts = {
                 'quiet': True,
                 'no_warnings': True,
                 'socket_timeout': socket_timeout,
+                # Playlists: list entries without extracting each one
+                'extract_flat': 'in_playlist',
                 'cookiesfrombrowser': (browser_list[0],),
                 'user_agent': user_agent,
                 'format': format_for_url,
@@ -393,16 +720,21 @@ class FetchInfoThread(QThread):
             
             print(f"DEBUG: Method 1: With JS challenge solving...", flush=True)
             try:
-                with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                    info = ydl.extract_info(self.url, download=False)
-                    if info:
-                        print(f"DEBUG: Method 1 SUCCESS!", flush=True)
-                        self.finished.emit(info)
-                        return
+                # Optionally in a worker process, so a large playlist does not stall the GUI
+                info = extract_info(self.url, ydl_opts, use_processes=self.config.process_extraction)
+                if info:
+                    print(f"DEBUG: Method 1 SUCCESS!", flush=True)
+                    site_policy.record_success(site)
+                    self.finished.emit(info)
+                    return
             except Exception as e1:
                 error_str = str(e1)
                 print(f"DEBUG: Method 1 failed: {error_str[:80]}", flush=True)
                 
+                # The site is blocking us - other methods would hit the same wall
+                if classify_error(e1) in BLOCKING_ERRORS:
+                    raise
+                
                 # METHOD 2: Try without format selection (extract basic info only)
                 if 'Requested format is not available' in error_str:
                     print(f"DEBUG: Method 2: Extract basic info without formats...", flush=True)
@@ -410,7 +742,7 @@ class FetchInfoThread(QThread):
                     timeout_2 = 30 if is_bilibili_url(self.url) else 15
                     
                     try:
-                        proxy_url = get_proxy_url()
+                        proxy_url = pooled_proxy or self.config.proxy_url
                         ydl_opts_basic = {
                             'quiet': True,
                             'socket_timeout': timeout_2,
@@ -420,10 +752,11 @@ class FetchInfoThread(QThread):
                         if proxy_url:
                             ydl_opts_basic['proxy'] = proxy_url
                         
-                        with yt_dlp.YoutubeDL(ydl_opts_basic) as ydl:
-                            info = ydl.extract_info(self.url, download=False, process=False)
+                        with get_ydl_pool().checkout(ydl_opts_basic) as ydl:
+                            info = extract_routed(ydl, self.url, download=False, process=False)
                             if info:
                                 print(f"DEBUG: Method 2 SUCCESS! Got basic info", flush=True)
+                                site_policy.record_success(site)
                                 self.finished.emit(info)
                                 return
                     except Exception as e2:
@@ -442,7 +775,7 @@ class FetchInfoThread(QThread):
                     user_agent_3 = 'Mozilla/5.0 (X11; Linux x86_64; rv:109.0) Gecko/20100101 Firefox/115.0'
                 
                 try:
-                    proxy_url = get_proxy_url()
+                    proxy_url = pooled_proxy or self.config.proxy_url
                     ydl_opts_nocookies = {
                         'quiet': True,
                         'socket_timeout': timeout_3,
@@ -455,10 +788,11 @@ class FetchInfoThread(QThread):
                     if proxy_url:
                         ydl_opts_nocookies['proxy'] = proxy_url
                     
-                    with yt_dlp.YoutubeDL(ydl_opts_nocookies) as ydl:
-                        info = ydl.extract_info(self.url, download=False, process=False)
+                    with get_ydl_pool().checkout(ydl_opts_nocookies) as ydl:
+                        info = extract_routed(ydl, self.url, download=False, process=False)
                         if info:
                             print(f"DEBUG: Method 3 SUCCESS! Got info without cookies", flush=True)
+                            site_policy.record_success(site)
                             self.finished.emit(info)
                             return
                 except Exception as e3:
@@ -466,111 +800,291 @@ class FetchInfoThread(QThread):
                     last_error = e3
             
             print(f"DEBUG: Fetching video info (Deno available: {deno_available})...", flush=True)
-            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                info = ydl.extract_info(self.url, download=False)
+            with get_ydl_pool().checkout(ydl_opts) as ydl:
+                info = extract_routed(ydl, self.url, download=False)
                 
                 if info:
                     title = info.get('title', 'Unknown')
                     print(f"DEBUG: SUCCESS! Got video: {title[:50]}", flush=True)
                     formats = info.get('formats', [])
                     print(f"DEBUG: Formats available: {len(formats) if formats else 0}", flush=True)
+                    site_policy.record_success(site)
                     self.finished.emit(info)
                 else:
                     print(f"DEBUG: Failed - no info extracted", flush=True)
-                    self.error.emit("Could not extract video information")
+                    self.error.emit(ERROR_UNKNOWN, "Could not extract video information")
                 return
                 
         except Exception as e:
             error_str = str(e)
             print(f"DEBUG: Error: {error_str[:100]}", flush=True)
             
-            # Check for JS challenge errors
-            if 'challenge solving failed' in error_str or 'n challenge' in error_str:
-                if not deno_available:
-                    error_msg = (
-                        "The video site requires JavaScript challenge solving.\n\n"
-                        "Deno runtime is not available in PATH.\n"
-                        "Solution:\n"
-                        "1. Install Deno: curl -fsSL https://deno.land/install.sh | sh\n"
-                        "2. Add to PATH: export PATH=\"$HOME/.deno/bin:$PATH\"\n"
-                        "3. Restart the app"
-                    )
-                else:
-                    error_msg = (
-                        "JavaScript challenge solving failed.\n\n"
-                        "Deno is installed but yt-dlp can't use it.\n"
-                        "Try: pip install yt-dlp-ejs"
-                    )
-            elif 'Requested format is not available' in error_str:
-                if not deno_available:
-                    error_msg = (
-                        "The video site served restricted content.\n\n"
-                        "With Firefox cookies + Clash VPN, the site may only serve images.\n"
-                        "Solution:\n"
-                        "1. Install Deno: curl -fsSL https://deno.land/install.sh | sh\n"
-                        "2. The app will automatically detect Deno in ~/.deno/bin/\n"
-                        "3. Deno solves JavaScript challenges to get video formats"
-                    )
-                else:
-                    error_msg = (
-                        "The video site served restricted content (no video formats).\n\n"
-                        "This usually means:\n"
-                        "1. The site detected bot-like behavior\n"
-                        "2. Try refreshing Firefox cookies\n"
-                        "3. Wait a few minutes and try again"
-                    )
-            elif 'Sign in to confirm' in error_str:
-                error_msg = (
-                    "Bot detection detected.\n\n"
-                    "Try:\n"
-                    "1. Use the site in Firefox first (refresh cookies)\n"
-                    "2. Wait 5-10 minutes\n"
-                    "3. Try a different video"
-                )
-            elif 'Network is unreachable' in error_str:
-                error_msg = (
-                    "Cannot connect through proxy.\n\n"
-                    "Check:\n"
-                    "1. Proxy server is running\n"
-                    "2. Firefox can access the video site\n"
-                    "3. Check proxy settings in the app"
-                )
-            else:
-                error_msg = f"Failed to fetch video: {error_str[:100]}"
+            code = classify_error(e)
+            site_policy.record_failure(site, code)
+            error_msg = fetch_error_message(code, error_str, deno_available)
             
             # Try Invidious as last resort for YouTube videos
-            if is_youtube_url(self.url):
-                video_id = get_youtube_video_id(self.url)
-                if video_id:
-                    print(f"DEBUG: Trying Invidious fallback for YouTube video {video_id}...", flush=True)
-                    try:
-                        invidious_info = fetch_video_info_invidious(video_id)
-                        if invidious_info:
-                            print(f"DEBUG: Invidious SUCCESS! Got video: {invidious_info.get('title', 'Unknown')[:50]}", flush=True)
-                            self.finished.emit(invidious_info)
-                            return
-                    except Exception as inv_err:
-                        print(f"DEBUG: Invidious fallback failed: {inv_err}", flush=True)
+            if self.try_invidious_fallback(site):
+                return
             
-            self.error.emit(error_msg)
-        
-
+            self.error.emit(code, error_msg)
         
         print(f"DEBUG: FetchInfoThread.run() ending", flush=True)
+    
+    def try_invidious_fallback(self, site):
+        """Fetch info via Invidious for YouTube URLs; returns True on success"""
+        if not is_youtube_url(self.url):
+            return False
+        video_id = get_youtube_video_id(self.url)
+        if not video_id:
+            return False
+        
+        print(f"DEBUG: Trying Invidious fallback for YouTube video {video_id}...", flush=True)
+        try:
+            invidious_info = fetch_video_info_invidious(video_id)
+            if invidious_info:
+                print(f"DEBUG: Invidious SUCCESS! Got video: {invidious_info.get('title', 'Unknown')[:50]}", flush=True)
+                self.finished.emit(invidious_info)
+                return True
+        except Exception as inv_err:
+            print(f"DEBUG: Invidious fallback failed: {inv_err}", flush=True)
+        return False
 
 class DownloadThread(QThread):
     progress = Signal(float)
     status = Signal(str)
     finished = Signal(str)
     error = Signal(str)
+    paused = Signal()
+    cancelled = Signal()
+    # Resume data for the job journal: resolved format, temp file, bytes
+    checkpoint = Signal(dict)
     
-    def __init__(self, url, format_spec, output_template, threads=1):
+    def __init__(self, url, format_spec, output_template, threads=1, resolved_format=None,
+                 skip_archived=False, clip=None, config=None):
         super().__init__()
         self.url = url
+        # Settings snapshot taken when the job was started
+        self.config = config or get_config()
         self.format_spec = format_spec
         self.output_template = output_template
         self.threads = threads
+        # Skip items already in the download archive (playlist runs)
+        self.skip_archived = skip_archived
+        # Exact format chosen by an earlier run of this job - reusing it keeps
+        # the existing .part files valid when resuming
+        self.resolved_format = resolved_format
+        # (start, end) seconds: download only this part of the video
+        self.clip = clip
+        # Full-download size of the selected format(s), for the clip savings report
+        self.full_bytes = 0
+        self.final_file = None
+        # Info dict of the item being downloaded (set before_dl)
+        self.resolved_info = None
+        # Start time and bytes fetched for the current item, for the history
+        self._item_started = None
+        self._item_bytes = {}
+        # Disk space held for the running download (see disk_space.py)
+        self.reservation = None
+        # Staging: intermediate files go to staging_dir, finished files to destination_dir
+        self.staging_dir = None
+        self.destination_dir = None
+        self._last_checkpoint = 0.0
+        self._last_ui_update = 0.0
+        # Temp files seen in progress hooks, used for cleanup on cancel
+        self.tmp_files = set()
+        self._pause_requested = False
+        self._cancel_requested = False
+    
+    def pause(self):
+        """Ask the download to stop, keeping .part files for a later resume"""
+        self._pause_requested = True
+    
+    def cancel(self):
+        """Ask the download to stop and discard its partial files"""
+        self._cancel_requested = True
+    
+    def _report_progress(self, percent):
+        """Emit progress at most once per UI frame (the final 100% always)"""
+        now = time.monotonic()
+        if percent < 100 and now - self._last_ui_update < UI_UPDATE_INTERVAL:
+            return
+        self._last_ui_update = now
+        self.progress.emit(percent)
+    
+    def is_interrupted(self):
+        """Return True once pause() or cancel() has been requested"""
+        return self._pause_requested or self._cancel_requested
+    
+    def _on_format_resolved(self, info):
+        self.resolved_info = info
+        self._item_started = time.monotonic()
+        self._item_bytes = {}
+        if self.clip:
+            self.full_bytes = full_size_estimate(info)
+        if not self._reuse_library_file(info):
+            self._preflight(info)
+        if info.get('format_id') and not info.get('playlist_index'):
+            self.checkpoint.emit({'resolved_format': info['format_id']})
+    
+    def _reuse_library_file(self, info):
+        """ID-level duplicate check: same video and format downloaded before
+
+        The earlier file is linked (or copied) to the target path, so yt-dlp
+        finds it already downloaded and skips fetching it.
+        """
+        target = info.get('_filename')
+        if self.clip or not target or os.path.exists(target):
+            return False
+        try:
+            existing = get_library().find_by_source(entry_archive_id(info), info.get('format_id'))
+            if not existing or os.path.splitext(existing)[1] != os.path.splitext(target)[1]:
+                return False
+            place_copy(existing, target)
+        except (OSError, sqlite3.Error) as e:
+            print(f"DEBUG: DownloadThread - Library lookup failed: {e}", flush=True)
+            return False
+        print(f"DEBUG: DownloadThread - Reusing {existing} from the library", flush=True)
+        self.status.emit("Already in library, linking existing file...")
+        return True
+    
+    def _preflight(self, info):
+        """Check free space for the resolved format and reserve it
+
+        Raises InsufficientDiskSpace before any media bytes are fetched.
+        """
+        self._release_reservation()
+        size = expected_bytes(info, self.clip)
+        if not size:
+            # Size unknown - nothing to check against
+            return
+        filename = info.get('_filename') or self.output_template
+        directory = os.path.dirname(os.path.abspath(filename))
+        # A resumed job already has part of the download on disk
+        on_disk = partial_bytes(filename)
+        needed = required_bytes(info, size, on_disk)
+        free = free_bytes(directory)
+        if free < needed:
+            raise InsufficientDiskSpace(
+                f"Not enough disk space in {directory}: "
+                f"{needed / 1073741824:.2f} GB needed, {free / 1073741824:.2f} GB free")
+        if self.staging_dir:
+            # Only the finished file lands in the output folder
+            needed = size + SPACE_MARGIN_BYTES
+            free = free_bytes(self.destination_dir)
+            if free < needed:
+                raise InsufficientDiskSpace(
+                    f"Not enough disk space in {self.destination_dir}: "
+                    f"{needed / 1073741824:.2f} GB needed, {free / 1073741824:.2f} GB free")
+        try:
+            self.reservation = SpaceReservation(directory, f"fasthorse-{info.get('id', 'download')}", size,
+                                                on_disk)
+        except OSError as e:
+            print(f"DEBUG: DownloadThread - Could not reserve disk space: {e}", flush=True)
+    
+    def _release_reservation(self):
+        if self.reservation is not None:
+            self.reservation.release()
+            self.reservation = None
+    
+    def _on_file_done(self, filename, digest=None):
+        if self.staging_dir:
+            # A copy across filesystems hashes the data on the way
+            filename, copy_digest = move_to_destination(filename, self.staging_dir, self.destination_dir,
+                                                        None if digest else new_hasher())
+            digest = digest or copy_digest
+            print(f"DEBUG: DownloadThread - Moved to {filename}", flush=True)
+        self.final_file = filename
+        self._register_in_library(filename, digest)
+        self._record_history(STATUS_FINISHED, filename)
+    
+    def _register_in_library(self, filename, digest=None):
+        """Add a finished file to the library; identical files become links
+
+        Clips are left out: they share the video ID and format of the full
+        file, and find_by_source must never hand out a partial file.
+        """
+        if self.clip:
+            return
+        info = self.resolved_info or {}
+        try:
+            duplicate = get_library().register(filename, digest, entry_archive_id(info) if info else None,
+                                               info.get('format_id'))
+        except (OSError, sqlite3.Error) as e:
+            print(f"DEBUG: DownloadThread - Library update failed: {e}", flush=True)
+            return
+        if duplicate and duplicate[1] != 'same':
+            print(f"DEBUG: DownloadThread - {filename} duplicates {duplicate[0]}, replaced by {duplicate[1]}", flush=True)
+    
+    def _record_history(self, status, filename=None, error_class=None):
+        """Write one history row for the current item (or the whole job on failure)"""
+        info = self.resolved_info or {}
+        elapsed = time.monotonic() - self._item_started if self._item_started else None
+        fetched = sum(self._item_bytes.values())
+        size = None
+        if filename:
+            try:
+                size = os.path.getsize(filename)
+            except OSError:
+                pass
+        try:
+            get_history().record(
+                url=info.get('webpage_url') or self.url,
+                site=site_for_url(self.url),
+                extractor=info.get('extractor_key'),
+                video_id=info.get('id'),
+                title=info.get('title'),
+                uploader=info.get('uploader') or info.get('channel'),
+                format_id=info.get('format_id'),
+                size_bytes=size,
+                duration=info.get('duration'),
+                elapsed=elapsed,
+                throughput=fetched / elapsed if fetched and elapsed else None,
+                output_path=filename,
+                status=status,
+                error_class=error_class,
+            )
+        except sqlite3.Error as e:
+            print(f"DEBUG: DownloadThread - History update failed: {e}", flush=True)
+        self._item_started = None
+    
+    def _discard_staging(self):
+        """Remove the job's staging directory (finished, failed or cancelled)"""
+        if self.staging_dir:
+            remove_job_staging(self.staging_dir)
+    
+    def _finish_interrupted(self):
+        """Emit paused/cancelled after the download loop has been aborted"""
+        if self._cancel_requested:
+            remove_partial_files(self.tmp_files)
+            cleanup_temp_files(self.output_template, self.tmp_files)
+            self._discard_staging()
+            print(f"DEBUG: DownloadThread - Cancelled: {self.url}", flush=True)
+            self.cancelled.emit()
+        else:
+            print(f"DEBUG: DownloadThread - Paused: {self.url}", flush=True)
+            self.paused.emit()
         
+    def _download_mp3(self, ydl):
+        """Pipe a single video's audio stream into ffmpeg; playlists and
+        streams ffmpeg cannot read from a pipe use the regular download +
+        FFmpegExtractAudio path"""
+        ie_result = extract_routed(ydl, self.url, download=False, process=False)
+        if ie_result.get('_type', 'video') == 'video':
+            info = ydl.process_ie_result(ie_result, download=False)
+            if can_pipe(ydl, info):
+                if ydl.in_download_archive(info):
+                    print(f"DEBUG: DownloadThread - Already in archive: {self.url}", flush=True)
+                    return
+                self._on_format_resolved(info)
+                self.status.emit("Downloading and encoding MP3...")
+                filename = pipe_to_mp3(ydl, info, self._report_progress, self.is_interrupted, self.tmp_files)
+                print(f"DEBUG: DownloadThread - Encoded {filename} from {info.get('format_id')}", flush=True)
+                self._on_file_done(filename)
+                ydl.record_download_archive(info)
+                return
+        ydl.process_ie_result(ie_result, download=True)
+    
     def run(self):
         import os
         import subprocess
@@ -636,15 +1150,53 @@ class DownloadThread(QThread):
         except Exception:
             print(f"DEBUG: DownloadThread - Could not check for Deno", flush=True)
         
+        # Bytes per file in the current attempt, for proxy throughput stats
+        attempt_bytes = {}
+        # Video and audio streams of a merged format download side by side
+        streams = ParallelStreamsPP()
+        stream_totals = {}
+        
         def progress_hook(d):
+            if d.get('tmpfilename'):
+                self.tmp_files.add(d['tmpfilename'])
+            if d.get('filename') and d.get('downloaded_bytes'):
+                attempt_bytes[d['filename']] = d['downloaded_bytes']
+                self._item_bytes[d['filename']] = d['downloaded_bytes']
+                if self.reservation is not None:
+                    self.reservation.update(d['filename'], d['downloaded_bytes'])
+            
+            # Abort between chunks so pause/cancel take effect promptly
+            if self.is_interrupted():
+                raise DownloadInterrupted()
+            
+            now = time.monotonic()
+            if d['status'] == 'finished' or now - self._last_checkpoint >= CHECKPOINT_INTERVAL:
+                self._last_checkpoint = now
+                self.checkpoint.emit({
+                    'tmp_path': d.get('tmpfilename') or d.get('filename'),
+                    'downloaded_bytes': d.get('downloaded_bytes') or 0,
+                    'total_bytes': d.get('total_bytes') or d.get('total_bytes_estimate') or 0,
+                })
+            
             if d['status'] == 'downloading':
+                if now - self._last_ui_update < UI_UPDATE_INTERVAL:
+                    return
+                self._last_ui_update = now
                 # Extract percentage from progress string
                 percent_str = d.get('_percent_str', '0%')
-                try:
-                    percent = float(percent_str.strip('%'))
-                    self.progress.emit(percent)
-                except ValueError:
-                    pass
+                files = streams.active
+                if len(files) > 1 and d.get('filename') in files:
+                    # Combined progress of the streams downloading together
+                    stream_totals[d['filename']] = d.get('total_bytes') or d.get('total_bytes_estimate') or 0
+                    total = sum(stream_totals.get(f, 0) for f in files)
+                    if total:
+                        self.progress.emit(sum(attempt_bytes.get(f, 0) for f in files) * 100 / total)
+                else:
+                    try:
+                        percent = float(percent_str.strip('%'))
+                        self.progress.emit(percent)
+                    except ValueError:
+                        pass
                     
                 # Get speed and ETA
                 speed = d.get('_speed_str', '')
@@ -662,10 +1214,46 @@ class DownloadThread(QThread):
             approaches.append({'cookiesfrombrowser': (browser,)})
         approaches.append({})  # No cookies as fallback
         
-        for opts in approaches:
+        # Already-downloaded playlist entries are skipped by yt-dlp before
+        # they are extracted; other downloads are only recorded
+        try:
+            archive = get_download_archive()
+        except Exception as e:
+            print(f"DEBUG: DownloadThread - Download archive unavailable: {e}", flush=True)
+            archive = None
+        
+        # While the site's breaker is open, skip direct attempts entirely and
+        # go to the fallback route (or fail fast if there is none)
+        site = site_for_url(self.url)
+        if not site_policy.allow_request(site):
+            print(f"DEBUG: DownloadThread - Circuit open for {site}, skipping direct download", flush=True)
+            approaches = []
+        
+        # Write .part files, fragments and merge/convert outputs to the staging
+        # directory; finished files are moved to the output folder (post hook)
+        output_template = self.output_template
+        if staging_enabled(self.config):
+            self.staging_dir = job_staging_dir(self.config, getattr(self, 'job_id', ''))
+            self.destination_dir, relative_template = split_output_template(self.output_template)
+            output_template = os.path.join(self.staging_dir, relative_template)
+        
+        # Proxy pool (if configured): one proxy per attempt, fail over to the
+        # next proxy on network errors - the .part file lets it pick up mid-job
+        pool = get_proxy_pool()
+        proxy_failovers = 0
+        last_code = None
+        
+        while approaches:
+            opts = approaches.pop(0)
+            if self.is_interrupted():
+                self._finish_interrupted()
+                return
+            pooled_proxy = pool.acquire()
+            attempt_bytes.clear()
+            attempt_start = time.monotonic()
             try:
-                # 使用智能格式选择
-                actual_format = get_format_for_url(self.url, self.format_spec)
+                # 使用智能格式选择 (resumed jobs reuse the exact format of their .part files)
+                actual_format = self.resolved_format or get_format_for_url(self.url, self.format_spec)
                 
                 # Get platform-specific user agent
                 is_windows = sys.platform == 'win32'
@@ -675,7 +1263,7 @@ class DownloadThread(QThread):
                     user_agent = 'Mozilla/5.0 (X11; Linux x86_64; rv:109.0) Gecko/20100101 Firefox/115.0'
                 
                 import os
-                proxy_url = get_proxy_url()
+                proxy_url = pooled_proxy or self.config.proxy_url
                 
                 # Debug: Print proxy info
                 print(f"DEBUG DOWNLOAD: proxy_url = '{proxy_url}'", flush=True)
@@ -683,7 +1271,7 @@ class DownloadThread(QThread):
                 
                 ydl_opts = {
                     'format': actual_format,
-                    'outtmpl': self.output_template,
+                    'outtmpl': output_template,
                     'progress_hooks': [progress_hook],
                     'merge_output_format': 'mp4',
                     'quiet': True,
@@ -693,13 +1281,25 @@ class DownloadThread(QThread):
                         'Accept-Language': 'en-US,en;q=0.9',
                     },
                     'concurrent_fragment_download': self.threads,
+                    'socket_timeout': DOWNLOAD_SOCKET_TIMEOUT,
+                    # Keep .part files and resume them with ranged requests
+                    'continuedl': True,
+                    'nopart': False,
+                    'post_hooks': [self._on_file_done],
                     **opts
                 }
                 
+                # Clip mode: fetch only the requested time range
+                if self.clip:
+                    ydl_opts.update(clip_options(self.clip))
+                
                 # Only add proxy if explicitly configured (not empty string)
                 if proxy_url:
                     ydl_opts['proxy'] = proxy_url
                 
+                if archive is not None:
+                    ydl_opts['download_archive'] = archive if self.skip_archived else RecordOnlyArchive(archive)
+                
                 # 为B站URL添加referer头
                 if is_bilibili_url(self.url):
                     ydl_opts['referer'] = 'https://www.bilibili.com'
@@ -712,18 +1312,9 @@ class DownloadThread(QThread):
                     os.environ['PATH'] = deno_dir + ':' + os.environ.get('PATH', '')
                     print(f"DEBUG: DownloadThread - Added {deno_dir} to PATH", flush=True)
                 
-                # Add audio format options for MP3
-                if self.format_spec == 'bestaudio/best':
-                    ydl_opts.update({
-                        'extract_audio': True,
-                        'audio_format': 'mp3',
-                        'audio_quality': '0',
-                        'postprocessors': [{
-                            'key': 'FFmpegExtractAudio',
-                            'preferredcodec': 'mp3',
-                            'preferredquality': '0'
-                        }]
-                    })
+                # Audio only: keep the original stream, or encode MP3 from the closest bitrate
+                if is_audio_spec(self.format_spec):
+                    ydl_opts.update(audio_options(self.format_spec))
                 else:
                     ydl_opts.update({
                         'merge_output_format': 'mp4',
@@ -733,39 +1324,109 @@ class DownloadThread(QThread):
                         }]
                     })
                     
-                with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                    ydl.download([self.url])
+                with get_ydl_pool().checkout(ydl_opts) as ydl, streams.installed(ydl):
+                    ydl.add_post_processor(FormatResolvedPP(self._on_format_resolved), when='before_dl')
+                    # Optional size/bitrate budget (not for resumed jobs - their format is fixed)
+                    if (self.config.size_budget_mb or self.config.bitrate_budget_kbps) and not self.resolved_format:
+                        ydl.format_selector = budget_format_selector(
+                            ydl.format_selector, self.config.size_budget_mb * 1048576,
+                            self.config.bitrate_budget_kbps)
+                    if self.format_spec == AUDIO_MP3_SPEC and not self.clip:
+                        self._download_mp3(ydl)
+                    else:
+                        extract_routed(ydl, self.url, download=True)
+                
+                if pooled_proxy:
+                    pool.release(pooled_proxy, sum(attempt_bytes.values()),
+                                 time.monotonic() - attempt_start)
                 
                 # Clean up temporary files after successful download
-                cleanup_temp_files(self.output_template)
+                self._release_reservation()
+                cleanup_temp_files(self.output_template, self.tmp_files)
+                self._discard_staging()
                 
-                self.finished.emit("Download complete!")
+                site_policy.record_success(site)
+                report = savings_report(self.full_bytes, self.final_file) if self.clip else ''
+                if report:
+                    print(f"DEBUG: DownloadThread - {report}", flush=True)
+                self.finished.emit(f"Download complete! {report}".strip())
                 return
             except Exception as e:
+                self._release_reservation()
+                if isinstance(e, InsufficientDiskSpace):
+                    # Other cookies or proxies won't free up the disk
+                    print(f"DEBUG: DownloadThread - {e}", flush=True)
+                    if pooled_proxy:
+                        pool.release(pooled_proxy, 0, time.monotonic() - attempt_start)
+                    self._discard_staging()
+                    self._record_history(STATUS_FAILED, error_class=ERROR_DISK_SPACE)
+                    self.error.emit(str(e))
+                    return
+                code = last_code = classify_error(e)
+                if pooled_proxy:
+                    pool.release(pooled_proxy, sum(attempt_bytes.values()),
+                                 time.monotonic() - attempt_start, failed=code == ERROR_NETWORK)
+                if self.is_interrupted():
+                    self._finish_interrupted()
+                    return
                 error_str = str(e)
                 print(f"DEBUG: DownloadThread - Attempt failed: {error_str[:200]}", flush=True)
+                if pooled_proxy and code == ERROR_NETWORK and proxy_failovers < len(pool):
+                    # Retry the same approach through another proxy
+                    proxy_failovers += 1
+                    self.status.emit("Proxy failed, switching to another proxy...")
+                    approaches.insert(0, opts)
+                    continue
+                if site_policy.record_failure(site, code) or code == ERROR_NETWORK:
+                    # Other cookie sources won't get past a block or a dead network
+                    break
                 continue
         
         # If YouTube download failed, try Invidious as fallback
-        if is_youtube_url(self.url):
+        # (whole files only - not for clips)
+        if is_youtube_url(self.url) and not self.clip:
             video_id = get_youtube_video_id(self.url)
             if video_id:
                 print(f"DEBUG: YouTube blocked, trying Invidious fallback...", flush=True)
                 self.status.emit("YouTube blocked, trying Invidious...")
                 try:
-                    # Create progress hook for Invidious download
-                    def invidious_progress(percent):
-                        self.progress.emit(percent)
-                    
+                    hasher = new_hasher()
+                    self._item_started = time.monotonic()
+                    # Staged like the yt-dlp path: .part and partial writes stay off the output folder
                     output_file, title = download_via_invidious(
                         video_id, 
-                        self.output_template,
-                        invidious_progress,
-                        self.status.emit
+                        output_template,
+                        self._report_progress,
+                        self.status.emit,
+                        should_stop=self.is_interrupted,
+                        part_files=self.tmp_files,
+                        format_spec=self.format_spec,
+                        hasher=hasher
                     )
+                    self._item_bytes = {output_file: os.path.getsize(output_file)}
+                    digest = hasher.hexdigest()
+                    if self.format_spec == AUDIO_MP3_SPEC:
+                        # The fallback fetched the audio-only stream - encode it like the yt-dlp path
+                        self.status.emit("Converting to MP3...")
+                        output_file = encode_mp3_file(output_file, should_stop=self.is_interrupted)
+                        digest = None
+                    if archive is not None:
+                        archive.record('Youtube', video_id)
+                    self.resolved_info = {'extractor_key': 'Youtube', 'id': video_id, 'title': title}
+                    self._on_file_done(output_file, digest)
+                    self._discard_staging()
                     self.finished.emit(f"Download complete: {title}")
                     return
+                except yt_dlp.utils.DownloadCancelled:
+                    self._finish_interrupted()
+                    return
                 except Exception as inv_err:
                     print(f"DEBUG: Invidious download failed: {inv_err}", flush=True)
         
-        self.error.emit("Download failed. The video site may be blocking requests.")
\ No newline at end of file
+        self._discard_staging()
+        self._record_history(STATUS_FAILED, error_class=last_code or (
+            ERROR_CIRCUIT_OPEN if site_policy.retry_after(site) > 0 else ERROR_UNKNOWN))
+        if site_policy.retry_after(site) > 0:
+            self.error.emit(circuit_open_message(site))
+        else:
+            self.error.emit("Download failed. The video site may be blocking requests.")
\ No newline at end of file
@@ -0,0 +1,335 @@
+# Priority download queue for Fast-Horse-2026
+# Runs DownloadThreads by priority, preempting lower-priority jobs when needed
+
+import heapq
+import itertools
+import os
+import time
+import uuid
+from PySide6.QtCore import QObject, QTimer, Signal
+from .download_manager import DownloadThread, DOWNLOAD_SOCKET_TIMEOUT, remove_partial_files, cleanup_temp_files
+from .config import get_config
+from .staging import staging_enabled, staging_full, job_staging_dir, remove_job_staging
+
+# Job priorities (higher runs first)
+PRIORITY_LOW = 0
+PRIORITY_NORMAL = 1
+PRIORITY_HIGH = 2
+
+# Job states
+STATE_QUEUED = 'queued'
+STATE_RUNNING = 'running'
+STATE_PAUSED = 'paused'
+STATE_FINISHED = 'finished'
+STATE_FAILED = 'failed'
+STATE_CANCELLED = 'cancelled'
+
+# How often a queue held back by a full staging directory checks again
+STAGING_RETRY_MS = 5000
+# A pause can block for up to the socket timeout on a stalled connection
+SHUTDOWN_TIMEOUT_MS = (DOWNLOAD_SOCKET_TIMEOUT + 5) * 1000
+
+
+class DownloadJob:
+    """A queued download and its scheduling state"""
+
+    def __init__(self, job_id, url, format_spec, output_template, threads=1,
+                 priority=PRIORITY_NORMAL, skip_archived=False, clip=None):
+        self.job_id = job_id
+        self.url = url
+        self.format_spec = format_spec
+        self.output_template = output_template
+        self.threads = threads
+        self.priority = priority
+        self.skip_archived = skip_archived
+        # (start, end) in seconds to download only part of the video; end may be None
+        self.clip = tuple(clip) if clip else None
+        self.state = STATE_QUEUED
+        self.progress = 0.0
+        # Resume data from the last checkpoint
+        self.resolved_format = None
+        self.tmp_path = None
+        # Set while the job is being paused to make room for another job
+        self.preempted = False
+
+
+class DownloadQueue(QObject):
+    """Schedules download jobs by priority with pause/resume and cancel
+
+    A paused or preempted job keeps its .part files, so when it is started
+    again yt-dlp continues with ranged requests instead of starting over.
+    If a journal is given, job specs, states and checkpoints are recorded so
+    restore() can pick up unfinished jobs after a crash or restart.
+    """
+
+    job_added = Signal(str)
+    job_state_changed = Signal(str, str)
+    job_progress = Signal(str, float)
+    job_status = Signal(str, str)
+    job_finished = Signal(str, str)
+    job_error = Signal(str, str)
+
+    def __init__(self, parent=None, max_active=1, journal=None):
+        super().__init__(parent)
+        self.max_active = max_active
+        self.journal = journal
+        self.jobs = {}
+        self._pending = []  # heap of (-priority, seq, job_id)
+        self._threads = {}  # job_id -> running DownloadThread
+        self._seq = itertools.count()
+        self._shutting_down = False
+        # Retries scheduling while the staging directory is full
+        self._staging_timer = QTimer(self)
+        self._staging_timer.setSingleShot(True)
+        self._staging_timer.setInterval(STAGING_RETRY_MS)
+        self._staging_timer.timeout.connect(self._schedule)
+
+    def submit(self, url, format_spec, output_template, threads=1, priority=PRIORITY_NORMAL,
+               skip_archived=False, clip=None):
+        """Add a download job and start it if a slot is free (or can be freed)"""
+        job = DownloadJob(uuid.uuid4().hex[:12], url, format_spec, output_template,
+                          threads, priority, skip_archived, clip)
+        self.jobs[job.job_id] = job
+        if self.journal:
+            self.journal.record_submit(job)
+        self.job_added.emit(job.job_id)
+        self._enqueue(job)
+        self._schedule()
+        return job
+
+    def restore(self):
+        """Re-create unfinished jobs from the journal; returns them
+
+        Jobs that were running or queued are queued again; jobs the user
+        had paused stay paused.
+        """
+        if not self.journal:
+            return []
+        restored = []
+        for entry in self.journal.pending_jobs():
+            job = DownloadJob(entry['job_id'], entry['url'], entry['format_spec'],
+                              entry['output_template'], entry.get('threads', 1),
+                              entry.get('priority', PRIORITY_NORMAL),
+                              entry.get('skip_archived', False),
+                              entry.get('clip'))
+            job.resolved_format = entry.get('resolved_format')
+            job.tmp_path = entry.get('tmp_path')
+            total = entry.get('total_bytes') or 0
+            if total and job.tmp_path and os.path.exists(job.tmp_path):
+                job.progress = min(100.0, os.path.getsize(job.tmp_path) * 100.0 / total)
+                print(f"DEBUG: DownloadQueue - Re-attaching {job.job_id} to {job.tmp_path}", flush=True)
+            self.jobs[job.job_id] = job
+            self.job_added.emit(job.job_id)
+            if entry.get('state') == STATE_PAUSED:
+                self._set_state(job, STATE_PAUSED)
+            else:
+                self._enqueue(job)
+            restored.append(job)
+        self.journal.compact()
+        self._schedule()
+        return restored
+
+    def pause(self, job_id):
+        """Pause a queued or running job; its partial data is kept"""
+        job = self.jobs.get(job_id)
+        if not job or job.state not in (STATE_QUEUED, STATE_RUNNING):
+            return
+        if job.state == STATE_RUNNING:
+            job.preempted = False
+            self._threads[job_id].pause()
+        else:
+            self._remove_pending(job_id)
+            self._set_state(job, STATE_PAUSED)
+
+    def resume(self, job_id):
+        """Put a paused job back into the queue"""
+        job = self.jobs.get(job_id)
+        if not job or job.state != STATE_PAUSED:
+            return
+        self._enqueue(job)
+        self._schedule()
+
+    def cancel(self, job_id):
+        """Cancel a job and discard its partial files"""
+        job = self.jobs.get(job_id)
+        if not job or job.state in (STATE_FINISHED, STATE_FAILED, STATE_CANCELLED):
+            return
+        if job.state == STATE_RUNNING:
+            self._threads[job_id].cancel()
+        else:
+            self._remove_pending(job_id)
+            self._discard_files(job)
+            self._set_state(job, STATE_CANCELLED)
+
+    def _discard_files(self, job):
+        """Delete what a paused or queued job left on disk (a running job's thread does this itself)"""
+        config = get_config()
+        if staging_enabled(config):
+            remove_job_staging(job_staging_dir(config, job.job_id))
+        if job.tmp_path:
+            remove_partial_files([job.tmp_path])
+            cleanup_temp_files(job.output_template, [job.tmp_path])
+
+    def set_priority(self, job_id, priority):
+        """Change the priority of a job, preempting others if it now outranks them"""
+        job = self.jobs.get(job_id)
+        if not job:
+            return
+        job.priority = priority
+        if job.state == STATE_QUEUED:
+            self._remove_pending(job_id)
+            self._enqueue(job)
+        self._schedule()
+
+    def active_jobs(self):
+        """Return the jobs that currently own a download thread"""
+        return [self.jobs[job_id] for job_id in self._threads]
+
+    def shutdown(self, timeout_ms=SHUTDOWN_TIMEOUT_MS):
+        """Stop running jobs and wait (bounded) for their threads to exit
+
+        Running jobs are paused rather than cancelled so their .part files
+        survive for the next session. Returns False if a thread is still
+        running at the deadline; it is never terminated (it may hold the GIL
+        or a database lock), so the caller should end the process instead.
+        """
+        self._shutting_down = True
+        self._pending = []
+        deadline = time.monotonic() + timeout_ms / 1000
+        for job_id, thread in list(self._threads.items()):
+            # Interrupted by exit, not by the user: resume next session
+            self.jobs[job_id].preempted = True
+            if self.journal:
+                self.journal.record_state(job_id, STATE_QUEUED)
+            thread.pause()
+        stopped = True
+        for job_id, thread in list(self._threads.items()):
+            remaining = max(0, int((deadline - time.monotonic()) * 1000))
+            if not thread.wait(remaining):
+                print(f"DEBUG: DownloadQueue - Thread for {job_id} did not stop in time", flush=True)
+                stopped = False
+        return stopped
+
+    def _enqueue(self, job):
+        job.preempted = False
+        heapq.heappush(self._pending, (-job.priority, next(self._seq), job.job_id))
+        self._set_state(job, STATE_QUEUED)
+
+    def _remove_pending(self, job_id):
+        self._pending = [entry for entry in self._pending if entry[2] != job_id]
+        heapq.heapify(self._pending)
+
+    def _set_state(self, job, state):
+        job.state = state
+        if self.journal and not self._shutting_down:
+            self.journal.record_state(job.job_id, state)
+        self.job_state_changed.emit(job.job_id, state)
+
+    def _schedule(self):
+        """Start queued jobs in priority order, preempting if necessary"""
+        if self._shutting_down:
+            return
+        while self._pending and len(self._threads) < self.max_active:
+            # Backpressure: hold new jobs while staging is full (unless nothing
+            # is running - then nothing would ever free it)
+            if self._threads and staging_full(get_config()):
+                print("DEBUG: DownloadQueue - Staging directory full, holding queued jobs", flush=True)
+                self._staging_timer.start()
+                return
+            _, _, job_id = heapq.heappop(self._pending)
+            self._start(self.jobs[job_id])
+
+        if not self._pending:
+            return
+
+        # Preempt the lowest-priority running job if a queued job outranks it
+        top_priority = -self._pending[0][0]
+        candidates = [job for job in self.active_jobs() if not job.preempted]
+        if not candidates:
+            return
+        lowest = min(candidates, key=lambda j: j.priority)
+        if lowest.priority < top_priority:
+            print(f"DEBUG: DownloadQueue - Preempting {lowest.job_id}", flush=True)
+            lowest.preempted = True
+            self._threads[lowest.job_id].pause()
+
+    def _start(self, job):
+        thread = DownloadThread(job.url, job.format_spec, job.output_template, job.threads,
+                                resolved_format=job.resolved_format,
+                                skip_archived=job.skip_archived,
+                                clip=job.clip,
+                                config=get_config())
+        thread.job_id = job.job_id
+        # Bound methods so the slots run on this object's (GUI) thread
+        thread.progress.connect(self._on_progress)
+        thread.status.connect(self._on_status)
+        thread.finished.connect(self._on_finished)
+        thread.error.connect(self._on_error)
+        thread.paused.connect(self._on_paused)
+        thread.cancelled.connect(self._on_cancelled)
+        thread.checkpoint.connect(self._on_checkpoint)
+        self._threads[job.job_id] = thread
+        self._set_state(job, STATE_RUNNING)
+        thread.start()
+
+    def _sender_job_id(self):
+        return getattr(self.sender(), 'job_id', None)
+
+    def _release(self, job_id):
+        thread = self._threads.pop(job_id, None)
+        if thread is not None:
+            thread.wait()
+            thread.deleteLater()
+
+    def _on_progress(self, value):
+        job_id = self._sender_job_id()
+        if job_id in self.jobs:
+            self.jobs[job_id].progress = value
+            self.job_progress.emit(job_id, value)
+
+    def _on_checkpoint(self, checkpoint):
+        job = self.jobs.get(self._sender_job_id())
+        if not job:
+            return
+        if 'resolved_format' in checkpoint:
+            job.resolved_format = checkpoint['resolved_format']
+        if checkpoint.get('tmp_path'):
+            job.tmp_path = checkpoint['tmp_path']
+        if self.journal:
+            self.journal.record_checkpoint(job.job_id, checkpoint)
+
+    def _on_status(self, text):
+        job_id = self._sender_job_id()
+        if job_id in self.jobs:
+            self.job_status.emit(job_id, text)
+
+    def _on_finished(self, message):
+        job_id = self._sender_job_id()
+        self._release(job_id)
+        self._set_state(self.jobs[job_id], STATE_FINISHED)
+        self.job_finished.emit(job_id, message)
+        self._schedule()
+
+    def _on_error(self, error):
+        job_id = self._sender_job_id()
+        self._release(job_id)
+        self._set_state(self.jobs[job_id], STATE_FAILED)
+        self.job_error.emit(job_id, error)
+        self._schedule()
+
+    def _on_paused(self):
+        job_id = self._sender_job_id()
+        self._release(job_id)
+        job = self.jobs[job_id]
+        if job.preempted:
+            # Preempted jobs go straight back into the queue
+            self._enqueue(job)
+        else:
+            self._set_state(job, STATE_PAUSED)
+        self._schedule()
+
+    def _on_cancelled(self):
+        job_id = self._sender_job_id()
+        self._release(job_id)
+        self._set_state(self.jobs[job_id], STATE_CANCELLED)
+        self._schedule()
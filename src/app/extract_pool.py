@@ -0,0 +1,144 @@
+# Process-pool extraction for Fast-Horse-2026
+# Runs yt-dlp extraction in worker processes so it does not contend with the GUI for the GIL
+
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+# Fields kept from an info dict / playlist entry when sending it back over IPC
+INFO_FIELDS = (
+    'id', 'title', 'duration', 'uploader', 'uploader_id', 'channel', 'view_count',
+    'thumbnail', 'webpage_url', 'original_url', 'extractor', 'extractor_key',
+    'ie_key', '_type', 'url', 'upload_date', 'playlist_count', 'format_id',
+)
+FORMAT_FIELDS = (
+    'format_id', 'format_note', 'ext', 'width', 'height', 'fps', 'vcodec', 'acodec',
+    'filesize', 'filesize_approx', 'tbr', 'abr', 'vbr', 'protocol',
+)
+
+
+class RemoteExtractionError(Exception):
+    """An extraction error raised in a worker process
+
+    Carries the HTTP status (if any) so site_policy.classify_error() sees
+    the same information as for an in-process error.
+    """
+
+    def __init__(self, message, status=None):
+        super().__init__(message)
+        self.status = status
+
+
+def compact_info(info):
+    """Reduce an info dict to the fields the app uses, with plain lists"""
+    if not info:
+        return info
+    compact = {k: info[k] for k in INFO_FIELDS if info.get(k) is not None}
+    if info.get('formats'):
+        compact['formats'] = [{k: f[k] for k in FORMAT_FIELDS if f.get(k) is not None}
+                              for f in info['formats']]
+    if info.get('entries') is not None:
+        compact['entries'] = [compact_info(e) for e in info['entries'] if e]
+    if info.get('thumbnails'):
+        compact['thumbnails'] = [{k: t[k] for k in ('url', 'width', 'height') if t.get(k) is not None}
+                                 for t in info['thumbnails']]
+    return compact
+
+
+def _init_worker():
+    # Same application name as the GUI process, so data/cache paths match
+    from PySide6.QtCore import QCoreApplication
+    QCoreApplication.setApplicationName("Fast-Horse-2026")
+
+
+def _extract_in_worker(url, ydl_opts, kwargs):
+    """Worker entry point: extract and return (compact info, error)"""
+    from .ydl_pool import get_ydl_pool
+    from .url_router import extract_routed
+    try:
+        with get_ydl_pool().checkout(ydl_opts) as ydl:
+            info = extract_routed(ydl, url, download=False, **kwargs)
+            return compact_info(ydl.sanitize_info(info)), None
+    except Exception as e:
+        # Exceptions with tracebacks do not pickle reliably - send what classify_error needs
+        status = None
+        messages = []
+        error = e
+        while error is not None and len(messages) < 5:
+            messages.append(str(error))
+            status = status or getattr(error, 'status', None) or getattr(error, 'code', None)
+            exc_info = getattr(error, 'exc_info', None)
+            error = exc_info[1] if isinstance(exc_info, tuple) and len(exc_info) > 1 else error.__cause__
+        return None, ('\n'.join(messages), status if isinstance(status, int) else None)
+
+
+class ExtractPool:
+    """Worker processes that run yt-dlp extraction
+
+    Each worker keeps its own warm YoutubeDL pool and uses the shared cache
+    directory. Processes are started with 'spawn' - forking a process that
+    runs Qt threads is not safe.
+    """
+
+    def __init__(self, max_workers=None):
+        self.max_workers = max_workers or max(1, (os.cpu_count() or 2) - 1)
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context('spawn'),
+                    initializer=_init_worker,
+                )
+            return self._executor
+
+    def submit(self, url, ydl_opts, **kwargs):
+        """Start an extraction; returns a Future of (compact info, error)"""
+        return self._get_executor().submit(_extract_in_worker, url, ydl_opts, kwargs)
+
+    def extract(self, url, ydl_opts, **kwargs):
+        """Extract in a worker and return the compact info dict (blocking)"""
+        info, error = self.submit(url, ydl_opts, **kwargs).result()
+        if error:
+            raise RemoteExtractionError(*error)
+        return info
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_extract_pool():
+    """Return the shared ExtractPool (worker processes start on first use)"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ExtractPool()
+        return _pool
+
+
+def shutdown_extract_pool():
+    with _pool_lock:
+        pool = _pool
+    if pool is not None:
+        pool.shutdown()
+
+
+def extract_info(url, ydl_opts, use_processes=False, **kwargs):
+    """Extract info in a worker process or in this thread with a pooled YoutubeDL"""
+    if use_processes:
+        return get_extract_pool().extract(url, ydl_opts, **kwargs)
+    from .ydl_pool import get_ydl_pool
+    from .url_router import extract_routed
+    with get_ydl_pool().checkout(ydl_opts) as ydl:
+        return extract_routed(ydl, url, download=False, **kwargs)
@@ -0,0 +1,97 @@
+# Format ranking for Fast-Horse-2026
+# Numeric quality keys for formats that are downloaded as a single file (e.g. Invidious streams)
+
+import re
+from collections import namedtuple
+from .audio_pipeline import is_audio_spec
+
+KIND_MUXED = 'muxed'
+KIND_VIDEO = 'video'
+KIND_AUDIO = 'audio'
+
+# Higher is better at the same resolution/bitrate: newer codecs are smaller for the same quality
+VIDEO_CODEC_RANK = {'av01': 3, 'vp9': 2, 'vp09': 2, 'avc1': 1, 'h264': 1}
+AUDIO_CODEC_RANK = {'opus': 3, 'mp4a': 2, 'aac': 2, 'vorbis': 1}
+
+# Audio bitrates within the same bucket (kbps) count as equal quality
+AUDIO_BITRATE_BUCKET = 32
+
+_HEIGHT_LIMIT_RE = re.compile(r'height<=(\d+)')
+
+RankedFormat = namedtuple('RankedFormat', 'kind height fps tbr codec_rank size format')
+
+
+def _codec_rank(codec, ranks):
+    codec = (codec or '').lower()
+    return next((rank for prefix, rank in ranks.items() if codec.startswith(prefix)), 0)
+
+
+def _number(value):
+    try:
+        return float(value or 0)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def rank_format(fmt, duration=0):
+    """Parse a yt-dlp style format dict into numeric ranking keys"""
+    vcodec = fmt.get('vcodec') or 'none'
+    acodec = fmt.get('acodec') or 'none'
+    if vcodec != 'none' and acodec != 'none':
+        kind = KIND_MUXED
+    elif vcodec != 'none':
+        kind = KIND_VIDEO
+    else:
+        kind = KIND_AUDIO
+
+    tbr = _number(fmt.get('tbr'))
+    size = int(_number(fmt.get('filesize') or fmt.get('filesize_approx')))
+    if not size and tbr and duration:
+        size = int(tbr * 1000 / 8 * duration)
+    if kind == KIND_AUDIO:
+        codec_rank = _codec_rank(acodec, AUDIO_CODEC_RANK)
+    else:
+        codec_rank = _codec_rank(vcodec, VIDEO_CODEC_RANK)
+    return RankedFormat(kind, int(_number(fmt.get('height'))), int(_number(fmt.get('fps'))),
+                        tbr, codec_rank, size, fmt)
+
+
+def _quality_key(ranked):
+    """Sort key: quality first, then the smaller file at equal quality"""
+    # Unknown sizes sort after known ones at the same quality
+    size_key = -ranked.size if ranked.size else float('-inf')
+    if ranked.kind == KIND_AUDIO:
+        return (int(ranked.tbr // AUDIO_BITRATE_BUCKET), size_key, ranked.codec_rank)
+    return (ranked.height, ranked.fps, size_key, ranked.codec_rank)
+
+
+class FormatIndex:
+    """Formats split into muxed, video-only and audio-only lists, best first"""
+
+    def __init__(self, formats, duration=0):
+        self.muxed = []
+        self.video = []
+        self.audio = []
+        groups = {KIND_MUXED: self.muxed, KIND_VIDEO: self.video, KIND_AUDIO: self.audio}
+        for fmt in formats:
+            if fmt.get('url'):
+                ranked = rank_format(fmt, duration)
+                groups[ranked.kind].append(ranked)
+        for group in groups.values():
+            group.sort(key=_quality_key, reverse=True)
+
+    def best(self, format_spec='best'):
+        """Best single-file format for a format combo spec, or None
+
+        Audio specs pick an audio-only stream. Video specs pick a muxed
+        stream (video-only streams have no sound) no taller than the spec's
+        height limit, falling back to the smallest muxed stream.
+        """
+        if is_audio_spec(format_spec):
+            return self.audio[0].format if self.audio else None
+        match = _HEIGHT_LIMIT_RE.search(format_spec or '')
+        max_height = int(match.group(1)) if match else None
+        for ranked in self.muxed:
+            if max_height is None or ranked.height <= max_height:
+                return ranked.format
+        return self.muxed[-1].format if self.muxed else None
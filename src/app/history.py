@@ -0,0 +1,269 @@
+# Download history for Fast-Horse-2026
+# One SQLite row per finished or failed download, searchable by title, uploader, date and site
+
+import sqlite3
+import threading
+import time
+from PySide6.QtCore import Qt, QAbstractTableModel, QModelIndex
+from .paths import get_data_path
+
+STATUS_FINISHED = 'finished'
+STATUS_FAILED = 'failed'
+
+# Rows per page when browsing history
+HISTORY_PAGE_SIZE = 200
+
+COLUMNS = (
+    'finished_at', 'title', 'uploader', 'site', 'extractor', 'video_id', 'url', 'format_id',
+    'size_bytes', 'duration', 'elapsed', 'throughput', 'output_path', 'status', 'error_class',
+)
+
+
+class HistoryStore:
+    """SQLite (WAL) store of past downloads
+
+    Title and uploader searches use an FTS5 index when the SQLite build has
+    it (prefix matching per word), otherwise a LIKE scan. Site, uploader and
+    date have B-tree indexes. Pages are read with keyset pagination on
+    (finished_at, id), so a page deep in the history costs the same as the
+    first one.
+    """
+
+    def __init__(self, path=None):
+        self.path = path or get_data_path('history.db')
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS downloads ('
+            ' id INTEGER PRIMARY KEY AUTOINCREMENT,'
+            ' finished_at REAL NOT NULL,'
+            ' title TEXT,'
+            ' uploader TEXT,'
+            ' site TEXT,'
+            ' extractor TEXT,'
+            ' video_id TEXT,'
+            ' url TEXT NOT NULL,'
+            ' format_id TEXT,'
+            ' size_bytes INTEGER,'
+            ' duration REAL,'
+            ' elapsed REAL,'
+            ' throughput REAL,'
+            ' output_path TEXT,'
+            ' status TEXT NOT NULL,'
+            ' error_class TEXT)'
+        )
+        self._conn.execute('CREATE INDEX IF NOT EXISTS idx_history_date ON downloads(finished_at, id)')
+        self._conn.execute('CREATE INDEX IF NOT EXISTS idx_history_site ON downloads(site, finished_at)')
+        self._conn.execute('CREATE INDEX IF NOT EXISTS idx_history_uploader ON downloads(uploader COLLATE NOCASE)')
+        self._conn.execute('CREATE INDEX IF NOT EXISTS idx_history_title ON downloads(title COLLATE NOCASE)')
+        self.has_fts = self._create_fts()
+        self._conn.commit()
+
+    def _create_fts(self):
+        """External-content FTS5 index over title and uploader, kept in sync by triggers"""
+        try:
+            self._conn.execute(
+                'CREATE VIRTUAL TABLE IF NOT EXISTS downloads_fts USING fts5('
+                'title, uploader, content=downloads, content_rowid=id)'
+            )
+        except sqlite3.OperationalError:
+            # SQLite built without FTS5
+            return False
+        self._conn.execute(
+            'CREATE TRIGGER IF NOT EXISTS downloads_ai AFTER INSERT ON downloads BEGIN'
+            ' INSERT INTO downloads_fts(rowid, title, uploader) VALUES (new.id, new.title, new.uploader);'
+            ' END'
+        )
+        self._conn.execute(
+            'CREATE TRIGGER IF NOT EXISTS downloads_ad AFTER DELETE ON downloads BEGIN'
+            " INSERT INTO downloads_fts(downloads_fts, rowid, title, uploader)"
+            " VALUES ('delete', old.id, old.title, old.uploader);"
+            ' END'
+        )
+        return True
+
+    def record(self, **entry):
+        """Add one download; keys are names from COLUMNS"""
+        entry.setdefault('finished_at', time.time())
+        names = [name for name in COLUMNS if name in entry]
+        with self._lock:
+            cursor = self._conn.execute(
+                f"INSERT INTO downloads ({', '.join(names)}) VALUES ({', '.join('?' * len(names))})",
+                [entry[name] for name in names]
+            )
+            self._conn.commit()
+        return cursor.lastrowid
+
+    def _where(self, text='', site=None, since=None, until=None):
+        clauses, params = [], []
+        text = (text or '').strip()
+        if text:
+            if self.has_fts:
+                # Every word as a quoted prefix term: 'lofi beats' -> "lofi"* "beats"*
+                query = ' '.join('"%s"*' % word.replace('"', '""') for word in text.split())
+                clauses.append('id IN (SELECT rowid FROM downloads_fts WHERE downloads_fts MATCH ?)')
+                params.append(query)
+            else:
+                clauses.append('(title LIKE ? OR uploader LIKE ?)')
+                params.extend([f'%{text}%'] * 2)
+        if site:
+            clauses.append('site = ?')
+            params.append(site)
+        if since is not None:
+            clauses.append('finished_at >= ?')
+            params.append(since)
+        if until is not None:
+            clauses.append('finished_at < ?')
+            params.append(until)
+        return clauses, params
+
+    def search(self, text='', site=None, since=None, until=None, after=None, limit=HISTORY_PAGE_SIZE):
+        """One page of matching downloads, newest first
+
+        after is the (finished_at, id) of the last row of the previous page.
+        Rows are dicts with 'id' plus the COLUMNS keys.
+        """
+        clauses, params = self._where(text, site, since, until)
+        if after is not None:
+            clauses.append('(finished_at, id) < (?, ?)')
+            params.extend(after)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ''
+        with self._lock:
+            cursor = self._conn.execute(
+                f"SELECT id, {', '.join(COLUMNS)} FROM downloads {where}"
+                ' ORDER BY finished_at DESC, id DESC LIMIT ?',
+                params + [limit]
+            )
+            names = [column[0] for column in cursor.description]
+            return [dict(zip(names, row)) for row in cursor.fetchall()]
+
+    def count(self, text='', site=None, since=None, until=None):
+        clauses, params = self._where(text, site, since, until)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ''
+        with self._lock:
+            return self._conn.execute(f'SELECT COUNT(*) FROM downloads {where}', params).fetchone()[0]
+
+    def sites(self):
+        """Sites that appear in the history, for the filter box"""
+        with self._lock:
+            rows = self._conn.execute(
+                'SELECT DISTINCT site FROM downloads WHERE site IS NOT NULL ORDER BY site'
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute('DELETE FROM downloads')
+            self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def format_size(num_bytes):
+    if not num_bytes:
+        return ''
+    if num_bytes >= 1073741824:
+        return f"{num_bytes / 1073741824:.2f} GB"
+    return f"{num_bytes / 1048576:.1f} MB"
+
+
+class HistoryModel(QAbstractTableModel):
+    """Table model over HistoryStore that loads one page at a time
+
+    The view asks for more rows (canFetchMore/fetchMore) as it scrolls
+    towards the end, so only the pages that were looked at are in memory.
+    """
+
+    # (header translation key, row -> display text)
+    VIEW_COLUMNS = (
+        ('history_col_date', lambda row: time.strftime('%Y-%m-%d %H:%M', time.localtime(row['finished_at']))),
+        ('history_col_title', lambda row: row['title'] or row['url']),
+        ('history_col_uploader', lambda row: row['uploader'] or ''),
+        ('history_col_site', lambda row: row['site'] or ''),
+        ('history_col_format', lambda row: row['format_id'] or ''),
+        ('history_col_size', lambda row: format_size(row['size_bytes'])),
+        ('history_col_speed', lambda row: f"{row['throughput'] / 1048576:.2f} MB/s" if row['throughput'] else ''),
+        ('history_col_status', lambda row: row['error_class'] or row['status']),
+    )
+
+    def __init__(self, store, translate, parent=None):
+        super().__init__(parent)
+        self.store = store
+        self.translate = translate
+        self._rows = []
+        self._filters = {}
+        self._exhausted = False
+
+    def set_filters(self, text='', site=None, since=None):
+        """Apply a new search and start over from the newest row"""
+        self._filters = {'text': text, 'site': site, 'since': since}
+        self.refresh()
+
+    def refresh(self):
+        self.beginResetModel()
+        self._rows = []
+        self._exhausted = False
+        self.endResetModel()
+        self.fetchMore(QModelIndex())
+
+    def total_count(self):
+        return self.store.count(**self._filters)
+
+    def row_data(self, row):
+        return self._rows[row]
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.VIEW_COLUMNS)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        row = self._rows[index.row()]
+        if role == Qt.DisplayRole:
+            return self.VIEW_COLUMNS[index.column()][1](row)
+        if role == Qt.ToolTipRole:
+            return row['output_path'] or row['url']
+        return None
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if orientation == Qt.Horizontal and role == Qt.DisplayRole:
+            return self.translate(self.VIEW_COLUMNS[section][0])
+        return None
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and not self._exhausted
+
+    def fetchMore(self, parent=QModelIndex()):
+        if parent.isValid() or self._exhausted:
+            return
+        after = None
+        if self._rows:
+            last = self._rows[-1]
+            after = (last['finished_at'], last['id'])
+        page = self.store.search(after=after, limit=HISTORY_PAGE_SIZE, **self._filters)
+        if len(page) < HISTORY_PAGE_SIZE:
+            self._exhausted = True
+        if page:
+            self.beginInsertRows(QModelIndex(), len(self._rows), len(self._rows) + len(page) - 1)
+            self._rows.extend(page)
+            self.endInsertRows()
+
+
+_history = None
+_history_lock = threading.Lock()
+
+
+def get_history():
+    """Return the shared HistoryStore (opened on first use)"""
+    global _history
+    with _history_lock:
+        if _history is None:
+            _history = HistoryStore()
+        return _history
@@ -0,0 +1,425 @@
+# Shared HTTP client for Fast-Horse-2026
+# Keep-alive connection pools, DNS cache, TLS session reuse and proxy support
+# for the requests the app makes itself (Invidious, thumbnails, short links)
+
+import base64
+import http.client
+import ipaddress
+import json
+import socket
+import ssl
+import struct
+import threading
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import unquote, urljoin, urlsplit
+from PySide6.QtCore import QObject, Signal
+from .config import get_config
+
+USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+DEFAULT_TIMEOUT = 10
+# Idle keep-alive connections kept per (scheme, host, port, proxy)
+MAX_IDLE_PER_HOST = 4
+# Idle connections older than this are closed rather than reused
+IDLE_TIMEOUT = 60
+# Seconds a DNS answer is reused
+DNS_TTL = 300
+MAX_REDIRECTS = 5
+# Threads for background fetches (thumbnails)
+FETCH_WORKERS = 4
+
+REDIRECT_STATUSES = (301, 302, 303, 307, 308)
+# Errors from a kept-alive connection the server closed while it was idle
+STALE_CONNECTION_ERRORS = (http.client.RemoteDisconnected, ConnectionResetError,
+                           ConnectionAbortedError, BrokenPipeError)
+
+
+class HttpError(Exception):
+    """HTTP error status or proxy failure; status is the HTTP status if any"""
+
+    def __init__(self, message, status=None):
+        super().__init__(message)
+        self.status = status
+
+
+def parse_proxy(proxy_url):
+    """Split a proxy URL into (scheme, host, port, username, password)"""
+    parts = urlsplit(proxy_url if '://' in proxy_url else 'http://' + proxy_url)
+    scheme = parts.scheme.lower()
+    if scheme == 'https':
+        # TLS to the proxy itself (and TLS inside that for HTTPS targets) is not implemented
+        raise HttpError(f"HTTPS proxies are not supported, use an http:// or socks5:// proxy: {proxy_url}")
+    if scheme not in ('http', 'socks5', 'socks5h') or not parts.hostname:
+        raise HttpError(f"Unsupported proxy: {proxy_url}")
+    port = parts.port or (1080 if scheme.startswith('socks') else 8080)
+    return (scheme, parts.hostname, port, unquote(parts.username or ''), unquote(parts.password or ''))
+
+
+def _recv_exact(sock, size):
+    data = b''
+    while len(data) < size:
+        chunk = sock.recv(size - len(data))
+        if not chunk:
+            raise HttpError("Proxy closed the connection")
+        data += chunk
+    return data
+
+
+def socks5_handshake(sock, host, port, username='', password=''):
+    """Ask a SOCKS5 proxy to connect sock to host:port (RFC 1928/1929)"""
+    methods = b'\x00\x02' if username else b'\x00'
+    sock.sendall(b'\x05' + bytes([len(methods)]) + methods)
+    version, method = _recv_exact(sock, 2)
+    if version != 5 or method == 0xFF:
+        raise HttpError("SOCKS5 proxy accepted none of the authentication methods")
+    if method == 2:
+        user, secret = username.encode('utf-8'), password.encode('utf-8')
+        sock.sendall(b'\x01' + bytes([len(user)]) + user + bytes([len(secret)]) + secret)
+        if _recv_exact(sock, 2)[1] != 0:
+            raise HttpError("SOCKS5 proxy authentication failed")
+    try:
+        address = ipaddress.ip_address(host)
+        target = (b'\x01' if address.version == 4 else b'\x04') + address.packed
+    except ValueError:
+        name = host.encode('idna')
+        target = b'\x03' + bytes([len(name)]) + name
+    sock.sendall(b'\x05\x01\x00' + target + struct.pack('>H', port))
+    reply = _recv_exact(sock, 4)
+    if reply[1] != 0:
+        raise HttpError(f"SOCKS5 proxy could not connect to {host}:{port} (code {reply[1]})")
+    # Skip the bound address
+    if reply[3] == 1:
+        _recv_exact(sock, 4 + 2)
+    elif reply[3] == 4:
+        _recv_exact(sock, 16 + 2)
+    else:
+        _recv_exact(sock, _recv_exact(sock, 1)[0] + 2)
+
+
+def _proxy_authorization(username, password):
+    token = base64.b64encode(f"{username}:{password}".encode('utf-8')).decode('ascii')
+    return f"Basic {token}"
+
+
+def http_tunnel(sock, host, port, username='', password=''):
+    """Open a CONNECT tunnel through an HTTP proxy"""
+    lines = [f"CONNECT {host}:{port} HTTP/1.1", f"Host: {host}:{port}"]
+    if username:
+        lines.append(f"Proxy-Authorization: {_proxy_authorization(username, password)}")
+    sock.sendall(('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1'))
+    response = http.client.HTTPResponse(sock, method='CONNECT')
+    response.begin()
+    if response.status != 200:
+        raise HttpError(f"Proxy refused tunnel to {host}:{port}: HTTP {response.status}", response.status)
+
+
+class _Connection(http.client.HTTPConnection):
+    """HTTP/1.1 connection whose socket is opened by the client (DNS cache, proxy, TLS)"""
+
+    def __init__(self, client, key, timeout):
+        super().__init__(key[1], key[2], timeout=timeout)
+        self.client = client
+        self.key = key
+        self.last_used = time.monotonic()
+
+    def connect(self):
+        self.sock = self.client._open_socket(self.key, self.timeout)
+
+    def close(self):
+        # Also called by http.client itself for "Connection: close" responses
+        self.client._remember_session(self)
+        super().close()
+
+
+class Response:
+    """A response body being read; closing it returns the connection to the pool"""
+
+    def __init__(self, client, conn, response, url):
+        self._client = client
+        self._conn = conn
+        self._response = response
+        self.url = url
+        self.status = response.status
+        self.headers = response.headers
+
+    def read(self, amt=None):
+        return self._response.read(amt)
+
+    def json(self):
+        return json.loads(self.read().decode('utf-8'))
+
+    def close(self):
+        conn, self._conn = self._conn, None
+        if conn is None:
+            return
+        if self._response.length == 0:
+            # HEAD or empty body - nothing left to read
+            self._response.read()
+        if self._response.isclosed() and not self._response.will_close:
+            # Body fully read - the connection can carry the next request
+            self._client._release(conn)
+        else:
+            self._response.close()
+            conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class HttpClient:
+    """Thread-safe HTTP/1.1 client shared by the app's direct HTTP paths
+
+    Idle keep-alive connections are pooled per (scheme, host, port, proxy)
+    and reused, so a series of requests to one host pays for the TCP and
+    TLS handshakes once. DNS answers are cached for DNS_TTL, and TLS
+    sessions are kept per host so a new connection can resume instead of
+    doing a full handshake. Proxies follow the app setting (get_proxy_url):
+    HTTP proxies (CONNECT for HTTPS), SOCKS5 with local DNS and SOCKS5h
+    with proxy-side DNS; an empty setting means the system proxy.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._idle = {}  # pool key -> idle connections, most recent last
+        self._dns = {}  # (host, port) -> (expires, addrinfo list)
+        self._tls_sessions = {}  # (host, port) -> ssl.SSLSession
+        self._ssl_context = ssl.create_default_context()
+        self._executor = None
+        self.stats = {'opened': 0, 'reused': 0, 'tls_resumed': 0, 'dns_hits': 0, 'dns_misses': 0}
+
+    def request(self, url, method='GET', headers=None, timeout=DEFAULT_TIMEOUT, proxy_url=None,
+                follow_redirects=True):
+        """Send a request and return a Response (use it as a context manager)
+
+        proxy_url defaults to the current setting. Raises HttpError for
+        4xx/5xx statuses.
+        """
+        if proxy_url is None:
+            proxy_url = get_config().proxy_url
+        for _ in range(MAX_REDIRECTS + 1):
+            response = self._send(method, url, headers, timeout, proxy_url)
+            location = response.headers.get('Location')
+            if follow_redirects and response.status in REDIRECT_STATUSES and location:
+                # Drain the (small) redirect body so the connection can be reused
+                response.read()
+                response.close()
+                if response.status == 303 and method != 'HEAD':
+                    method = 'GET'
+                url = urljoin(url, location)
+                continue
+            if response.status >= 400:
+                response.close()
+                raise HttpError(f"HTTP {response.status} for {url}", response.status)
+            return response
+        raise HttpError(f"Too many redirects for {url}")
+
+    def get_json(self, url, headers=None, timeout=DEFAULT_TIMEOUT, proxy_url=None):
+        with self.request(url, headers=headers, timeout=timeout, proxy_url=proxy_url) as response:
+            return response.json()
+
+    def get_bytes(self, url, headers=None, timeout=DEFAULT_TIMEOUT, proxy_url=None):
+        with self.request(url, headers=headers, timeout=timeout, proxy_url=proxy_url) as response:
+            return response.read()
+
+    def fetch_async(self, url, headers=None, timeout=DEFAULT_TIMEOUT):
+        """GET url on a worker thread; returns a Future with the body"""
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(FETCH_WORKERS, thread_name_prefix='http-fetch')
+            executor = self._executor
+        return executor.submit(self.get_bytes, url, headers, timeout)
+
+    def close(self):
+        """Close idle connections and stop the fetch threads"""
+        with self._lock:
+            idle, self._idle = self._idle, {}
+            executor, self._executor = self._executor, None
+        for conns in idle.values():
+            for conn in conns:
+                conn.close()
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def _send(self, method, url, headers, timeout, proxy_url):
+        parts = urlsplit(url)
+        scheme = parts.scheme.lower()
+        if scheme not in ('http', 'https') or not parts.hostname:
+            raise HttpError(f"Unsupported URL: {url}")
+        port = parts.port or (443 if scheme == 'https' else 80)
+        proxy = self._proxy_for(scheme, parts.hostname, proxy_url)
+        key = (scheme, parts.hostname, port, proxy)
+
+        request_headers = {'User-Agent': USER_AGENT, 'Accept-Encoding': 'identity'}
+        request_headers.update(headers or {})
+        target = (parts.path or '/') + (f'?{parts.query}' if parts.query else '')
+        if proxy and proxy[0] == 'http' and scheme == 'http':
+            # Plain HTTP through an HTTP proxy: absolute-form request, no tunnel
+            target = url.split('#', 1)[0]
+            if proxy[3]:
+                request_headers['Proxy-Authorization'] = _proxy_authorization(proxy[3], proxy[4])
+
+        for attempt in range(2):
+            conn, reused = self._acquire(key, timeout)
+            try:
+                conn.request(method, target, headers=request_headers)
+                response = conn.getresponse()
+            except STALE_CONNECTION_ERRORS:
+                conn.close()
+                if reused and attempt == 0:
+                    continue
+                raise
+            except BaseException:
+                conn.close()
+                raise
+            return Response(self, conn, response, url)
+
+    def _proxy_for(self, scheme, host, proxy_url):
+        if proxy_url:
+            return parse_proxy(proxy_url)
+        # No proxy configured: the system proxy, like yt-dlp
+        if urllib.request.proxy_bypass(host):
+            return None
+        system = urllib.request.getproxies().get(scheme)
+        return parse_proxy(system) if system else None
+
+    def _acquire(self, key, timeout):
+        now = time.monotonic()
+        with self._lock:
+            conn = None
+            for pool_key, idle in list(self._idle.items()):
+                # Drop expired connections of every pool, and take one for this key
+                for stale in [c for c in idle if now - c.last_used >= IDLE_TIMEOUT]:
+                    idle.remove(stale)
+                    stale.close()
+                if pool_key == key and idle and conn is None:
+                    conn = idle.pop()
+                if not idle:
+                    del self._idle[pool_key]
+            if conn is not None and conn.sock is not None:
+                self.stats['reused'] += 1
+                conn.timeout = timeout
+                conn.sock.settimeout(timeout)
+                return conn, True
+            self.stats['opened'] += 1
+        return _Connection(self, key, timeout), False
+
+    def _remember_session(self, conn):
+        sock = conn.sock
+        if isinstance(sock, ssl.SSLSocket) and sock.session is not None:
+            # TLS 1.3 tickets arrive after the handshake - keep the latest one
+            with self._lock:
+                self._tls_sessions[(conn.key[1], conn.key[2])] = sock.session
+
+    def _release(self, conn):
+        conn.last_used = time.monotonic()
+        self._remember_session(conn)
+        sock = conn.sock
+        with self._lock:
+            idle = self._idle.setdefault(conn.key, [])
+            if len(idle) < MAX_IDLE_PER_HOST and sock is not None:
+                idle.append(conn)
+                return
+        conn.close()
+
+    def _resolve(self, host, port):
+        now = time.monotonic()
+        with self._lock:
+            cached = self._dns.get((host, port))
+            if cached and cached[0] > now:
+                self.stats['dns_hits'] += 1
+                return cached[1]
+            self.stats['dns_misses'] += 1
+        infos = socket.getaddrinfo(host, port, 0, socket.SOCK_STREAM)
+        with self._lock:
+            self._dns[(host, port)] = (now + DNS_TTL, infos)
+        return infos
+
+    def _create_connection(self, host, port, timeout):
+        error = None
+        for family, socktype, proto, _, address in self._resolve(host, port):
+            sock = socket.socket(family, socktype, proto)
+            try:
+                sock.settimeout(timeout)
+                sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+                sock.connect(address)
+                return sock
+            except OSError as e:
+                error = e
+                sock.close()
+        # The cached addresses may be stale - resolve again next time
+        with self._lock:
+            self._dns.pop((host, port), None)
+        raise error or OSError(f"Could not connect to {host}:{port}")
+
+    def _open_socket(self, key, timeout):
+        scheme, host, port, proxy = key
+        if proxy is None:
+            sock = self._create_connection(host, port, timeout)
+        else:
+            proxy_scheme, proxy_host, proxy_port, username, password = proxy
+            sock = self._create_connection(proxy_host, proxy_port, timeout)
+            try:
+                if proxy_scheme == 'socks5h':
+                    socks5_handshake(sock, host, port, username, password)
+                elif proxy_scheme == 'socks5':
+                    address = self._resolve(host, port)[0][4][0]
+                    socks5_handshake(sock, address, port, username, password)
+                elif scheme == 'https':
+                    http_tunnel(sock, host, port, username, password)
+            except BaseException:
+                sock.close()
+                raise
+        if scheme != 'https':
+            return sock
+        with self._lock:
+            session = self._tls_sessions.get((host, port))
+        try:
+            sock = self._ssl_context.wrap_socket(sock, server_hostname=host, session=session)
+        except BaseException:
+            sock.close()
+            raise
+        if sock.session_reused:
+            with self._lock:
+                self.stats['tls_resumed'] += 1
+        return sock
+
+
+class HttpFetcher(QObject):
+    """Runs GETs on the shared client's worker threads and reports on the GUI thread"""
+
+    # URL, response body (None if the request failed)
+    fetched = Signal(str, object)
+
+    def get(self, url, headers=None):
+        future = get_http_client().fetch_async(url, headers)
+        future.add_done_callback(lambda f, url=url: self._done(url, f))
+
+    def _done(self, url, future):
+        data = None
+        if not future.cancelled():
+            error = future.exception()
+            if error is None:
+                data = future.result()
+            else:
+                print(f"DEBUG: Fetch failed for {url}: {error}", flush=True)
+        try:
+            self.fetched.emit(url, data)
+        except RuntimeError:
+            pass  # Receiver already deleted (window closed)
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_http_client():
+    """Return the shared HttpClient"""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = HttpClient()
+        return _client
@@ -0,0 +1,100 @@
+# Crash-safe job journal for Fast-Horse-2026
+# Append-only SQLite (WAL) log of job specs, resolved formats and checkpoints
+
+import json
+import sqlite3
+import threading
+import time
+from .paths import get_data_path
+
+# States after which a job never needs to be resumed
+TERMINAL_STATES = ('finished', 'failed', 'cancelled')
+
+
+class JobJournal:
+    """Append-only journal of download jobs
+
+    Every change is a new row; the current state of a job is the result of
+    replaying its rows in order. This keeps writes cheap and crash-safe (a
+    torn write can only lose the last event), and lets a new session
+    re-create unfinished jobs with the same output template so yt-dlp
+    re-attaches to their .part files.
+    """
+
+    def __init__(self, path=None):
+        self.path = path or get_data_path('jobs.db')
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS journal ('
+            ' seq INTEGER PRIMARY KEY AUTOINCREMENT,'
+            ' job_id TEXT NOT NULL,'
+            ' event TEXT NOT NULL,'
+            ' data TEXT NOT NULL,'
+            ' ts REAL NOT NULL)'
+        )
+        self._conn.execute('CREATE INDEX IF NOT EXISTS idx_journal_job ON journal(job_id)')
+        self._conn.commit()
+
+    def append(self, job_id, event, **data):
+        """Append one event for a job"""
+        with self._lock:
+            self._conn.execute(
+                'INSERT INTO journal (job_id, event, data, ts) VALUES (?, ?, ?, ?)',
+                (job_id, event, json.dumps(data), time.time())
+            )
+            self._conn.commit()
+
+    def record_submit(self, job):
+        self.append(job.job_id, 'submit',
+                    url=job.url,
+                    format_spec=job.format_spec,
+                    output_template=job.output_template,
+                    threads=job.threads,
+                    priority=job.priority,
+                    skip_archived=job.skip_archived,
+                    clip=job.clip)
+
+    def record_state(self, job_id, state):
+        self.append(job_id, 'state', state=state)
+
+    def record_checkpoint(self, job_id, checkpoint):
+        """Record resolved format, temp file and byte progress of a running job"""
+        self.append(job_id, 'checkpoint', **checkpoint)
+
+    def replay(self):
+        """Rebuild every job's latest state from the journal, in submit order"""
+        jobs = {}
+        with self._lock:
+            rows = self._conn.execute(
+                'SELECT job_id, event, data FROM journal ORDER BY seq'
+            ).fetchall()
+        for job_id, event, data in rows:
+            try:
+                data = json.loads(data)
+            except ValueError:
+                continue
+            if event == 'submit':
+                jobs[job_id] = dict(data, job_id=job_id, state='queued')
+            elif job_id in jobs:
+                jobs[job_id].update(data)
+        return list(jobs.values())
+
+    def pending_jobs(self):
+        """Return jobs that were not finished, failed or cancelled"""
+        return [job for job in self.replay() if job.get('state') not in TERMINAL_STATES]
+
+    def compact(self):
+        """Drop the events of jobs that are done so the journal stays small"""
+        done = [job['job_id'] for job in self.replay() if job.get('state') in TERMINAL_STATES]
+        if not done:
+            return
+        with self._lock:
+            self._conn.executemany('DELETE FROM journal WHERE job_id = ?', [(j,) for j in done])
+            self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,302 @@
+# Job list for Fast-Horse-2026
+# Model/view list of playlist entries and queued jobs, with per-row progress
+
+from collections import OrderedDict, deque
+from PySide6.QtCore import Qt, QAbstractTableModel, QModelIndex, QObject, QSize, QTimer, Signal
+from PySide6.QtGui import QPixmap
+from PySide6.QtWidgets import QApplication, QStyle, QStyledItemDelegate, QStyleOptionProgressBar
+from .http_client import HttpFetcher
+from .ui_dispatcher import FRAME_INTERVAL_MS
+
+COL_TITLE = 0
+COL_DURATION = 1
+COL_STATE = 2
+COL_PROGRESS = 3
+
+# Progress (0-100) of a row, for the progress delegate
+PROGRESS_ROLE = Qt.UserRole + 1
+
+
+THUMBNAIL_SIZE = QSize(64, 36)
+# Scaled thumbnails kept in memory
+THUMBNAIL_CACHE_SIZE = 512
+THUMBNAIL_MAX_IN_FLIGHT = 4
+# Requests waiting for a slot; the oldest (scrolled out of view long ago) are dropped
+THUMBNAIL_MAX_PENDING = 64
+
+
+class ThumbnailCache(QObject):
+    """Loads thumbnails on demand, newest request first, and keeps an LRU of scaled pixmaps"""
+
+    loaded = Signal(str)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        # Fetched over the shared keep-alive pool - one connection per thumbnail host
+        self._fetcher = HttpFetcher(self)
+        self._fetcher.fetched.connect(self._on_fetched)
+        self._pixmaps = OrderedDict()
+        self._pending = deque(maxlen=THUMBNAIL_MAX_PENDING)
+        self._in_flight = set()
+        self._failed = set()
+
+    def get(self, url):
+        """Return the cached pixmap for url, or None and schedule a download"""
+        pixmap = self._pixmaps.get(url)
+        if pixmap is not None:
+            self._pixmaps.move_to_end(url)
+            return pixmap
+        if url not in self._in_flight and url not in self._failed and url not in self._pending:
+            self._pending.append(url)
+            self._start_next()
+        return None
+
+    def _start_next(self):
+        while self._pending and len(self._in_flight) < THUMBNAIL_MAX_IN_FLIGHT:
+            url = self._pending.pop()
+            self._in_flight.add(url)
+            self._fetcher.get(url)
+
+    def _on_fetched(self, url, data):
+        self._in_flight.discard(url)
+        pixmap = QPixmap()
+        if data and pixmap.loadFromData(data):
+            self._pixmaps[url] = pixmap.scaled(THUMBNAIL_SIZE, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+            if len(self._pixmaps) > THUMBNAIL_CACHE_SIZE:
+                self._pixmaps.popitem(last=False)
+            self.loaded.emit(url)
+        else:
+            self._failed.add(url)
+        self._start_next()
+
+
+def entry_thumbnail(entry):
+    """Smallest thumbnail URL of a flat playlist entry, or None"""
+    thumbnails = [t for t in entry.get('thumbnails') or [] if t.get('url')]
+    if thumbnails:
+        return min(thumbnails, key=lambda t: t.get('width') or 0)['url']
+    return entry.get('thumbnail')
+
+
+def format_duration(seconds):
+    if not seconds:
+        return ''
+    seconds = int(seconds)
+    hours, rest = divmod(seconds, 3600)
+    minutes, secs = divmod(rest, 60)
+    return f"{hours}:{minutes:02d}:{secs:02d}" if hours else f"{minutes}:{secs:02d}"
+
+
+class JobRow:
+    """One row: a playlist entry not queued yet (checkable) or a queued job"""
+
+    __slots__ = ('title', 'duration', 'thumbnail', 'entry', 'checked', 'job_id', 'state', 'progress')
+
+    def __init__(self, title, duration=None, thumbnail=None, entry=None, checked=True):
+        self.title = title
+        self.duration = duration
+        self.thumbnail = thumbnail
+        self.entry = entry
+        self.checked = checked
+        self.job_id = None
+        self.state = ''
+        self.progress = 0.0
+
+
+class JobListModel(QAbstractTableModel):
+    """Playlist entries and download jobs for a QTableView
+
+    Progress and state changes only mark rows dirty; a frame timer then
+    emits one dataChanged per run of adjacent dirty rows. A playlist with
+    thousands of entries therefore costs the view a repaint of the visible
+    rows per frame, however often the download threads report progress.
+    Thumbnails are requested only when the view asks for a row's
+    decoration, i.e. when the row becomes visible.
+    """
+
+    HEADERS = ('job_col_title', 'job_col_duration', 'job_col_state', 'job_col_progress')
+
+    def __init__(self, translate, thumbnails=None, parent=None):
+        super().__init__(parent)
+        self.translate = translate
+        self.thumbnails = thumbnails
+        self._rows = []
+        self._job_rows = {}  # job_id -> row index
+        self._thumbnail_rows = {}  # thumbnail URL -> row indexes
+        self._dirty = set()
+        self._flush_timer = QTimer(self)
+        self._flush_timer.setSingleShot(True)
+        self._flush_timer.setInterval(FRAME_INTERVAL_MS)
+        self._flush_timer.timeout.connect(self.flush)
+        if thumbnails is not None:
+            thumbnails.loaded.connect(self._on_thumbnail_loaded)
+
+    def set_entries(self, entries, skipped=(), show_thumbnails=True):
+        """Replace the not-yet-queued rows with a playlist's entries
+
+        Entries at the indexes in skipped (e.g. already downloaded) start
+        unchecked. Rows that belong to jobs are kept.
+        """
+        skipped = set(skipped)
+        self.beginResetModel()
+        self._rows = [row for row in self._rows if row.job_id]
+        for index, entry in enumerate(entries):
+            self._rows.append(JobRow(entry.get('title') or entry.get('url') or '', entry.get('duration'),
+                                     entry_thumbnail(entry) if show_thumbnails else None,
+                                     entry, index not in skipped))
+        self._reindex()
+        self.endResetModel()
+
+    def clear_entries(self):
+        self.set_entries([])
+
+    def add_job(self, job_id, title, state='', progress=0.0):
+        """Append a row for a job that was not queued from this list"""
+        row = JobRow(title, checked=False)
+        position = len(self._rows)
+        self.beginInsertRows(QModelIndex(), position, position)
+        self._rows.append(row)
+        self.endInsertRows()
+        self.attach_job(position, job_id, state, progress)
+
+    def attach_job(self, position, job_id, state='', progress=0.0):
+        """Link an entry row to the job it was queued as"""
+        row = self._rows[position]
+        row.job_id = job_id
+        row.state = state
+        row.progress = progress
+        self._job_rows[job_id] = position
+        self._mark_dirty(position)
+
+    def has_job(self, job_id):
+        return job_id in self._job_rows
+
+    def checked_entries(self):
+        """(row index, entry) of every checked entry that is not queued yet"""
+        return [(position, row.entry) for position, row in enumerate(self._rows)
+                if row.entry is not None and row.checked and not row.job_id]
+
+    def set_all_checked(self, checked):
+        changed = [position for position, row in enumerate(self._rows)
+                   if row.entry is not None and not row.job_id and row.checked != checked]
+        for position in changed:
+            self._rows[position].checked = checked
+        self._dirty.update(changed)
+        self.flush()
+
+    def set_progress(self, job_id, value):
+        position = self._job_rows.get(job_id)
+        if position is not None and self._rows[position].progress != value:
+            self._rows[position].progress = value
+            self._mark_dirty(position)
+
+    def set_state(self, job_id, state):
+        position = self._job_rows.get(job_id)
+        if position is not None:
+            self._rows[position].state = state
+            self._mark_dirty(position)
+
+    def _mark_dirty(self, position):
+        self._dirty.add(position)
+        if not self._flush_timer.isActive():
+            self._flush_timer.start()
+
+    def flush(self):
+        """Emit dataChanged for the rows changed since the last frame"""
+        self._flush_timer.stop()
+        if not self._dirty:
+            return
+        rows = sorted(self._dirty)
+        self._dirty.clear()
+        last_column = len(self.HEADERS) - 1
+        start = previous = rows[0]
+        for position in rows[1:] + [None]:
+            if position is not None and position == previous + 1:
+                previous = position
+                continue
+            self.dataChanged.emit(self.index(start, 0), self.index(previous, last_column))
+            if position is not None:
+                start = previous = position
+
+    def _reindex(self):
+        self._job_rows = {row.job_id: position for position, row in enumerate(self._rows) if row.job_id}
+        self._thumbnail_rows = {}
+        for position, row in enumerate(self._rows):
+            if row.thumbnail:
+                self._thumbnail_rows.setdefault(row.thumbnail, []).append(position)
+        self._dirty.clear()
+
+    def _on_thumbnail_loaded(self, url):
+        for position in self._thumbnail_rows.get(url, ()):
+            self._mark_dirty(position)
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        row = self._rows[index.row()]
+        column = index.column()
+        if role == Qt.DisplayRole:
+            if column == COL_TITLE:
+                return row.title
+            if column == COL_DURATION:
+                return format_duration(row.duration)
+            if column == COL_STATE:
+                return self.translate(f'job_state_{row.state}', row.state) if row.state else ''
+            return None
+        if role == PROGRESS_ROLE and column == COL_PROGRESS:
+            return row.progress if row.job_id else None
+        if role == Qt.CheckStateRole and column == COL_TITLE and row.entry is not None and not row.job_id:
+            return Qt.Checked if row.checked else Qt.Unchecked
+        if role == Qt.DecorationRole and column == COL_TITLE and row.thumbnail and self.thumbnails is not None:
+            return self.thumbnails.get(row.thumbnail)
+        if role == Qt.ToolTipRole and column == COL_TITLE:
+            return row.title
+        return None
+
+    def setData(self, index, value, role=Qt.EditRole):
+        if role != Qt.CheckStateRole or index.column() != COL_TITLE:
+            return False
+        row = self._rows[index.row()]
+        if row.entry is None or row.job_id:
+            return False
+        row.checked = Qt.CheckState(value) == Qt.Checked
+        self.dataChanged.emit(index, index, [Qt.CheckStateRole])
+        return True
+
+    def flags(self, index):
+        flags = super().flags(index)
+        if index.isValid() and index.column() == COL_TITLE:
+            row = self._rows[index.row()]
+            if row.entry is not None and not row.job_id:
+                flags |= Qt.ItemIsUserCheckable
+        return flags
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if orientation == Qt.Horizontal and role == Qt.DisplayRole:
+            return self.translate(self.HEADERS[section])
+        return None
+
+
+class ProgressDelegate(QStyledItemDelegate):
+    """Paints a progress bar for PROGRESS_ROLE instead of a widget per row"""
+
+    def paint(self, painter, option, index):
+        value = index.data(PROGRESS_ROLE)
+        if value is None:
+            super().paint(painter, option, index)
+            return
+        bar = QStyleOptionProgressBar()
+        bar.rect = option.rect.adjusted(2, 3, -2, -3)
+        bar.minimum = 0
+        bar.maximum = 100
+        bar.progress = int(value)
+        bar.text = f"{value:.0f}%"
+        bar.textVisible = True
+        bar.state = option.state
+        QApplication.style().drawControl(QStyle.CE_ProgressBar, bar, painter)
@@ -0,0 +1,180 @@
+# Download library index for Fast-Horse-2026
+# Content hashes of finished files, used to link duplicates instead of storing them twice
+
+import hashlib
+import os
+import shutil
+import sqlite3
+import sys
+import threading
+import time
+from .paths import get_data_path
+
+HASH_CHUNK_SIZE = 1024 * 1024
+# Linux ioctl for a copy-on-write clone (btrfs, XFS, bcachefs)
+FICLONE = 0x40049409
+
+
+def new_hasher():
+    return hashlib.sha256()
+
+
+def hash_file(path):
+    """Streaming SHA-256 of a file"""
+    hasher = new_hasher()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b''):
+            hasher.update(chunk)
+    return hasher.hexdigest()
+
+
+def reflink(source, target):
+    """Create target as a copy-on-write clone of source; False if unsupported"""
+    if not sys.platform.startswith('linux'):
+        return False
+    import fcntl
+    try:
+        with open(source, 'rb') as src, open(target, 'wb') as dst:
+            fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+        return True
+    except OSError:
+        try:
+            os.remove(target)
+        except OSError:
+            pass
+        return False
+
+
+def link_duplicate(existing, path):
+    """Replace path with a reflink (or hardlink) of existing; returns the method used"""
+    if os.path.samefile(existing, path):
+        return 'same'
+    temp = path + '.fhlink'
+    if reflink(existing, temp):
+        method = 'reflink'
+    else:
+        try:
+            os.link(existing, temp)
+            method = 'hardlink'
+        except OSError:
+            # Different filesystem or no link support - keep the copy
+            return None
+    os.replace(temp, path)
+    return method
+
+
+def place_copy(existing, target):
+    """Create target from an existing library file without downloading it again"""
+    os.makedirs(os.path.dirname(os.path.abspath(target)), exist_ok=True)
+    temp = target + '.fhlink'
+    if not reflink(existing, temp):
+        try:
+            os.link(existing, temp)
+        except OSError:
+            shutil.copyfile(existing, temp)
+    os.replace(temp, target)
+
+
+class LibraryIndex:
+    """SQLite index of finished files: path, content hash, size and source
+
+    Files are looked up by (sha256, size) to find content duplicates, and
+    by (archive ID, format ID) to find an exact earlier download of the
+    same video and format before fetching it again.
+    """
+
+    def __init__(self, path=None):
+        self.path = path or get_data_path('library.db')
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS files ('
+            ' path TEXT PRIMARY KEY,'
+            ' sha256 TEXT NOT NULL,'
+            ' size INTEGER NOT NULL,'
+            ' archive_id TEXT,'
+            ' format_id TEXT,'
+            ' added_at REAL NOT NULL'
+            ')'
+        )
+        self._conn.execute('CREATE INDEX IF NOT EXISTS files_hash ON files (sha256, size)')
+        self._conn.execute('CREATE INDEX IF NOT EXISTS files_source ON files (archive_id, format_id)')
+        self._conn.commit()
+
+    def _existing(self, rows, exclude=None):
+        """First listed path that still exists on disk; stale rows are dropped"""
+        stale = []
+        found = None
+        for path, size in rows:
+            if path == exclude:
+                continue
+            try:
+                if os.path.getsize(path) == size:
+                    found = path
+                    break
+            except OSError:
+                pass
+            stale.append(path)
+        if stale:
+            with self._lock:
+                self._conn.executemany('DELETE FROM files WHERE path = ?', [(p,) for p in stale])
+                self._conn.commit()
+        return found
+
+    def find_by_hash(self, sha256, size, exclude=None):
+        with self._lock:
+            rows = self._conn.execute(
+                'SELECT path, size FROM files WHERE sha256 = ? AND size = ?', (sha256, size)
+            ).fetchall()
+        return self._existing(rows, exclude)
+
+    def find_by_source(self, archive_id, format_id):
+        """Path of an earlier download of the same video and format, or None"""
+        if not archive_id or not format_id:
+            return None
+        with self._lock:
+            rows = self._conn.execute(
+                'SELECT path, size FROM files WHERE archive_id = ? AND format_id = ?',
+                (archive_id, format_id)
+            ).fetchall()
+        return self._existing(rows)
+
+    def add(self, path, sha256, size, archive_id=None, format_id=None):
+        with self._lock:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO files (path, sha256, size, archive_id, format_id, added_at)'
+                ' VALUES (?, ?, ?, ?, ?, ?)',
+                (os.path.abspath(path), sha256, size, archive_id, format_id, time.time())
+            )
+            self._conn.commit()
+
+    def register(self, path, sha256=None, archive_id=None, format_id=None):
+        """Record a finished file and link it to an identical earlier file
+
+        Returns (existing path, link method) if it was a duplicate, else None.
+        """
+        path = os.path.abspath(path)
+        size = os.path.getsize(path)
+        sha256 = sha256 or hash_file(path)
+        duplicate = None
+        existing = self.find_by_hash(sha256, size, exclude=path)
+        if existing:
+            method = link_duplicate(existing, path)
+            if method:
+                duplicate = (existing, method)
+        self.add(path, sha256, size, archive_id, format_id)
+        return duplicate
+
+
+_library = None
+_library_lock = threading.Lock()
+
+
+def get_library():
+    """Return the shared LibraryIndex (opened on first use)"""
+    global _library
+    with _library_lock:
+        if _library is None:
+            _library = LibraryIndex()
+        return _library
@@ -1,17 +1,61 @@
 from PySide6.QtWidgets import (
     QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QGridLayout, QLineEdit, QPushButton, 
     QLabel, QComboBox, QProgressBar, QFileDialog, QMessageBox,
-    QTabWidget, QGroupBox, QRadioButton, QFormLayout, QTextEdit, QCheckBox
+    QTabWidget, QGroupBox, QRadioButton, QFormLayout, QTextEdit, QCheckBox, QSpinBox,
+    QTableView, QHeaderView, QAbstractItemView
 )
-from PySide6.QtCore import Qt, QSettings, QTimer, Signal, QPoint, QUrl
+from PySide6.QtCore import Qt, QSettings, QTimer, Signal, QPoint
 from PySide6.QtGui import QFont, QPixmap
-from PySide6.QtNetwork import QNetworkAccessManager, QNetworkRequest, QNetworkReply
 import os
+import sqlite3
 import sys
-from .download_manager import FetchInfoThread, DownloadThread
+import threading
+import time
+from yt_dlp.utils import sanitize_filename
+from .download_manager import FetchInfoThread
+from .site_policy import (
+    ERROR_BOT_CHECK, ERROR_RATE_LIMITED, ERROR_FORBIDDEN, ERROR_CIRCUIT_OPEN,
+    ERROR_JS_CHALLENGE, ERROR_NETWORK
+)
+from .job_journal import JobJournal
+from .channel_sync import SyncThread
+from .proxy_pool import get_proxy_pool, STRATEGIES
+from .config import get_config, update_config, PROXY_TYPES, ProxyType
+from .download_archive import get_download_archive, entry_archive_id
+from .download_queue import (
+    DownloadQueue, PRIORITY_NORMAL, PRIORITY_HIGH,
+    STATE_RUNNING, STATE_QUEUED, STATE_PAUSED, STATE_CANCELLED, STATE_FINISHED, STATE_FAILED
+)
+from .url_router import route_url
+from .ytdlp_cache import prewarm_cache, cache_stats
+from .extract_pool import shutdown_extract_pool
+from .audio_pipeline import AUDIO_MP3_SPEC, AUDIO_ORIGINAL_SPEC
+from .clip import parse_clip, clip_label
+from .history import get_history, HistoryModel
+from .job_list import (
+    JobListModel, ThumbnailCache, ProgressDelegate, COL_TITLE, COL_PROGRESS, THUMBNAIL_SIZE
+)
+from .channel_sync import entry_url
 from .translations import translator
+from .ui_dispatcher import UiDispatcher
+from .http_client import HttpFetcher, get_http_client
 from . import __version__
 
+# Speculative prefetch: start fetching once the URL input settles
+PREFETCH_DEBOUNCE_MS = 600
+# Wait for typing to pause before searching the history
+HISTORY_SEARCH_DEBOUNCE_MS = 250
+# History date filter: (translation key, days back; None = all time)
+HISTORY_RANGES = (
+    ('history_any_time', None),
+    ('history_today', 1),
+    ('history_last_week', 7),
+    ('history_last_month', 30),
+)
+# Running fetch threads (including stale ones still winding down) before
+# prefetch waits - keeps fast typing from launching a flood of requests
+MAX_FETCH_THREADS = 2
+
 
 class TitleBar(QWidget):
     """Custom title bar for a frameless main window"""
@@ -126,13 +170,49 @@ class MainWindow(QMainWindow):
         self.setMinimumSize(800, 600)
         self.current_info = None
         self.is_playlist = False
-        
-        # Network manager for thumbnail download
-        self.network_manager = QNetworkAccessManager(self)
+        # Status text, progress and status style are applied once per frame
+        self.ui = UiDispatcher(self)
+        # Thumbnail already loaded for the current fetch (preview phase)
+        self.preview_thumbnail_url = None
+        # URL of the thumbnail being downloaded; results for other URLs are stale
+        self.thumbnail_request_url = None
+        self.fetch_thread = None
+        # URL of the current fetch (may have been started speculatively)
+        self.fetch_url = None
+        # All fetch threads that have not exited yet, stale ones included
+        self.fetch_threads = set()
+        self.prefetch_waiting = False
+        self.prefetch_timer = QTimer()
+        self.prefetch_timer.setSingleShot(True)
+        self.prefetch_timer.timeout.connect(self.prefetch_url)
+        
+        # Thumbnail downloads (shared keep-alive HTTP pool, app proxy settings)
+        self.thumbnail_fetcher = HttpFetcher(self)
+        self.thumbnail_fetcher.fetched.connect(self.on_thumbnail_loaded)
+        
+        # Download queue (priority scheduling, pause/resume, cancel)
+        self.current_job_id = None
+        self.threads_stuck = False
+        # Sync downloads still in the queue: job_id -> [(SyncBatch, index)], URL -> job_id
+        self.sync_jobs = {}
+        self.sync_job_urls = {}
+        try:
+            journal = JobJournal()
+        except Exception as e:
+            print(f"DEBUG: Job journal unavailable: {e}", flush=True)
+            journal = None
+        self.download_queue = DownloadQueue(self, journal=journal)
+        self.download_queue.job_state_changed.connect(self.on_job_state_changed)
+        self.download_queue.job_progress.connect(self.update_progress)
+        self.download_queue.job_status.connect(self.on_job_status)
+        self.download_queue.job_finished.connect(self.on_download_complete)
+        self.download_queue.job_error.connect(self.on_download_error)
+        # Queued: jobs submitted from the job list are attached to their row first
+        self.download_queue.job_added.connect(self.on_job_added, Qt.QueuedConnection)
         
         # Settings
         self.settings = QSettings("Fast-Horse-2026", "App")
-        self.output_dir = self.settings.value("output_dir", ".")
+        self.output_dir = get_config().output_dir
         
         # Progress tracking - slower updates for proxy/VPN
         self.fetch_progress_stages = [
@@ -162,6 +242,14 @@ class MainWindow(QMainWindow):
         if hasattr(self, 'url_input'):
             self.url_input.clear()
         
+        # Continue downloads interrupted by a crash or by closing the app
+        restored = self.download_queue.restore()
+        if restored:
+            self.set_status(translator.get('status_resuming').format(count=len(restored)))
+        
+        # Load cached player JS/challenge results before the first YouTube fetch
+        threading.Thread(target=prewarm_cache, name='cache-prewarm', daemon=True).start()
+        
     def setup_tabs(self):
         """Setup the tab widget with Main and Settings tabs"""
         self.tab_widget = QTabWidget()
@@ -169,10 +257,13 @@ class MainWindow(QMainWindow):
         # Create tabs
         self.main_tab = self.create_main_tab()
         self.settings_tab = self.create_settings_tab()
+        self.history_tab = self.create_history_tab()
         
         # Add tabs to tab widget
         self.tab_widget.addTab(self.main_tab, translator.get('tab_main'))
         self.tab_widget.addTab(self.settings_tab, translator.get('tab_settings'))
+        self.tab_widget.addTab(self.history_tab, translator.get('tab_history'))
+        self.tab_widget.currentChanged.connect(self.on_tab_changed)
         
         # Wrap title bar + tabs in a container widget
         container = QWidget()
@@ -189,9 +280,8 @@ class MainWindow(QMainWindow):
         self.setCentralWidget(container)
         
         # Initialize thumbnail visibility based on settings
-        saved_show_thumbnail = self.settings.value("show_thumbnail", "true")
         if hasattr(self, 'thumbnail_label'):
-            self.thumbnail_label.setVisible(saved_show_thumbnail != "false")
+            self.thumbnail_label.setVisible(get_config().show_thumbnail)
         
     def create_main_tab(self):
         """Create the main downloader tab"""
@@ -218,14 +308,21 @@ class MainWindow(QMainWindow):
         self.url_input = QLineEdit()
         self.url_input.setPlaceholderText(translator.get('url_placeholder'))
         self.url_input.setMinimumHeight(35)
+        self.url_input.textChanged.connect(self.on_url_text_changed)
         
         self.fetch_btn = QPushButton(translator.get('fetch_btn'))
         self.fetch_btn.setMinimumHeight(35)
         self.fetch_btn.clicked.connect(self.fetch_video_info)
         
+        # Incremental sync of the channels listed in Settings
+        self.sync_btn = QPushButton(translator.get('sync_btn'))
+        self.sync_btn.setMinimumHeight(35)
+        self.sync_btn.clicked.connect(self.start_sync)
+        
         url_layout.addWidget(url_label)
         url_layout.addWidget(self.url_input, 1)
         url_layout.addWidget(self.fetch_btn)
+        url_layout.addWidget(self.sync_btn)
         layout.addLayout(url_layout)
         
         # Preview Section - with thumbnail
@@ -261,7 +358,8 @@ class MainWindow(QMainWindow):
             translator.get('format_1080p'),
             translator.get('format_720p'),
             translator.get('format_480p'),
-            translator.get('format_mp3')
+            translator.get('format_mp3'),
+            translator.get('format_audio_original')
         ]) 
         self.format_combo.setMinimumHeight(35)
         
@@ -277,29 +375,159 @@ class MainWindow(QMainWindow):
         self.download_btn.clicked.connect(self.start_download)
         self.download_btn.setEnabled(False)
         
+        # High priority jobs preempt running normal-priority downloads
+        self.priority_checkbox = QCheckBox(translator.get('priority_high'))
+        
         format_layout.addWidget(format_label)
         format_layout.addWidget(self.format_combo, 1)
         format_layout.addWidget(self.folder_btn)
+        format_layout.addWidget(self.priority_checkbox)
         format_layout.addWidget(self.download_btn)
         layout.addLayout(format_layout)
         
+        # Clip mode: download only a time range
+        clip_layout = QHBoxLayout()
+        clip_layout.setSpacing(10)
+        
+        self.clip_checkbox = QCheckBox(translator.get('clip_checkbox'))
+        self.clip_start_input = QLineEdit()
+        self.clip_start_input.setPlaceholderText(translator.get('clip_start_placeholder'))
+        self.clip_end_input = QLineEdit()
+        self.clip_end_input.setPlaceholderText(translator.get('clip_end_placeholder'))
+        self.clip_checkbox.toggled.connect(self.clip_start_input.setEnabled)
+        self.clip_checkbox.toggled.connect(self.clip_end_input.setEnabled)
+        self.clip_start_input.setEnabled(False)
+        self.clip_end_input.setEnabled(False)
+        
+        clip_layout.addWidget(self.clip_checkbox)
+        clip_layout.addWidget(self.clip_start_input, 1)
+        clip_layout.addWidget(QLabel("–"))
+        clip_layout.addWidget(self.clip_end_input, 1)
+        layout.addLayout(clip_layout)
+        
         # Progress Section
+        progress_layout = QHBoxLayout()
+        progress_layout.setSpacing(10)
+        
         self.progress_bar = QProgressBar()
         self.progress_bar.setMinimumHeight(25)
-        layout.addWidget(self.progress_bar)
+        
+        self.pause_btn = QPushButton(translator.get('pause_btn'))
+        self.pause_btn.clicked.connect(self.toggle_pause)
+        self.pause_btn.setEnabled(False)
+        
+        self.cancel_btn = QPushButton(translator.get('cancel_btn'))
+        self.cancel_btn.clicked.connect(self.cancel_download)
+        self.cancel_btn.setEnabled(False)
+        
+        progress_layout.addWidget(self.progress_bar, 1)
+        progress_layout.addWidget(self.pause_btn)
+        progress_layout.addWidget(self.cancel_btn)
+        layout.addLayout(progress_layout)
         
         self.status_label = QLabel(translator.get('status_ready'))
         self.status_label.setObjectName("status_label")
         self.status_label.setAlignment(Qt.AlignCenter)
         layout.addWidget(self.status_label)
         
-        # Spacer
-        layout.addStretch()
+        # Job list: playlist entries to pick from, then every queued job with its progress
+        select_layout = QHBoxLayout()
+        self.select_all_btn = QPushButton(translator.get('select_all_btn'))
+        self.select_none_btn = QPushButton(translator.get('select_none_btn'))
+        self.select_all_btn.clicked.connect(lambda: self.job_list_model.set_all_checked(True))
+        self.select_none_btn.clicked.connect(lambda: self.job_list_model.set_all_checked(False))
+        select_layout.addStretch()
+        select_layout.addWidget(self.select_all_btn)
+        select_layout.addWidget(self.select_none_btn)
+        layout.addLayout(select_layout)
+        
+        self.job_list_model = JobListModel(translator.get, ThumbnailCache(self), self)
+        self.job_table = QTableView()
+        self.job_table.setModel(self.job_list_model)
+        self.job_table.setItemDelegateForColumn(COL_PROGRESS, ProgressDelegate(self.job_table))
+        self.job_table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.job_table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.job_table.setIconSize(THUMBNAIL_SIZE)
+        self.job_table.setWordWrap(False)
+        # Fixed row heights keep layout and scrolling independent of the row count
+        self.job_table.verticalHeader().setVisible(False)
+        self.job_table.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
+        self.job_table.verticalHeader().setDefaultSectionSize(THUMBNAIL_SIZE.height() + 6)
+        self.job_table.horizontalHeader().setSectionResizeMode(COL_TITLE, QHeaderView.Stretch)
+        layout.addWidget(self.job_table, 1)
+        self.set_selection_visible(False)
         
         return tab
+    
+    def set_selection_visible(self, visible):
+        self.select_all_btn.setVisible(visible)
+        self.select_none_btn.setVisible(visible)
+    
+    def create_history_tab(self):
+        """Create the download history tab: search/filter row and a paged table"""
+        tab = QWidget()
+        layout = QVBoxLayout(tab)
+        layout.setSpacing(10)
+        layout.setContentsMargins(20, 20, 20, 20)
         
+        filter_layout = QHBoxLayout()
+        self.history_search_input = QLineEdit()
+        self.history_search_input.setPlaceholderText(translator.get('history_search_placeholder'))
+        self.history_search_input.setMinimumHeight(35)
+        self.history_site_combo = QComboBox()
+        self.history_range_combo = QComboBox()
+        self.history_range_combo.addItems([translator.get(key) for key, _ in HISTORY_RANGES])
+        self.history_count_label = QLabel()
+        filter_layout.addWidget(self.history_search_input, 1)
+        filter_layout.addWidget(self.history_site_combo)
+        filter_layout.addWidget(self.history_range_combo)
+        filter_layout.addWidget(self.history_count_label)
+        layout.addLayout(filter_layout)
+        
+        # Rows are read from the database a page at a time as the table scrolls
+        self.history_model = HistoryModel(get_history(), translator.get, self)
+        self.history_table = QTableView()
+        self.history_table.setModel(self.history_model)
+        self.history_table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.history_table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.history_table.verticalHeader().setVisible(False)
+        self.history_table.horizontalHeader().setSectionResizeMode(1, QHeaderView.Stretch)
+        layout.addWidget(self.history_table, 1)
+        
+        self.history_search_timer = QTimer(self)
+        self.history_search_timer.setSingleShot(True)
+        self.history_search_timer.setInterval(HISTORY_SEARCH_DEBOUNCE_MS)
+        self.history_search_timer.timeout.connect(self.refresh_history)
+        self.history_search_input.textChanged.connect(self.history_search_timer.start)
+        self.history_site_combo.activated.connect(self.refresh_history)
+        self.history_range_combo.activated.connect(self.refresh_history)
         return tab
     
+    def refresh_history(self):
+        """Re-run the history search with the current filters"""
+        site = self.history_site_combo.currentData()
+        # Keep the site list current without losing the selection
+        self.history_site_combo.clear()
+        self.history_site_combo.addItem(translator.get('history_all_sites'), None)
+        for name in self.history_model.store.sites():
+            self.history_site_combo.addItem(name, name)
+        index = self.history_site_combo.findData(site)
+        self.history_site_combo.setCurrentIndex(max(index, 0))
+        
+        days = HISTORY_RANGES[self.history_range_combo.currentIndex()][1]
+        since = None
+        if days:
+            today = time.localtime()
+            midnight = time.mktime((today.tm_year, today.tm_mon, today.tm_mday, 0, 0, 0, 0, 0, -1))
+            since = midnight - (days - 1) * 86400
+        self.history_model.set_filters(self.history_search_input.text(), self.history_site_combo.currentData(), since)
+        self.history_count_label.setText(
+            translator.get('history_count').format(count=self.history_model.total_count()))
+    
+    def on_tab_changed(self, index):
+        if self.tab_widget.widget(index) is self.history_tab:
+            self.refresh_history()
+    
     def create_settings_tab(self):
         """Create the settings tab with language, theme, proxy, and about sections"""
         tab = QWidget()
@@ -372,6 +600,27 @@ class MainWindow(QMainWindow):
         self.proxy_port_input.setPlaceholderText("10808")
         proxy_layout.addRow(translator.get('settings_proxy_port'), self.proxy_port_input)
         
+        # Proxy pool (one proxy URL per line) and assignment strategy
+        self.proxy_pool_input = QTextEdit()
+        self.proxy_pool_input.setPlaceholderText("socks5://127.0.0.1:10808\nhttp://127.0.0.1:8080")
+        self.proxy_pool_input.setMaximumHeight(70)
+        self.proxy_pool_label = QLabel(translator.get('settings_proxy_pool'))
+        proxy_layout.addRow(self.proxy_pool_label, self.proxy_pool_input)
+        
+        self.proxy_strategy_combo = QComboBox()
+        self.proxy_strategy_combo.addItems([translator.get(f'proxy_strategy_{s}') for s in STRATEGIES])
+        self.proxy_strategy_label = QLabel(translator.get('settings_proxy_strategy'))
+        proxy_layout.addRow(self.proxy_strategy_label, self.proxy_strategy_combo)
+        
+        # Per-proxy health and throughput, refreshed while the pool is in use
+        self.proxy_stats_label = QLabel()
+        self.proxy_stats_label.setWordWrap(True)
+        proxy_layout.addRow("", self.proxy_stats_label)
+        self.proxy_stats_timer = QTimer(self)
+        self.proxy_stats_timer.timeout.connect(self.update_proxy_stats)
+        self.proxy_stats_timer.timeout.connect(self.update_cache_stats)
+        self.proxy_stats_timer.start(5000)
+        
         # Save proxy button
         self.save_proxy_btn = QPushButton(translator.get('settings_save'))
         self.save_proxy_btn.clicked.connect(self.save_proxy_settings)
@@ -387,25 +636,94 @@ class MainWindow(QMainWindow):
         # Show thumbnail checkbox
         self.show_thumbnail_checkbox = QCheckBox()
         # Default is checked
-        saved_show_thumbnail = self.settings.value("show_thumbnail", "true")
-        self.show_thumbnail_checkbox.setChecked(saved_show_thumbnail != "false")
+        self.show_thumbnail_checkbox.setChecked(get_config().show_thumbnail)
         self.show_thumbnail_checkbox.stateChanged.connect(self.toggle_thumbnail)
         misc_layout.addRow(translator.get('settings_show_thumbnail'), self.show_thumbnail_checkbox)
         
         # Download threads
         self.threads_combo = QComboBox()
         self.threads_combo.addItems(["1", "2", "4", "8"])
-        saved_threads = self.settings.value("download_threads", "1")
-        index = self.threads_combo.findText(saved_threads)
+        index = self.threads_combo.findText(str(get_config().download_threads))
         if index >= 0:
             self.threads_combo.setCurrentIndex(index)
         self.threads_combo.currentIndexChanged.connect(self.save_threads_setting)
         misc_layout.addRow(translator.get('settings_threads') + ":", self.threads_combo)
         
+        # Run yt-dlp extraction in worker processes (off by default)
+        self.process_extraction_label = QLabel(translator.get('settings_process_extraction'))
+        self.process_extraction_checkbox = QCheckBox()
+        self.process_extraction_checkbox.setChecked(get_config().process_extraction)
+        self.process_extraction_checkbox.stateChanged.connect(self.toggle_process_extraction)
+        misc_layout.addRow(self.process_extraction_label, self.process_extraction_checkbox)
+        
+        # Format budgets: pick the best format that fits (0 = no limit)
+        self.size_budget_label = QLabel(translator.get('settings_size_budget'))
+        self.size_budget_spin = QSpinBox()
+        self.size_budget_spin.setRange(0, 1000000)
+        self.size_budget_spin.setSuffix(" MB")
+        self.size_budget_spin.setSpecialValueText(translator.get('settings_no_limit'))
+        self.size_budget_spin.setValue(get_config().size_budget_mb)
+        self.size_budget_spin.valueChanged.connect(lambda value: update_config(size_budget_mb=value))
+        misc_layout.addRow(self.size_budget_label, self.size_budget_spin)
+        
+        self.bitrate_budget_label = QLabel(translator.get('settings_bitrate_budget'))
+        self.bitrate_budget_spin = QSpinBox()
+        self.bitrate_budget_spin.setRange(0, 1000000)
+        self.bitrate_budget_spin.setSuffix(" kbps")
+        self.bitrate_budget_spin.setSpecialValueText(translator.get('settings_no_limit'))
+        self.bitrate_budget_spin.setValue(get_config().bitrate_budget_kbps)
+        self.bitrate_budget_spin.valueChanged.connect(lambda value: update_config(bitrate_budget_kbps=value))
+        misc_layout.addRow(self.bitrate_budget_label, self.bitrate_budget_spin)
+        
+        # Staging directory on fast storage for .part files and merges
+        self.staging_label = QLabel(translator.get('settings_staging_dir'))
+        staging_row = QHBoxLayout()
+        self.staging_input = QLineEdit(get_config().staging_dir)
+        self.staging_input.setPlaceholderText(translator.get('settings_staging_placeholder'))
+        self.staging_input.editingFinished.connect(
+            lambda: update_config(staging_dir=self.staging_input.text().strip()))
+        self.staging_btn = QPushButton("📁")
+        self.staging_btn.clicked.connect(self.select_staging_folder)
+        staging_row.addWidget(self.staging_input, 1)
+        staging_row.addWidget(self.staging_btn)
+        misc_layout.addRow(self.staging_label, staging_row)
+        
+        self.staging_limit_label = QLabel(translator.get('settings_staging_limit'))
+        self.staging_limit_spin = QSpinBox()
+        self.staging_limit_spin.setRange(0, 100000)
+        self.staging_limit_spin.setSuffix(" GB")
+        self.staging_limit_spin.setSpecialValueText(translator.get('settings_no_limit'))
+        self.staging_limit_spin.setValue(get_config().staging_limit_gb)
+        self.staging_limit_spin.valueChanged.connect(lambda value: update_config(staging_limit_gb=value))
+        misc_layout.addRow(self.staging_limit_label, self.staging_limit_spin)
+        
+        # yt-dlp cache counters (player JS, signatures, challenge results)
+        self.cache_label = QLabel(translator.get('settings_ytdlp_cache'))
+        self.cache_stats_label = QLabel()
+        misc_layout.addRow(self.cache_label, self.cache_stats_label)
+        self.update_cache_stats()
+        
         self.thumbnail_group.setLayout(misc_layout)
         grid_layout.addWidget(self.thumbnail_group, 1, 1)
         
-        # About Section (row 2, spans both columns)
+        # Sync Sources Section (row 2, spans both columns)
+        self.sync_group = QGroupBox(translator.get('settings_sync'))
+        sync_layout = QVBoxLayout()
+        
+        self.sync_sources_input = QTextEdit()
+        self.sync_sources_input.setPlaceholderText(translator.get('settings_sync_placeholder'))
+        self.sync_sources_input.setPlainText("\n".join(get_config().sync_sources))
+        self.sync_sources_input.setMaximumHeight(80)
+        sync_layout.addWidget(self.sync_sources_input)
+        
+        self.save_sync_btn = QPushButton(translator.get('settings_save'))
+        self.save_sync_btn.clicked.connect(self.save_sync_sources)
+        sync_layout.addWidget(self.save_sync_btn, 0, Qt.AlignRight)
+        
+        self.sync_group.setLayout(sync_layout)
+        grid_layout.addWidget(self.sync_group, 2, 0, 1, 2)
+        
+        # About Section (row 3, spans both columns)
         self.about_group = QGroupBox(translator.get('settings_about'))
         
         # Use horizontal layout for about section (text on left, image on right)
@@ -438,10 +756,10 @@ class MainWindow(QMainWindow):
         self.load_horse_image()
         
         self.about_group.setLayout(about_main_layout)
-        grid_layout.addWidget(self.about_group, 2, 0, 1, 2)
+        grid_layout.addWidget(self.about_group, 3, 0, 1, 2)
         
         # Spacer
-        grid_layout.setRowStretch(3, 1)
+        grid_layout.setRowStretch(4, 1)
         
         # Load current proxy settings
         self.load_proxy_settings()
@@ -451,16 +769,22 @@ class MainWindow(QMainWindow):
     def toggle_thumbnail(self, state):
         """Toggle thumbnail display based on checkbox"""
         show = (state == 2)  # 2 = Checked
-        self.settings.setValue("show_thumbnail", str(show).lower())
+        update_config(show_thumbnail=show)
         
         # Show/hide thumbnail immediately
         if hasattr(self, 'thumbnail_label'):
             self.thumbnail_label.setVisible(show)
     
+    def toggle_process_extraction(self, state):
+        """Switch video info extraction between worker processes and threads"""
+        enabled = (state == 2)  # 2 = Checked
+        update_config(process_extraction=enabled)
+        if not enabled:
+            shutdown_extract_pool()
+    
     def save_threads_setting(self, index):
         """Save download threads setting"""
-        threads = self.threads_combo.currentText()
-        self.settings.setValue("download_threads", threads)
+        update_config(download_threads=int(self.threads_combo.currentText()))
     
     def change_language(self, lang_code):
         """Change application language"""
@@ -468,6 +792,7 @@ class MainWindow(QMainWindow):
             # Update tab titles
             self.tab_widget.setTabText(0, translator.get('tab_main'))
             self.tab_widget.setTabText(1, translator.get('tab_settings'))
+            self.tab_widget.setTabText(2, translator.get('tab_history'))
             
             # Update UI text
             self.update_ui_text()
@@ -485,30 +810,43 @@ class MainWindow(QMainWindow):
             self.light_radio.setChecked(theme == 'light')
     
     def load_proxy_settings(self):
-        """Load current proxy settings from QSettings"""
-        proxy_type = self.settings.value("proxy_type", translator.get('settings_proxy_socks5'))
-        proxy_host = self.settings.value("proxy_host", "127.0.0.1")
-        proxy_port = self.settings.value("proxy_port", "10808")
-        
-        # Set proxy type
-        if proxy_type == translator.get('settings_proxy_none'):
-            self.proxy_type_combo.setCurrentIndex(0)
-        elif proxy_type == translator.get('settings_proxy_socks5'):
-            self.proxy_type_combo.setCurrentIndex(1)
-        elif proxy_type == translator.get('settings_proxy_http'):
-            self.proxy_type_combo.setCurrentIndex(2)
-        
-        self.proxy_host_input.setText(proxy_host)
-        self.proxy_port_input.setText(proxy_port)
+        """Load current proxy settings from the settings snapshot"""
+        config = get_config()
+        
+        # Combo items are in PROXY_TYPES order, whatever the language
+        self.proxy_type_combo.setCurrentIndex(PROXY_TYPES.index(config.proxy_type))
+        
+        self.proxy_host_input.setText(config.proxy_host)
+        self.proxy_port_input.setText(config.proxy_port)
+        
+        self.proxy_pool_input.setPlainText("\n".join(config.proxy_pool))
+        strategy = config.proxy_strategy
+        self.proxy_strategy_combo.setCurrentIndex(STRATEGIES.index(strategy) if strategy in STRATEGIES else 0)
+    
+    def update_cache_stats(self):
+        """Show hit/miss counters and disk use of the shared yt-dlp cache"""
+        stats = cache_stats()
+        self.cache_stats_label.setText(
+            f"{stats['hits']} hits / {stats['misses']} misses, {stats['bytes'] / (1024 * 1024):.1f} MB"
+        )
+    
+    def update_proxy_stats(self):
+        """Show latency, load and throughput of each pooled proxy"""
+        lines = []
+        for stats in get_proxy_pool().stats():
+            latency = f"{stats['latency'] * 1000:.0f} ms" if stats['latency'] is not None else "down"
+            throughput = stats['throughput'] / (1024 * 1024)
+            lines.append(f"{stats['url']}: {latency}, {stats['active']} active, {throughput:.2f} MB/s")
+        self.proxy_stats_label.setText("\n".join(lines))
     
     def save_proxy_settings(self):
-        """Save proxy settings to QSettings"""
-        proxy_type = self.proxy_type_combo.currentText()
+        """Save proxy settings and publish a new settings snapshot"""
+        proxy_type = PROXY_TYPES[self.proxy_type_combo.currentIndex()]
         proxy_host = self.proxy_host_input.text().strip()
         proxy_port = self.proxy_port_input.text().strip()
         
         # Validate port
-        if proxy_type != translator.get('settings_proxy_none'):
+        if proxy_type != ProxyType.NONE:
             if not proxy_host:
                 self.set_status("Please enter proxy host", is_error=True)
                 return
@@ -523,13 +861,28 @@ class MainWindow(QMainWindow):
                 self.set_status("Please enter a valid port number (1-65535)", is_error=True)
                 return
         
-        # Save settings
-        self.settings.setValue("proxy_type", proxy_type)
-        self.settings.setValue("proxy_host", proxy_host)
-        self.settings.setValue("proxy_port", proxy_port)
+        # Proxy pool
+        proxies = [line.strip() for line in self.proxy_pool_input.toPlainText().splitlines() if line.strip()]
+        for proxy in proxies:
+            if not proxy.startswith(('socks5://', 'http://', 'https://')):
+                self.set_status(f"Invalid proxy URL: {proxy}", is_error=True)
+                return
+        
+        # One snapshot for all fields, so running jobs never see a half-saved proxy
+        update_config(proxy_type=proxy_type, proxy_host=proxy_host, proxy_port=proxy_port,
+                      proxy_pool=tuple(proxies),
+                      proxy_strategy=STRATEGIES[self.proxy_strategy_combo.currentIndex()])
+        self.update_proxy_stats()
         
         self.set_status("Proxy settings saved successfully")
     
+    def save_sync_sources(self):
+        """Save the list of channel/playlist URLs used by Sync"""
+        sources = [line.strip() for line in self.sync_sources_input.toPlainText().splitlines()
+                   if line.strip()]
+        update_config(sync_sources=tuple(sources))
+        self.set_status("Sync sources saved successfully")
+    
     def update_settings_tab(self):
         """Update settings tab content when language changes"""
         if hasattr(self, 'language_group'):
@@ -542,9 +895,33 @@ class MainWindow(QMainWindow):
             self.light_radio.setText(translator.get('theme_light'))
             
             self.proxy_group.setTitle(translator.get('settings_proxy'))
+            type_index = self.proxy_type_combo.currentIndex()
+            self.proxy_type_combo.clear()
+            self.proxy_type_combo.addItems([translator.get(f'settings_proxy_{t.value}') for t in PROXY_TYPES])
+            self.proxy_type_combo.setCurrentIndex(type_index)
+            self.proxy_pool_label.setText(translator.get('settings_proxy_pool'))
+            self.proxy_strategy_label.setText(translator.get('settings_proxy_strategy'))
+            strategy_index = self.proxy_strategy_combo.currentIndex()
+            self.proxy_strategy_combo.clear()
+            self.proxy_strategy_combo.addItems([translator.get(f'proxy_strategy_{s}') for s in STRATEGIES])
+            self.proxy_strategy_combo.setCurrentIndex(strategy_index)
             self.save_proxy_btn.setText(translator.get('settings_save'))
             
             self.thumbnail_group.setTitle(translator.get('settings_misc'))
+            self.cache_label.setText(translator.get('settings_ytdlp_cache'))
+            self.process_extraction_label.setText(translator.get('settings_process_extraction'))
+            self.size_budget_label.setText(translator.get('settings_size_budget'))
+            self.size_budget_spin.setSpecialValueText(translator.get('settings_no_limit'))
+            self.bitrate_budget_label.setText(translator.get('settings_bitrate_budget'))
+            self.bitrate_budget_spin.setSpecialValueText(translator.get('settings_no_limit'))
+            self.staging_label.setText(translator.get('settings_staging_dir'))
+            self.staging_input.setPlaceholderText(translator.get('settings_staging_placeholder'))
+            self.staging_limit_label.setText(translator.get('settings_staging_limit'))
+            self.staging_limit_spin.setSpecialValueText(translator.get('settings_no_limit'))
+            
+            self.sync_group.setTitle(translator.get('settings_sync'))
+            self.sync_sources_input.setPlaceholderText(translator.get('settings_sync_placeholder'))
+            self.save_sync_btn.setText(translator.get('settings_save'))
             
             self.about_group.setTitle(translator.get('settings_about'))
             about_text = f"{translator.get('about_description')}\n\n{translator.get('about_author')}\n{translator.get('about_version')} v{__version__}"
@@ -575,17 +952,14 @@ class MainWindow(QMainWindow):
         self.load_horse_image()
     
     def set_status(self, message, is_error=False):
-        """Update status label with message and color"""
+        """Update status label with message and color (error colour comes from the theme's .qss)"""
         if hasattr(self, 'status_label'):
-            self.status_label.setText(message)
-            if is_error:
-                self.status_label.setStyleSheet("QLabel#status_label { color: #e74c3c; font-size: 14px; font-weight: bold; padding: 5px; }")
-            else:
-                # Use theme-aware color
-                if self.current_theme == "light":
-                    self.status_label.setStyleSheet("QLabel#status_label { color: #2980b9; font-size: 14px; font-weight: bold; padding: 5px; }")
-                else:
-                    self.status_label.setStyleSheet("QLabel#status_label { color: #3498db; font-size: 14px; font-weight: bold; padding: 5px; }")
+            self.ui.set_text(self.status_label, message)
+            self.ui.set_state(self.status_label, 'error', is_error)
+    
+    def show_status_text(self, text):
+        """Replace the status text, keeping the current style state"""
+        self.ui.set_text(self.status_label, text)
     
     def load_horse_image(self):
         """Load and display the horse image with appropriate scaling"""
@@ -625,11 +999,75 @@ class MainWindow(QMainWindow):
         if not url:
             self.set_status(translator.get('error_no_url'), is_error=True)
             return
-            
+        if url == self.fetch_url and (self.current_info is not None or
+                                      (self.fetch_thread is not None and self.fetch_thread.isRunning())):
+            # Already fetched (or being fetched) speculatively
+            return
+        self.start_fetch(url)
+    
+    def on_url_text_changed(self, text):
+        """Cancel a fetch for the old URL and schedule a prefetch for the new one"""
+        url = text.strip()
+        if url == self.fetch_url:
+            self.prefetch_timer.stop()
+            return
+        if self.fetch_url is not None:
+            self.cancel_fetch()
+        # A complete known video/playlist URL (typically pasted) starts at once
+        self.prefetch_timer.start(0 if route_url(url).ie_key else PREFETCH_DEBOUNCE_MS)
+    
+    def prefetch_url(self):
+        """Start a speculative fetch if the URL input holds a usable URL"""
+        url = self.url_input.text().strip()
+        if not url or url == self.fetch_url:
+            return
+        if not route_url(url).ie_key and not url.startswith(('http://', 'https://')):
+            return
+        if len(self.fetch_threads) >= MAX_FETCH_THREADS:
+            # Retried when one of the running fetches exits
+            self.prefetch_waiting = True
+            return
+        print(f"DEBUG: Prefetching {url}", flush=True)
+        self.start_fetch(url)
+    
+    def cancel_fetch(self):
+        """Drop the current fetch; its thread winds down in the background"""
+        if self.fetch_thread is not None:
+            self.fetch_thread.cancel()
+        self.abort_thumbnail()
+        self.fetch_thread = None
+        self.fetch_url = None
+        self.current_info = None
+        self.progress_timer.stop()
+        self.timeout_timer.stop()
+        self.fetch_btn.setEnabled(True)
+        self.download_btn.setEnabled(False)
+    
+    def on_fetch_thread_done(self):
+        thread = self.sender()
+        self.fetch_threads.discard(thread)
+        if thread is not None:
+            # run() is returning - wait for it so deleting the thread is safe
+            thread.wait()
+            thread.deleteLater()
+        if self.prefetch_waiting:
+            self.prefetch_waiting = False
+            self.prefetch_timer.start(0)
+    
+    def start_fetch(self, url):
+        """Fetch preview and formats for a URL"""
+        if self.fetch_thread is not None:
+            self.cancel_fetch()
+        self.fetch_url = url
+        
         # Start progress updates
         self.current_progress_stage = 0
-        self.status_label.setText(self.fetch_progress_stages[0])
+        self.show_status_text(self.fetch_progress_stages[0])
         self.fetch_btn.setEnabled(False)
+        # Enabled again once formats are resolved
+        self.download_btn.setEnabled(False)
+        self.current_info = None
+        self.preview_thumbnail_url = None
         
         # Start progress timer (update every 2.5 seconds - slower for proxy)
         self.progress_timer.start(2500)
@@ -644,19 +1082,22 @@ class MainWindow(QMainWindow):
         self.timeout_timer.start(timeout_duration)
         
         # Start the fetch thread
-        self.fetch_thread = FetchInfoThread(url)
+        self.fetch_thread = FetchInfoThread(url, get_config())
+        self.fetch_thread.preview.connect(self.on_fetch_preview, Qt.QueuedConnection)
         self.fetch_thread.finished.connect(self.on_fetch_complete, Qt.QueuedConnection)
         self.fetch_thread.error.connect(self.on_fetch_error, Qt.QueuedConnection)
+        self.fetch_thread.done.connect(self.on_fetch_thread_done, Qt.QueuedConnection)
+        self.fetch_threads.add(self.fetch_thread)
         self.fetch_thread.start()
         
     def update_fetch_progress(self):
         """Update progress text during fetch operation"""
         if self.current_progress_stage < len(self.fetch_progress_stages) - 1:
             self.current_progress_stage += 1
-            self.status_label.setText(self.fetch_progress_stages[self.current_progress_stage])
+            self.show_status_text(self.fetch_progress_stages[self.current_progress_stage])
         else:
             # If we've gone through all stages, show a waiting message
-            self.status_label.setText("Still working...")
+            self.show_status_text("Still working...")
     
     def show_timeout_warning(self):
         """Update status if fetch is taking longer than expected"""
@@ -664,13 +1105,13 @@ class MainWindow(QMainWindow):
             # Just update status text, don't show intrusive message box
             url = self.url_input.text().lower()
             if 'bilibili.com' in url or 'b23.tv' in url:
-                self.status_label.setText("B站视频较大，请耐心等待...")
+                self.show_status_text("B站视频较大，请耐心等待...")
                 self.status_label.setToolTip(
                     "B站视频可能较大，需要更多时间下载元数据。\n"
                     "请耐心等待，如果超过30秒仍无响应，请检查网络连接。"
                 )
             else:
-                self.status_label.setText("Still fetching... (using Firefox config)")
+                self.show_status_text("Still fetching... (using Firefox config)")
                 self.status_label.setToolTip(
                     "Fetching is taking longer than usual.\n"
                     "The app is using Firefox configuration.\n"
@@ -683,7 +1124,18 @@ class MainWindow(QMainWindow):
             return title
         return title[:max_len] + "..."
     
+    def on_fetch_preview(self, info):
+        """Show the lightweight preview while formats are still being resolved"""
+        if self.sender() is not self.fetch_thread:
+            return  # A stale fetch
+        self.progress_timer.stop()
+        self.is_playlist = False
+        self.show_video_preview(info)
+        self.set_status(translator.get('status_resolving_formats'))
+    
     def on_fetch_complete(self, info):
+        if self.sender() is not self.fetch_thread:
+            return  # A stale fetch
         # Stop timers
         self.progress_timer.stop()
         self.timeout_timer.stop()
@@ -693,77 +1145,90 @@ class MainWindow(QMainWindow):
         
         if 'entries' in info:
             # It's a playlist
-            count = len(info['entries'])
+            entries = [entry for entry in info['entries'] or [] if entry]
+            count = len(entries)
+            try:
+                archive = get_download_archive()
+                skipped = [index for index, entry in enumerate(entries) if entry_archive_id(entry) in archive]
+            except Exception as e:
+                print(f"DEBUG: Download archive unavailable: {e}", flush=True)
+                skipped = []
+            archived = len(skipped)
+            # Already-downloaded entries start unchecked
+            self.job_list_model.set_entries(entries, skipped, get_config().show_thumbnail)
+            self.set_selection_visible(True)
+            videos_text = f"{count} ({archived} already downloaded)" if archived else f"{count}"
             self.preview_label.setText(
                 f"🎬 Playlist: {self.truncate_title(info['title'])}\n"
-                f"📊 Videos: {count}\n"
+                f"📊 Videos: {videos_text}\n"
                 f"👤 Uploader: {info.get('uploader', 'Unknown')}"
             )
             self.thumbnail_label.setText("📁")
             self.thumbnail_label.setStyleSheet("background-color: #CCCCCC; border-radius: 5px; color: white;")
             self.is_playlist = True
         else:
-            # Single video
-            duration = info.get('duration', 0)
-            duration_sec_int = int(duration or 0)
-            duration_min = duration_sec_int // 60
-            duration_sec = duration_sec_int % 60
-            self.preview_label.setText(
-                f"🎬 Title: {self.truncate_title(info['title'])}\n"
-                f"⏱️ Duration: {duration_min}:{duration_sec:02d}\n"
-                f"👤 Uploader: {info.get('uploader', 'Unknown')}\n"
-                f"👁️ Views: {info.get('view_count', 'N/A')}"
-            )
             self.is_playlist = False
-            
-            # Download thumbnail (only if enabled in settings)
-            show_thumbnail = self.settings.value("show_thumbnail", "true") != "false"
-            if show_thumbnail:
-                thumbnail_url = info.get('thumbnail') or info.get('thumbnails', [{}])[0].get('url') if info.get('thumbnails') else None
-                print(f"DEBUG: Thumbnail URL: {thumbnail_url}", flush=True)
-                if thumbnail_url:
-                    self.download_thumbnail(thumbnail_url)
-                else:
-                    self.thumbnail_label.setText("🖼️")
-                    self.thumbnail_label.setStyleSheet("background-color: #CCCCCC; border-radius: 5px; color: white;")
-            else:
-                self.thumbnail_label.setText("")
-                self.thumbnail_label.setStyleSheet("background-color: #CCCCCC; border-radius: 5px;")
+            self.job_list_model.clear_entries()
+            self.set_selection_visible(False)
+            self.show_video_preview(info)
         
         self.set_status(translator.get('status_ready') or "Ready")
         self.download_btn.setEnabled(True)
     
+    def show_video_preview(self, info):
+        """Fill the preview area for a single video (partial or full info)"""
+        duration = info.get('duration', 0)
+        duration_sec_int = int(duration or 0)
+        duration_min = duration_sec_int // 60
+        duration_sec = duration_sec_int % 60
+        self.preview_label.setText(
+            f"🎬 Title: {self.truncate_title(info['title'])}\n"
+            f"⏱️ Duration: {duration_min}:{duration_sec:02d}\n"
+            f"👤 Uploader: {info.get('uploader', 'Unknown')}\n"
+            f"👁️ Views: {info.get('view_count', 'N/A')}"
+        )
+        
+        # Download thumbnail (only if enabled in settings)
+        if get_config().show_thumbnail:
+            # yt-dlp sorts thumbnails by preference, best last
+            thumbnail_url = info.get('thumbnail') or (info.get('thumbnails') or [{}])[-1].get('url')
+            print(f"DEBUG: Thumbnail URL: {thumbnail_url}", flush=True)
+            if thumbnail_url and self.preview_thumbnail_url:
+                pass  # Already loaded in the preview phase
+            elif thumbnail_url:
+                self.preview_thumbnail_url = thumbnail_url
+                self.download_thumbnail(thumbnail_url)
+            else:
+                self.thumbnail_label.setText("🖼️")
+                self.thumbnail_label.setStyleSheet("background-color: #CCCCCC; border-radius: 5px; color: white;")
+        else:
+            self.thumbnail_label.setText("")
+            self.thumbnail_label.setStyleSheet("background-color: #CCCCCC; border-radius: 5px;")
+    
     def download_thumbnail(self, url):
         """Download and display video thumbnail"""
         self.thumbnail_label.setText("⏳")
         self.thumbnail_label.setStyleSheet("background-color: #CCCCCC; border-radius: 5px; color: white;")
         
-        request = QNetworkRequest(QUrl(url))
-        request.setHeader(QNetworkRequest.KnownHeaders.UserAgentHeader, 
-                         'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36')
-        
-        # Set proxy if configured
-        proxy_url = self.get_proxy_url()
-        if proxy_url:
-            from PySide6.QtNetwork import QNetworkProxy
-            self.network_manager.setProxy(QNetworkProxy(QNetworkProxy.HttpProxy, 
-                                                        proxy_url.split('://')[1].split(':')[0] if '://' in proxy_url else proxy_url.split(':')[0],
-                                                        int(proxy_url.split(':')[-1]) if ':' in proxy_url else 8080))
-        
-        reply = self.network_manager.get(request)
-        reply.finished.connect(lambda: self.on_thumbnail_loaded(reply))
+        # The client applies the proxy setting (HTTP or SOCKS5) per request
+        self.thumbnail_request_url = url
+        self.thumbnail_fetcher.get(url)
     
-    def get_proxy_url(self):
-        """Get proxy URL from settings"""
-        from .download_manager import get_proxy_url as dl_get_proxy_url
-        return dl_get_proxy_url()
+    def abort_thumbnail(self):
+        """Drop a thumbnail download that is no longer wanted
+
+        The request finishes in the background (keeping its connection
+        reusable) and its result is ignored.
+        """
+        self.thumbnail_request_url = None
     
-    def on_thumbnail_loaded(self, reply):
-        """Handle thumbnail download complete"""
-        reply.deleteLater()
+    def on_thumbnail_loaded(self, url, data):
+        """Handle thumbnail download complete (data is None on failure)"""
+        if url != self.thumbnail_request_url:
+            return  # Superseded by a newer URL
+        self.thumbnail_request_url = None
         
-        if reply.error() == QNetworkReply.NetworkError.NoError:
-            data = reply.readAll()
+        if data is not None:
             pixmap = QPixmap()
             if pixmap.loadFromData(data):
                 # Scale to fit while maintaining aspect ratio
@@ -774,14 +1239,19 @@ class MainWindow(QMainWindow):
                 self.thumbnail_label.setText("🖼️")
                 self.thumbnail_label.setStyleSheet("background-color: #CCCCCC; border-radius: 5px; color: white;")
         else:
-            print(f"DEBUG: Thumbnail download error: {reply.error()}", flush=True)
+            print(f"DEBUG: Thumbnail download error: {url}", flush=True)
             self.thumbnail_label.setText("🖼️")
             self.thumbnail_label.setStyleSheet("background-color: #CCCCCC; border-radius: 5px; color: white;")
         
-    def on_fetch_error(self, error):
+    def on_fetch_error(self, code, error):
+        if self.sender() is not self.fetch_thread:
+            return  # A stale fetch
         # Stop timers
         self.progress_timer.stop()
         self.timeout_timer.stop()
+        # Fetch (or a prefetch of the same URL) may be retried
+        self.fetch_thread = None
+        self.fetch_url = None
         
         self.fetch_btn.setEnabled(True)
         
@@ -789,27 +1259,27 @@ class MainWindow(QMainWindow):
         short_error = error[:100] + "..." if len(error) > 100 else error
         self.set_status(f"Error: {short_error}", is_error=True)
         
-        # Show appropriate error message based on error type
-        if "Sign in to confirm you're not a bot" in error:
+        # Show appropriate error message based on the classified error code
+        if code == ERROR_BOT_CHECK:
             self.set_status("Please log into the video site in browser and try again", is_error=True)
             self.status_label.setToolTip("The video site is blocking requests. Please:\n\n"
                 "1. Make sure you're logged into the site in Firefox\n"
                 "2. Try again (the app will use Firefox cookies)\n\n"
                 "If this doesn't work, the site may be blocking your IP/VPN.")
+        
+        elif code in (ERROR_RATE_LIMITED, ERROR_FORBIDDEN, ERROR_CIRCUIT_OPEN):
+            # Site is throttling/blocking us - the breaker backs off automatically
+            self.set_status("The video site is blocking requests. Retrying later.", is_error=True)
+            self.status_label.setToolTip(error)
                 
-        elif "JavaScript challenge" in error or "Deno runtime" in error:
+        elif code == ERROR_JS_CHALLENGE:
             # JS challenge error - needs Deno installation
             self.set_status("Deno is required for this video. Please install Deno.", is_error=True)
             self.status_label.setToolTip("The video site requires JavaScript challenge solving.\n\n" +
                 error + "\n\n"
                 "After installing Deno, restart the app.")
             
-        elif "Network connection failed" in error or "Connection timed out" in error:
-            # Network-related error from download_manager
-            self.set_status("Network error. Check your connection.", is_error=True)
-            self.status_label.setToolTip(error)
-            
-        elif "Network is unreachable" in error or "Errno 101" in error or "system proxy" in error.lower() or "blocking" in error.lower():
+        elif code == ERROR_NETWORK:
             # Direct network error or proxy issue
             self.set_status("Network/Proxy issue. Check your VPN/proxy settings.", is_error=True)
             self.status_label.setToolTip("Cannot connect to the video site (blocking requests detected).\n\n"
@@ -832,8 +1302,14 @@ class MainWindow(QMainWindow):
         folder = QFileDialog.getExistingDirectory(self, translator.get('folder_btn'))
         if folder:
             self.output_dir = folder
-            self.settings.setValue("output_dir", folder)
-            self.status_label.setText(f"Download folder: {folder}")
+            update_config(output_dir=folder)
+            self.show_status_text(f"Download folder: {folder}")
+            
+    def select_staging_folder(self):
+        folder = QFileDialog.getExistingDirectory(self, translator.get('settings_staging_dir'))
+        if folder:
+            self.staging_input.setText(folder)
+            update_config(staging_dir=folder)
             
     def start_download(self):
         if not self.current_info:
@@ -841,51 +1317,201 @@ class MainWindow(QMainWindow):
             return
             
         url = self.url_input.text().strip()
+        format_spec = self.current_format_spec()
+        
+        clip = None
+        if self.clip_checkbox.isChecked():
+            try:
+                clip = parse_clip(self.clip_start_input.text(), self.clip_end_input.text())
+            except ValueError as e:
+                self.set_status(f"{translator.get('error_invalid_clip')}{e}", is_error=True)
+                return
+        
+        # Prepare output template - limit title length to 80 chars to avoid file name too long error
+        # Clips get the range in the name so they don't collide with the full video
+        clip_suffix = f" [{clip_label(clip)}]" if clip else ''
+        output_template = f'{self.output_dir}/%(title).80s{clip_suffix}.%(ext)s'
         
-        # Map format selection to yt-dlp format spec (using index)
+        # Get download threads setting
+        threads = get_config().download_threads
+        
+        priority = PRIORITY_HIGH if self.priority_checkbox.isChecked() else PRIORITY_NORMAL
+        if self.is_playlist:
+            self.queue_playlist_entries(clip_suffix, threads, priority, clip)
+            return
+        job = self.download_queue.submit(url, format_spec, output_template, threads, priority, clip=clip)
+        if job.state == STATE_QUEUED:
+            self.set_status(translator.get('status_queued'))
+    
+    def queue_playlist_entries(self, clip_suffix, threads, priority, clip):
+        """Queue every checked playlist entry as its own job, in the playlist's folder"""
+        selected = self.job_list_model.checked_entries()
+        if not selected:
+            self.set_status(translator.get('error_no_entries_selected'), is_error=True)
+            return
+        # The playlist title is literal text in the template - escape yt-dlp's % fields
+        folder = sanitize_filename(self.current_info.get('title') or 'playlist').replace('%', '%%')
+        output_template = f'{self.output_dir}/{folder}/%(title).80s{clip_suffix}.%(ext)s'
+        format_spec = self.current_format_spec()
+        for position, entry in selected:
+            url = entry_url(entry)
+            if not url:
+                continue
+            # Entries were picked by hand, so they are downloaded even if archived
+            job = self.download_queue.submit(url, format_spec, output_template, threads, priority, clip=clip)
+            self.job_list_model.attach_job(position, job.job_id, job.state, job.progress)
+        self.set_status(translator.get('status_queued_entries').format(count=len(selected)))
+    
+    def current_format_spec(self):
+        """Map format selection to yt-dlp format spec (using index)"""
         format_specs = [
             "best",  # Best Available
             "bestvideo[height<=1080]+bestaudio/best",  # MP4 1080p
             "bestvideo[height<=720]+bestaudio/best",  # MP4 720p
             "bestvideo[height<=480]+bestaudio/best",  # MP4 480p
-            "bestaudio/best"  # MP3 Audio
+            AUDIO_MP3_SPEC,  # MP3 Audio
+            AUDIO_ORIGINAL_SPEC  # Audio, original format (no re-encode)
         ]
-        format_spec = format_specs[self.format_combo.currentIndex()]
-        
-        # Prepare output template - limit title length to 80 chars to avoid file name too long error
-        if self.is_playlist:
-            output_template = f'{self.output_dir}/%(playlist_title)s/%(title).80s.%(ext)s'
-        else:
-            output_template = f'{self.output_dir}/%(title).80s.%(ext)s'
-        
-        # Get download threads setting
-        threads = int(self.settings.value("download_threads", "1"))
-            
-        self.download_thread = DownloadThread(url, format_spec, output_template, threads)
-        self.download_thread.progress.connect(self.update_progress)
-        self.download_thread.status.connect(self.status_label.setText)
-        self.download_thread.finished.connect(self.on_download_complete)
-        self.download_thread.error.connect(self.on_download_error)
-        self.download_thread.start()
+        return format_specs[self.format_combo.currentIndex()]
+    
+    def queue_forwarded_urls(self, urls):
+        """Queue URLs passed on the command line or by a later launch, and come to the front"""
+        if self.isMinimized():
+            self.showNormal()
+        self.raise_()
+        self.activateWindow()
+        if not urls:
+            return
+        output_template = f'{self.output_dir}/%(title).80s.%(ext)s'
+        threads = get_config().download_threads
+        for url in urls:
+            self.download_queue.submit(url, self.current_format_spec(), output_template, threads)
+        self.set_status(translator.get('status_queued_entries').format(count=len(urls)))
+    
+    def start_sync(self):
+        """Queue only the new entries of every configured sync source"""
+        sources = list(get_config().sync_sources)
+        if not sources:
+            self.set_status(translator.get('error_no_sync_sources'), is_error=True)
+            return
         
-        self.download_btn.setEnabled(False)
-        self.fetch_btn.setEnabled(False)
+        self.sync_btn.setEnabled(False)
+        self.sync_thread = SyncThread(sources, get_config())
+        self.sync_thread.source_synced.connect(self.on_source_synced)
+        self.sync_thread.status.connect(self.show_status_text)
+        self.sync_thread.finished.connect(self.on_sync_complete)
+        self.sync_thread.error.connect(self.on_sync_error)
+        self.sync_thread.start()
+    
+    def on_source_synced(self, batch):
+        """Queue a source's new entries; the sync cursor follows their completion"""
+        output_template = f'{self.output_dir}/%(uploader)s/%(title).80s.%(ext)s'
+        threads = get_config().download_threads
+        for index, url in enumerate(batch.urls):
+            job_id = self.sync_job_urls.get(url)
+            if job_id is None:
+                # Not already queued by an earlier sync that is still downloading
+                job_id = self.download_queue.submit(url, self.current_format_spec(), output_template,
+                                                    threads, skip_archived=True).job_id
+                self.sync_job_urls[url] = job_id
+            self.sync_jobs.setdefault(job_id, []).append((batch, index))
+    
+    def on_sync_job_state_changed(self, job_id, state):
+        """Advance sync cursors when a sync download finishes"""
+        if job_id not in self.sync_jobs or state not in (STATE_FINISHED, STATE_FAILED, STATE_CANCELLED):
+            return
+        for batch, index in self.sync_jobs.pop(job_id):
+            self.sync_job_urls.pop(batch.urls[index], None)
+            if state == STATE_FINISHED:
+                try:
+                    batch.mark_done(index)
+                except sqlite3.Error as e:
+                    print(f"DEBUG: Sync cursor update failed: {e}", flush=True)
+    
+    def on_sync_complete(self, total):
+        self.sync_btn.setEnabled(True)
+        self.set_status(translator.get('status_sync_complete').format(count=total))
+    
+    def on_sync_error(self, error):
+        self.sync_btn.setEnabled(True)
+        self.set_status(error, is_error=True)
+    
+    def on_job_added(self, job_id):
+        """Show jobs from other sources (single videos, sync, restore) in the job list"""
+        job = self.download_queue.jobs.get(job_id)
+        if job is not None and not self.job_list_model.has_job(job_id):
+            self.job_list_model.add_job(job_id, job.url, job.state, job.progress)
+    
+    def on_job_state_changed(self, job_id, state):
+        """Track the job shown in the progress bar and update controls"""
+        self.job_list_model.set_state(job_id, state)
+        self.on_sync_job_state_changed(job_id, state)
+        if state == STATE_RUNNING:
+            self.current_job_id = job_id
+            self.ui.set_value(self.progress_bar, self.download_queue.jobs[job_id].progress)
+        
+        if job_id != self.current_job_id:
+            return
         
-    def update_progress(self, value):
-        self.progress_bar.setValue(int(value))
+        if state == STATE_PAUSED:
+            self.set_status(translator.get('status_paused'))
+        elif state == STATE_CANCELLED:
+            self.set_status(translator.get('status_cancelled'))
+            self.ui.set_value(self.progress_bar, 0)
         
-    def on_download_complete(self, message):
-        self.download_btn.setEnabled(True)
-        self.fetch_btn.setEnabled(True)
+        active = state in (STATE_RUNNING, STATE_PAUSED)
+        self.pause_btn.setEnabled(active)
+        self.cancel_btn.setEnabled(active)
+        self.pause_btn.setText(translator.get('resume_btn' if state == STATE_PAUSED else 'pause_btn'))
+    
+    def on_job_status(self, job_id, text):
+        if job_id == self.current_job_id:
+            self.show_status_text(text)
+    
+    def toggle_pause(self):
+        """Pause the current download, or resume it if it is paused"""
+        job = self.download_queue.jobs.get(self.current_job_id)
+        if not job:
+            return
+        if job.state == STATE_PAUSED:
+            self.download_queue.resume(job.job_id)
+        else:
+            self.download_queue.pause(job.job_id)
+    
+    def cancel_download(self):
+        """Cancel the current download and remove its partial files"""
+        if self.current_job_id:
+            self.download_queue.cancel(self.current_job_id)
+        
+    def update_progress(self, job_id, value):
+        self.job_list_model.set_progress(job_id, value)
+        if job_id == self.current_job_id:
+            self.ui.set_value(self.progress_bar, value)
+        
+    def on_download_complete(self, job_id, message):
+        if self.tab_widget.currentWidget() is self.history_tab:
+            self.refresh_history()
+        if job_id != self.current_job_id:
+            return
         self.set_status(message)
-        self.progress_bar.setValue(100)
+        self.ui.set_value(self.progress_bar, 100)
         
-    def on_download_error(self, error):
-        self.download_btn.setEnabled(True)
-        self.fetch_btn.setEnabled(True)
+    def on_download_error(self, job_id, error):
+        if job_id != self.current_job_id:
+            return
         self.set_status(f"{translator.get('status_error')}{error}", is_error=True)
         self.status_label.setToolTip(f"Download failed:\n{error}")
     
+    def closeEvent(self, event):
+        """Stop downloads (keeping partial files) before the window closes"""
+        # Pausing can wait out a stalled socket - don't leave a frozen window on screen meanwhile
+        self.hide()
+        # True if a download thread did not stop; main() then ends the process without cleanup
+        self.threads_stuck = not self.download_queue.shutdown()
+        shutdown_extract_pool()
+        get_http_client().close()
+        super().closeEvent(event)
+    
     def update_ui_text(self):
         """Update all UI text when language changes"""
         self.setWindowTitle(translator.get('window_title'))
@@ -905,6 +1531,7 @@ class MainWindow(QMainWindow):
         if hasattr(self, 'tab_widget'):
             self.tab_widget.setTabText(0, translator.get('tab_main'))
             self.tab_widget.setTabText(1, translator.get('tab_settings'))
+            self.tab_widget.setTabText(2, translator.get('tab_history'))
         
         # Find and update all widgets
         for widget in self.findChildren(QLabel):
@@ -922,6 +1549,27 @@ class MainWindow(QMainWindow):
         self.fetch_btn.setText(translator.get('fetch_btn'))
         self.download_btn.setText(translator.get('download_btn'))
         self.folder_btn.setToolTip(translator.get('folder_btn'))
+        self.priority_checkbox.setText(translator.get('priority_high'))
+        self.clip_checkbox.setText(translator.get('clip_checkbox'))
+        self.clip_start_input.setPlaceholderText(translator.get('clip_start_placeholder'))
+        self.clip_end_input.setPlaceholderText(translator.get('clip_end_placeholder'))
+        self.select_all_btn.setText(translator.get('select_all_btn'))
+        self.select_none_btn.setText(translator.get('select_none_btn'))
+        self.job_list_model.headerDataChanged.emit(Qt.Horizontal, 0, self.job_list_model.columnCount() - 1)
+        self.sync_btn.setText(translator.get('sync_btn'))
+        self.cancel_btn.setText(translator.get('cancel_btn'))
+        current_job = self.download_queue.jobs.get(self.current_job_id)
+        paused = current_job is not None and current_job.state == STATE_PAUSED
+        self.pause_btn.setText(translator.get('resume_btn' if paused else 'pause_btn'))
+        
+        # Update history tab
+        self.history_search_input.setPlaceholderText(translator.get('history_search_placeholder'))
+        range_index = self.history_range_combo.currentIndex()
+        self.history_range_combo.clear()
+        self.history_range_combo.addItems([translator.get(key) for key, _ in HISTORY_RANGES])
+        self.history_range_combo.setCurrentIndex(range_index)
+        self.history_site_combo.setItemText(0, translator.get('history_all_sites'))
+        self.history_model.headerDataChanged.emit(Qt.Horizontal, 0, self.history_model.columnCount() - 1)
         
         # Update combo box
         current_index = self.format_combo.currentIndex()
@@ -931,7 +1579,8 @@ class MainWindow(QMainWindow):
             translator.get('format_1080p'),
             translator.get('format_720p'),
             translator.get('format_480p'),
-            translator.get('format_mp3')
+            translator.get('format_mp3'),
+            translator.get('format_audio_original')
         ])
         self.format_combo.setCurrentIndex(current_index)
         
@@ -0,0 +1,33 @@
+# Application data locations for Fast-Horse-2026
+
+import os
+from PySide6.QtCore import QStandardPaths
+
+
+def get_data_dir():
+    """Return the per-user data directory (created if missing)"""
+    data_dir = QStandardPaths.writableLocation(QStandardPaths.AppDataLocation)
+    if not data_dir:
+        data_dir = os.path.join(os.path.expanduser('~'), '.fast-horse-2026')
+    os.makedirs(data_dir, exist_ok=True)
+    return data_dir
+
+
+def get_data_path(name):
+    """Return the path of a file inside the data directory"""
+    return os.path.join(get_data_dir(), name)
+
+
+def get_cache_dir(name=''):
+    """Return a per-user cache directory (created if missing)
+
+    Unlike yt-dlp's own default, this does not depend on XDG_CACHE_HOME or
+    on whether the app runs from source or as a frozen build.
+    """
+    cache_dir = QStandardPaths.writableLocation(QStandardPaths.CacheLocation)
+    if not cache_dir:
+        cache_dir = os.path.join(get_data_dir(), 'cache')
+    if name:
+        cache_dir = os.path.join(cache_dir, name)
+    os.makedirs(cache_dir, exist_ok=True)
+    return cache_dir
@@ -0,0 +1,185 @@
+# Proxy pool for Fast-Horse-2026
+# Health/latency checks, per-job proxy assignment, failover and throughput stats
+
+import socket
+import threading
+import time
+from urllib.parse import urlparse
+from .config import get_config, add_config_listener
+
+# Assignment strategies
+STRATEGY_ROUND_ROBIN = 'round_robin'
+STRATEGY_LEAST_LOADED = 'least_loaded'
+STRATEGY_LOWEST_LATENCY = 'lowest_latency'
+STRATEGIES = (STRATEGY_ROUND_ROBIN, STRATEGY_LEAST_LOADED, STRATEGY_LOWEST_LATENCY)
+
+# Seconds between background health checks
+HEALTH_CHECK_INTERVAL = 60
+HEALTH_CHECK_TIMEOUT = 3
+
+
+class ProxyStats:
+    """Health, load and throughput of one proxy"""
+
+    def __init__(self, url):
+        self.url = url
+        self.healthy = True
+        self.latency = None  # seconds, from the last health check
+        self.active = 0
+        self.failures = 0
+        self.bytes = 0
+        self.seconds = 0.0
+
+    @property
+    def throughput(self):
+        """Average bytes per second over all finished jobs"""
+        return self.bytes / self.seconds if self.seconds > 0 else 0.0
+
+    def as_dict(self):
+        return {
+            'url': self.url,
+            'healthy': self.healthy,
+            'latency': self.latency,
+            'active': self.active,
+            'failures': self.failures,
+            'throughput': self.throughput,
+        }
+
+
+def check_proxy_latency(url, timeout=HEALTH_CHECK_TIMEOUT):
+    """Return TCP connect time to the proxy in seconds, or None if unreachable"""
+    parsed = urlparse(url)
+    if not parsed.hostname or not parsed.port:
+        return None
+    start = time.monotonic()
+    try:
+        with socket.create_connection((parsed.hostname, parsed.port), timeout=timeout):
+            return time.monotonic() - start
+    except OSError:
+        return None
+
+
+class ProxyPool:
+    """A list of proxies that jobs acquire and release
+
+    Jobs call acquire() to get a proxy chosen by the pool's strategy and
+    release() when done, reporting bytes transferred and whether the proxy
+    failed. Failed proxies are skipped until a health check sees them again.
+    """
+
+    def __init__(self, proxies=(), strategy=STRATEGY_ROUND_ROBIN):
+        self._lock = threading.Lock()
+        self._stats = {}
+        self._order = []
+        self._next = 0
+        self._stop = threading.Event()
+        self._checker = None
+        self.strategy = strategy if strategy in STRATEGIES else STRATEGY_ROUND_ROBIN
+        self.set_proxies(proxies)
+
+    def __len__(self):
+        return len(self._order)
+
+    def set_proxies(self, proxies):
+        """Replace the proxy list, keeping stats of proxies that remain"""
+        with self._lock:
+            self._order = [p for p in dict.fromkeys(proxies) if p]
+            self._stats = {p: self._stats.get(p) or ProxyStats(p) for p in self._order}
+            self._next = 0
+
+    def acquire(self):
+        """Pick a proxy for a job; returns None if the pool is empty"""
+        with self._lock:
+            if not self._order:
+                return None
+            candidates = [self._stats[p] for p in self._order if self._stats[p].healthy]
+            if not candidates:
+                # Everything looks down - try the one that failed least
+                candidates = [min(self._stats.values(), key=lambda s: s.failures)]
+
+            if self.strategy == STRATEGY_LEAST_LOADED:
+                chosen = min(candidates, key=lambda s: (s.active, s.latency or 0))
+            elif self.strategy == STRATEGY_LOWEST_LATENCY:
+                chosen = min(candidates, key=lambda s: (s.latency is None, s.latency or 0, s.active))
+            else:
+                chosen = candidates[self._next % len(candidates)]
+                self._next += 1
+
+            chosen.active += 1
+            return chosen.url
+
+    def release(self, url, bytes_transferred=0, seconds=0.0, failed=False):
+        """Return a proxy after a job; failed marks it unhealthy"""
+        with self._lock:
+            stats = self._stats.get(url)
+            if stats is None:
+                return
+            stats.active = max(0, stats.active - 1)
+            stats.bytes += bytes_transferred
+            stats.seconds += seconds
+            if failed:
+                stats.failures += 1
+                stats.healthy = False
+                print(f"DEBUG: ProxyPool - {url} marked unhealthy", flush=True)
+
+    def check_health(self):
+        """Measure latency of every proxy and update its health"""
+        with self._lock:
+            urls = list(self._order)
+        results = {url: check_proxy_latency(url) for url in urls}
+        with self._lock:
+            for url, latency in results.items():
+                stats = self._stats.get(url)
+                if stats is not None:
+                    stats.latency = latency
+                    stats.healthy = latency is not None
+
+    def start_health_checks(self, interval=HEALTH_CHECK_INTERVAL):
+        """Run check_health() periodically on a background thread"""
+        if self._checker is not None:
+            return
+
+        def loop():
+            while not self._stop.is_set():
+                self.check_health()
+                self._stop.wait(interval)
+
+        self._checker = threading.Thread(target=loop, name='proxy-health', daemon=True)
+        self._checker.start()
+
+    def stop_health_checks(self):
+        self._stop.set()
+
+    def stats(self):
+        """Snapshot of per-proxy stats"""
+        with self._lock:
+            return [self._stats[p].as_dict() for p in self._order]
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_proxy_pool():
+    """Return the shared ProxyPool, created from the settings snapshot on first use"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            config = get_config()
+            _pool = ProxyPool(config.proxy_pool, config.proxy_strategy)
+            if config.proxy_pool:
+                _pool.start_health_checks()
+            # Follow later settings changes
+            add_config_listener(apply_proxy_pool_config)
+        return _pool
+
+
+def apply_proxy_pool_config(config):
+    """Apply a new settings snapshot to the shared pool"""
+    pool = _pool
+    if pool is None:
+        return
+    pool.set_proxies(config.proxy_pool)
+    pool.strategy = config.proxy_strategy if config.proxy_strategy in STRATEGIES else STRATEGY_ROUND_ROBIN
+    if config.proxy_pool:
+        pool.start_health_checks()
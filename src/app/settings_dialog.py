@@ -5,8 +5,9 @@ from PySide6.QtWidgets import (
     QComboBox, QLineEdit, QPushButton, QFormLayout,
     QMessageBox
 )
-from PySide6.QtCore import Qt, QSettings
+from PySide6.QtCore import Qt
 from .translations import translator
+from .config import get_config, update_config, PROXY_TYPES, ProxyType
 
 class SettingsDialog(QDialog):
     """Dialog for configuring proxy settings"""
@@ -16,7 +17,6 @@ class SettingsDialog(QDialog):
         self.setWindowTitle(translator.get('settings_title'))
         self.setMinimumWidth(400)
         
-        self.settings = QSettings("Fast-Horse-2026", "App")
         
         self.setup_ui()
         self.load_settings()
@@ -71,30 +71,20 @@ class SettingsDialog(QDialog):
         layout.addLayout(button_layout)
         
     def load_settings(self):
-        """Load current settings from QSettings"""
-        proxy_type = self.settings.value("proxy_type", translator.get('settings_proxy_socks5'))
-        proxy_host = self.settings.value("proxy_host", "127.0.0.1")
-        proxy_port = self.settings.value("proxy_port", "10808")
-        
-        # Set proxy type
-        if proxy_type == translator.get('settings_proxy_none'):
-            self.proxy_type_combo.setCurrentIndex(0)
-        elif proxy_type == translator.get('settings_proxy_socks5'):
-            self.proxy_type_combo.setCurrentIndex(1)
-        elif proxy_type == translator.get('settings_proxy_http'):
-            self.proxy_type_combo.setCurrentIndex(2)
-        
-        self.proxy_host_input.setText(proxy_host)
-        self.proxy_port_input.setText(proxy_port)
+        """Load current settings from the settings snapshot"""
+        config = get_config()
+        self.proxy_type_combo.setCurrentIndex(PROXY_TYPES.index(config.proxy_type))
+        self.proxy_host_input.setText(config.proxy_host)
+        self.proxy_port_input.setText(config.proxy_port)
         
     def save_settings(self):
-        """Save settings to QSettings"""
-        proxy_type = self.proxy_type_combo.currentText()
+        """Save settings and publish a new settings snapshot"""
+        proxy_type = PROXY_TYPES[self.proxy_type_combo.currentIndex()]
         proxy_host = self.proxy_host_input.text().strip()
         proxy_port = self.proxy_port_input.text().strip()
         
         # Validate port
-        if proxy_type != translator.get('settings_proxy_none'):
+        if proxy_type != ProxyType.NONE:
             if not proxy_host:
                 QMessageBox.warning(self, "Warning", "Please enter proxy host")
                 return
@@ -110,24 +100,11 @@ class SettingsDialog(QDialog):
                 return
         
         # Save settings
-        self.settings.setValue("proxy_type", proxy_type)
-        self.settings.setValue("proxy_host", proxy_host)
-        self.settings.setValue("proxy_port", proxy_port)
+        update_config(proxy_type=proxy_type, proxy_host=proxy_host, proxy_port=proxy_port)
         
         QMessageBox.information(self, "Success", "Settings saved successfully")
         self.accept()
         
     def get_proxy_url(self):
-        """Get proxy URL from settings"""
-        proxy_type = self.settings.value("proxy_type", translator.get('settings_proxy_socks5'))
-        proxy_host = self.settings.value("proxy_host", "127.0.0.1")
-        proxy_port = self.settings.value("proxy_port", "10808")
-        
-        if proxy_type == translator.get('settings_proxy_none'):
-            return None
-        elif proxy_type == translator.get('settings_proxy_socks5'):
-            return f"socks5://{proxy_host}:{proxy_port}"
-        elif proxy_type == translator.get('settings_proxy_http'):
-            return f"http://{proxy_host}:{proxy_port}"
-        else:
-            return f"socks5://{proxy_host}:{proxy_port}"
\ No newline at end of file
+        """Get proxy URL from settings (None means no proxy)"""
+        return get_config().proxy_url or None
@@ -0,0 +1,119 @@
+# Single-instance support for Fast-Horse-2026
+# Later launches hand their URLs to the running instance over a local socket and exit
+#
+# Only QtCore/QtNetwork are imported here, so a second launch can forward
+# its URLs before paying for QtWidgets windows, yt-dlp or the stylesheets.
+
+import getpass
+import hashlib
+import os
+from PySide6.QtCore import QObject, Signal
+from PySide6.QtNetwork import QLocalServer, QLocalSocket
+
+# How long a second launch waits for the running instance
+CONNECT_TIMEOUT_MS = 500
+WRITE_TIMEOUT_MS = 1000
+
+
+def server_name():
+    """Per-user socket name, so two users on one machine each get an instance"""
+    try:
+        user = getpass.getuser()
+    except Exception:
+        user = os.path.expanduser('~')
+    return 'fast-horse-2026-' + hashlib.sha1(user.encode('utf-8')).hexdigest()[:12]
+
+
+def urls_from_args(args):
+    """Collect URLs from command-line arguments
+
+    Arguments may be URLs, or files opened through a file association:
+    an Internet shortcut (.url, URL=... line) or a text file with one URL
+    per line.
+    """
+    urls = []
+    for arg in args:
+        if arg.startswith(('http://', 'https://')):
+            urls.append(arg)
+        elif os.path.isfile(arg):
+            try:
+                with open(arg, 'r', encoding='utf-8', errors='replace') as f:
+                    lines = [line.strip() for line in f]
+            except OSError:
+                continue
+            for line in lines:
+                if line.upper().startswith('URL='):
+                    line = line[4:]
+                if line.startswith(('http://', 'https://')):
+                    urls.append(line)
+    return urls
+
+
+def forward_to_running_instance(urls):
+    """Send urls to an already running instance; False if none is running
+
+    An empty list still counts: the running instance brings its window to
+    the front.
+    """
+    socket = QLocalSocket()
+    socket.connectToServer(server_name())
+    if not socket.waitForConnected(CONNECT_TIMEOUT_MS):
+        return False
+    socket.write(('\n'.join(urls) + '\n').encode('utf-8'))
+    socket.flush()
+    socket.waitForBytesWritten(WRITE_TIMEOUT_MS)
+    socket.disconnectFromServer()
+    if socket.state() != QLocalSocket.UnconnectedState:
+        socket.waitForDisconnected(WRITE_TIMEOUT_MS)
+    return True
+
+
+class SingleInstanceServer(QObject):
+    """Accepts URLs from later launches; emits them as one list per launch"""
+
+    urls_received = Signal(list)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._server = QLocalServer(self)
+        self._server.newConnection.connect(self._on_new_connection)
+        self._buffers = {}
+
+    def listen(self):
+        """Start listening; returns False if another instance got there first"""
+        name = server_name()
+        if self._server.listen(name):
+            return True
+        # Another launch may have started at the same moment - only a socket
+        # nobody answers on is a leftover of a crashed instance (Unix)
+        probe = QLocalSocket()
+        probe.connectToServer(name)
+        if probe.waitForConnected(CONNECT_TIMEOUT_MS):
+            probe.abort()
+            return False
+        QLocalServer.removeServer(name)
+        if self._server.listen(name):
+            return True
+        print(f"DEBUG: Single instance server unavailable: {self._server.errorString()}", flush=True)
+        return False
+
+    def close(self):
+        self._server.close()
+
+    def _on_new_connection(self):
+        while self._server.hasPendingConnections():
+            socket = self._server.nextPendingConnection()
+            self._buffers[socket] = bytearray()
+            socket.readyRead.connect(lambda socket=socket: self._on_ready_read(socket))
+            socket.disconnected.connect(lambda socket=socket: self._on_disconnected(socket))
+
+    def _on_ready_read(self, socket):
+        self._buffers[socket] += bytes(socket.readAll())
+
+    def _on_disconnected(self, socket):
+        self._on_ready_read(socket)
+        data = self._buffers.pop(socket, b'')
+        socket.deleteLater()
+        urls = [line.strip() for line in data.decode('utf-8', errors='replace').splitlines() if line.strip()]
+        print(f"DEBUG: Received {len(urls)} URL(s) from another launch", flush=True)
+        self.urls_received.emit(urls)
@@ -0,0 +1,183 @@
+# Per-site error policy for Fast-Horse-2026
+# Classifies download/extraction errors and keeps a circuit breaker per site
+
+import random
+import re
+import threading
+import time
+from .url_router import route_url
+
+# Structured error codes
+ERROR_BOT_CHECK = 'bot_check'
+ERROR_RATE_LIMITED = 'rate_limited'
+ERROR_FORBIDDEN = 'forbidden'
+ERROR_JS_CHALLENGE = 'js_challenge'
+ERROR_FORMAT_UNAVAILABLE = 'format_unavailable'
+ERROR_NETWORK = 'network'
+ERROR_UNAVAILABLE = 'unavailable'
+ERROR_CIRCUIT_OPEN = 'circuit_open'
+ERROR_UNKNOWN = 'unknown'
+
+# Errors that mean the site is blocking us - retrying other cookies won't help
+BLOCKING_ERRORS = {ERROR_BOT_CHECK, ERROR_RATE_LIMITED, ERROR_FORBIDDEN}
+
+# HTTP status -> error code
+_HTTP_STATUS_ERRORS = {
+    429: ERROR_RATE_LIMITED,
+    403: ERROR_FORBIDDEN,
+}
+
+# Message patterns, checked in order, for errors without a usable status
+_MESSAGE_PATTERNS = [
+    (re.compile(r'Sign in to confirm', re.I), ERROR_BOT_CHECK),
+    (re.compile(r'HTTP Error 429|Too Many Requests', re.I), ERROR_RATE_LIMITED),
+    (re.compile(r'HTTP Error 403|Forbidden', re.I), ERROR_FORBIDDEN),
+    (re.compile(r'challenge solving failed|n challenge|Deno runtime|JavaScript challenge', re.I), ERROR_JS_CHALLENGE),
+    (re.compile(r'Requested format is not available', re.I), ERROR_FORMAT_UNAVAILABLE),
+    (re.compile(r'Network is unreachable|Errno 101|timed out|Connection refused|'
+                r'Unable to connect to proxy|Network connection failed|Name or service not known', re.I), ERROR_NETWORK),
+    (re.compile(r'Video unavailable|Private video|This video is not available', re.I), ERROR_UNAVAILABLE),
+]
+
+# Circuit breaker states
+STATE_CLOSED = 'closed'
+STATE_OPEN = 'open'
+STATE_HALF_OPEN = 'half_open'
+
+
+def _error_chain(error):
+    """Yield the error and the exceptions it wraps (yt-dlp nests them)"""
+    seen = set()
+    while error is not None and id(error) not in seen:
+        seen.add(id(error))
+        yield error
+        exc_info = getattr(error, 'exc_info', None)
+        if exc_info and isinstance(exc_info, tuple) and len(exc_info) > 1:
+            error = exc_info[1]
+        else:
+            error = getattr(error, 'cause', None) or error.__cause__
+
+
+def classify_error(error):
+    """Map an exception (or error message) to one of the ERROR_* codes"""
+    if error is None:
+        return ERROR_UNKNOWN
+
+    messages = []
+    if isinstance(error, BaseException):
+        for exc in _error_chain(error):
+            status = getattr(exc, 'status', None) or getattr(exc, 'code', None)
+            if isinstance(status, int) and status in _HTTP_STATUS_ERRORS:
+                return _HTTP_STATUS_ERRORS[status]
+            messages.append(str(exc))
+    else:
+        messages.append(str(error))
+
+    text = '\n'.join(messages)
+    for pattern, code in _MESSAGE_PATTERNS:
+        if pattern.search(text):
+            return code
+    return ERROR_UNKNOWN
+
+
+def site_for_url(url):
+    """Return the key used to group a URL's requests ('youtube', 'bilibili' or host)"""
+    return route_url(url).site
+
+
+class CircuitBreaker:
+    """Circuit breaker with exponential backoff and jitter
+
+    Opens after failure_threshold consecutive blocking errors. While open,
+    requests fail fast; after the backoff a single probe is let through
+    (half-open). Each re-open doubles the backoff up to max_backoff.
+    """
+
+    def __init__(self, failure_threshold=1, base_backoff=30.0, max_backoff=1800.0,
+                 probe_timeout=60.0):
+        self.failure_threshold = failure_threshold
+        self.probe_timeout = probe_timeout
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self.state = STATE_CLOSED
+        self.failures = 0
+        self.open_count = 0
+        self.open_until = 0.0
+        self.last_error = None
+
+    def allow(self, now):
+        if self.state == STATE_CLOSED:
+            return True
+        if now >= self.open_until:
+            # Let one probe request through; if it never reports back,
+            # another probe is allowed after probe_timeout
+            self.state = STATE_HALF_OPEN
+            self.open_until = now + self.probe_timeout
+            return True
+        return False
+
+    def record_success(self):
+        self.state = STATE_CLOSED
+        self.failures = 0
+        self.open_count = 0
+        self.last_error = None
+
+    def record_failure(self, code, now):
+        self.last_error = code
+        self.failures += 1
+        if self.state == STATE_HALF_OPEN or self.failures >= self.failure_threshold:
+            self.open_count += 1
+            backoff = min(self.max_backoff, self.base_backoff * (2 ** (self.open_count - 1)))
+            # Jitter so parallel jobs don't all probe at the same moment
+            self.open_until = now + random.uniform(backoff / 2, backoff)
+            self.state = STATE_OPEN
+
+    def retry_after(self, now):
+        if self.state != STATE_OPEN:
+            return 0.0
+        return max(0.0, self.open_until - now)
+
+
+class SitePolicy:
+    """Tracks a circuit breaker per site, shared by all fetch/download threads"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._breakers = {}
+
+    def _breaker(self, site):
+        if site not in self._breakers:
+            self._breakers[site] = CircuitBreaker()
+        return self._breakers[site]
+
+    def allow_request(self, site):
+        """Return True if direct requests to the site may be attempted"""
+        with self._lock:
+            return self._breaker(site).allow(time.monotonic())
+
+    def record_success(self, site):
+        with self._lock:
+            self._breaker(site).record_success()
+
+    def record_failure(self, site, code):
+        """Record an error; returns True if the site's breaker is now open"""
+        if code not in BLOCKING_ERRORS:
+            return False
+        with self._lock:
+            breaker = self._breaker(site)
+            breaker.record_failure(code, time.monotonic())
+            print(f"DEBUG: SitePolicy - {site} failed with {code}, breaker {breaker.state}", flush=True)
+            return breaker.state == STATE_OPEN
+
+    def retry_after(self, site):
+        """Seconds until the site's breaker lets a probe through"""
+        with self._lock:
+            return self._breaker(site).retry_after(time.monotonic())
+
+    def last_error(self, site):
+        with self._lock:
+            return self._breaker(site).last_error
+
+
+# Global policy instance shared by all jobs
+site_policy = SitePolicy()
@@ -0,0 +1,94 @@
+# Staging directory for Fast-Horse-2026
+# Intermediate files live on fast local storage; only finished files go to the output folder
+
+import os
+import shutil
+import uuid
+
+# Name of the temp file used while copying across filesystems
+_COPY_SUFFIX = '.fhcopy'
+COPY_CHUNK_SIZE = 1024 * 1024
+
+
+def staging_enabled(config):
+    return bool(config.staging_dir)
+
+
+def job_staging_dir(config, job_id):
+    """Per-job directory under the staging root, so paused jobs keep their .part files"""
+    return os.path.join(config.staging_dir, job_id or uuid.uuid4().hex[:12])
+
+
+def split_output_template(output_template):
+    """Split '/out/%(playlist_title)s/%(title)s.%(ext)s' into ('/out', '%(playlist_title)s/...')
+
+    The directory part is everything before the first path component
+    that contains a template field.
+    """
+    parts = output_template.replace('\\', '/').split('/')
+    for index, part in enumerate(parts):
+        if '%(' in part:
+            break
+    else:
+        index = len(parts) - 1
+    return '/'.join(parts[:index]) or '.', '/'.join(parts[index:])
+
+
+def staging_usage(config):
+    """Bytes currently used under the staging root"""
+    total = 0
+    for dirpath, _, filenames in os.walk(config.staging_dir):
+        for filename in filenames:
+            try:
+                total += os.path.getsize(os.path.join(dirpath, filename))
+            except OSError:
+                continue
+    return total
+
+
+def staging_full(config):
+    """True if the staging root has reached its size limit"""
+    if not staging_enabled(config) or not config.staging_limit_gb:
+        return False
+    return staging_usage(config) >= config.staging_limit_gb * 1073741824
+
+
+def move_to_destination(path, staging_dir, destination_dir, hasher=None):
+    """Move a finished file out of staging, keeping its relative path
+
+    Same filesystem: a plain rename. Otherwise the file is copied to a
+    temp name next to the destination and renamed into place, so the
+    output folder never shows a half-copied file. If a hasher is given it
+    is fed while copying. Returns (new path, hex digest or None).
+    """
+    relative = os.path.relpath(path, staging_dir)
+    destination = os.path.join(destination_dir, relative)
+    os.makedirs(os.path.dirname(os.path.abspath(destination)), exist_ok=True)
+    try:
+        os.replace(path, destination)
+        return destination, None
+    except OSError:
+        # Different filesystem (EXDEV) - copy, then rename atomically
+        pass
+    temp = destination + _COPY_SUFFIX
+    try:
+        with open(path, 'rb') as src, open(temp, 'wb') as dst:
+            for chunk in iter(lambda: src.read(COPY_CHUNK_SIZE), b''):
+                dst.write(chunk)
+                if hasher is not None:
+                    hasher.update(chunk)
+        shutil.copystat(path, temp)
+        os.replace(temp, destination)
+    except BaseException:
+        try:
+            os.remove(temp)
+        except OSError:
+            pass
+        raise
+    os.remove(path)
+    return destination, hasher.hexdigest() if hasher is not None else None
+
+
+def remove_job_staging(staging_dir):
+    """Delete a job's staging directory and anything left in it"""
+    shutil.rmtree(staging_dir, ignore_errors=True)
@@ -23,6 +23,24 @@ class Translator:
             # Tabs
             'tab_main': "Main",
             'tab_settings': "Settings",
+            'tab_history': "History",
+
+            # History tab
+            'history_search_placeholder': "Search title or uploader...",
+            'history_all_sites': "All sites",
+            'history_any_time': "Any time",
+            'history_today': "Today",
+            'history_last_week': "Last 7 days",
+            'history_last_month': "Last 30 days",
+            'history_count': "{count} downloads",
+            'history_col_date': "Date",
+            'history_col_title': "Title",
+            'history_col_uploader': "Uploader",
+            'history_col_site': "Site",
+            'history_col_format': "Format",
+            'history_col_size': "Size",
+            'history_col_speed': "Avg Speed",
+            'history_col_status': "Status",
 
             # Settings tab sections
             'settings_language': "Language",
@@ -31,7 +49,17 @@ class Translator:
             'settings_about': "About",
             'settings_show_thumbnail': "Show Thumbnail",
             'settings_threads': "Download Threads",
+            'settings_ytdlp_cache': "yt-dlp Cache:",
+            'settings_process_extraction': "Extract in Worker Processes:",
+            'settings_size_budget': "Max File Size:",
+            'settings_bitrate_budget': "Max Bitrate:",
+            'settings_no_limit': "No limit",
+            'settings_staging_dir': "Staging Folder:",
+            'settings_staging_placeholder': "Off - write directly to the download folder",
+            'settings_staging_limit': "Staging Limit:",
             'settings_misc': "Misc.",
+            'settings_sync': "Sync Sources",
+            'settings_sync_placeholder': "One channel, playlist or Bilibili space URL per line",
 
             # Language options
             'language_english': "English",
@@ -51,6 +79,7 @@ class Translator:
             'url_label': "Resource URL:",
             'url_placeholder': "Paste YouTube or Bilibili URL here...",
             'fetch_btn': "Fetch Info",
+            'sync_btn': "Sync",
             'preview_label': "No video loaded",
             'format_label': "Format:",
             'format_best': "Best Available",
@@ -58,17 +87,33 @@ class Translator:
             'format_720p': "MP4 720p", 
             'format_480p': "MP4 480p",
             'format_mp3': "MP3 Audio",
+            'format_audio_original': "Audio (Original, No Re-encode)",
             
             # Folder selection
             'folder_btn': "Select Folder",
             'download_btn': "Download",
+            'pause_btn': "Pause",
+            'resume_btn': "Resume",
+            'cancel_btn': "Cancel",
+            'priority_high': "High priority",
+            'clip_checkbox': "Clip only",
+            'clip_start_placeholder': "Start (e.g. 1:30)",
+            'clip_end_placeholder': "End (empty = to the end)",
+            'error_invalid_clip': "Invalid clip range: ",
             
             # Status messages
             'status_ready': "Ready",
+            'status_resolving_formats': "Resolving formats...",
             'status_fetching': "Fetching video info...",
             'status_downloading': "Downloading...",
             'status_complete': "Download complete!",
             'status_error': "Error: ",
+            'status_queued': "Queued",
+            'status_queued_entries': "Queued {count} videos",
+            'status_paused': "Paused",
+            'status_cancelled': "Download cancelled",
+            'status_resuming': "Resuming {count} interrupted download(s)",
+            'status_sync_complete': "Sync complete: {count} new video(s) queued",
             
             # Progress stages
             'progress_connecting': "Connecting through proxy...",
@@ -79,6 +124,22 @@ class Translator:
             # Error messages
             'error_no_url': "Please enter a resource URL",
             'error_fetch_first': "Please fetch resource info first",
+            'error_no_entries_selected': "Select at least one video in the list",
+
+            # Job list
+            'select_all_btn': "Select All",
+            'select_none_btn': "Select None",
+            'job_col_title': "Title",
+            'job_col_duration': "Duration",
+            'job_col_state': "State",
+            'job_col_progress': "Progress",
+            'job_state_queued': "Queued",
+            'job_state_running': "Downloading",
+            'job_state_paused': "Paused",
+            'job_state_finished': "Done",
+            'job_state_failed': "Failed",
+            'job_state_cancelled': "Cancelled",
+            'error_no_sync_sources': "Add sync sources in Settings first",
             'error_network': "Network error. Check proxy settings.",
             'error_deno': "Deno not found. Install Deno for JS challenges.",
             
@@ -91,6 +152,11 @@ class Translator:
             'settings_proxy_none': "No Proxy",
             'settings_proxy_socks5': "SOCKS5",
             'settings_proxy_http': "HTTP",
+            'settings_proxy_pool': "Proxy Pool:",
+            'settings_proxy_strategy': "Pool Strategy:",
+            'proxy_strategy_round_robin': "Round robin",
+            'proxy_strategy_least_loaded': "Least loaded",
+            'proxy_strategy_lowest_latency': "Lowest latency",
             'settings_save': "Save",
             'settings_cancel': "Cancel",
             
@@ -114,6 +180,24 @@ class Translator:
             # Tabs
             'tab_main': "主界面",
             'tab_settings': "设置",
+            'tab_history': "历史",
+
+            # History tab
+            'history_search_placeholder': "搜索标题或上传者...",
+            'history_all_sites': "所有网站",
+            'history_any_time': "全部时间",
+            'history_today': "今天",
+            'history_last_week': "最近7天",
+            'history_last_month': "最近30天",
+            'history_count': "{count} 条下载记录",
+            'history_col_date': "日期",
+            'history_col_title': "标题",
+            'history_col_uploader': "上传者",
+            'history_col_site': "网站",
+            'history_col_format': "格式",
+            'history_col_size': "大小",
+            'history_col_speed': "平均速度",
+            'history_col_status': "状态",
 
             # Settings tab sections
             'settings_language': "语言",
@@ -122,7 +206,17 @@ class Translator:
             'settings_about': "关于",
             'settings_show_thumbnail': "显示封面",
             'settings_threads': "下载线程数",
+            'settings_ytdlp_cache': "yt-dlp 缓存:",
+            'settings_process_extraction': "在独立进程中解析:",
+            'settings_size_budget': "最大文件大小:",
+            'settings_bitrate_budget': "最大码率:",
+            'settings_no_limit': "不限制",
+            'settings_staging_dir': "临时文件夹:",
+            'settings_staging_placeholder': "关闭 - 直接写入下载文件夹",
+            'settings_staging_limit': "临时空间上限:",
             'settings_misc': "杂项",
+            'settings_sync': "同步来源",
+            'settings_sync_placeholder': "每行一个频道、播放列表或B站空间链接",
 
             # Language options
             'language_english': "English",
@@ -142,6 +236,7 @@ class Translator:
             'url_label': "资源链接:",
             'url_placeholder': "粘贴YouTube或B站链接到这里...",
             'fetch_btn': "获取信息",
+            'sync_btn': "同步",
             'preview_label': "未加载视频",
             'format_label': "格式:",
             'format_best': "最佳可用",
@@ -149,17 +244,33 @@ class Translator:
             'format_720p': "MP4 720p",
             'format_480p': "MP4 480p",
             'format_mp3': "MP3音频",
+            'format_audio_original': "音频 (原始格式, 不转码)",
             
             # Folder selection
             'folder_btn': "选择文件夹",
             'download_btn': "下载",
+            'pause_btn': "暂停",
+            'resume_btn': "继续",
+            'cancel_btn': "取消",
+            'priority_high': "优先下载",
+            'clip_checkbox': "只下载片段",
+            'clip_start_placeholder': "开始 (如 1:30)",
+            'clip_end_placeholder': "结束 (留空 = 到结尾)",
+            'error_invalid_clip': "片段时间无效: ",
             
             # Status messages
             'status_ready': "就绪",
+            'status_resolving_formats': "正在解析格式...",
             'status_fetching': "正在获取视频信息...",
             'status_downloading': "正在下载...",
             'status_complete': "下载完成!",
             'status_error': "错误: ",
+            'status_queued': "已加入队列",
+            'status_queued_entries': "已将 {count} 个视频加入队列",
+            'status_paused': "已暂停",
+            'status_cancelled': "下载已取消",
+            'status_resuming': "正在继续 {count} 个未完成的下载",
+            'status_sync_complete': "同步完成：已加入 {count} 个新视频",
             
             # Progress stages
             'progress_connecting': "正在通过代理连接...",
@@ -170,8 +281,24 @@ class Translator:
             # Error messages
             'error_no_url': "请输入资源链接",
             'error_fetch_first': "请先获取资源信息",
+            'error_no_entries_selected': "请在列表中至少选择一个视频",
+
+            # Job list
+            'select_all_btn': "全选",
+            'select_none_btn': "全不选",
+            'job_col_title': "标题",
+            'job_col_duration': "时长",
+            'job_col_state': "状态",
+            'job_col_progress': "进度",
+            'job_state_queued': "排队中",
+            'job_state_running': "下载中",
+            'job_state_paused': "已暂停",
+            'job_state_finished': "完成",
+            'job_state_failed': "失败",
+            'job_state_cancelled': "已取消",
             'error_fetch_first': "请先获取视频信息",
             'error_network': "网络错误。请检查代理设置。",
+            'error_no_sync_sources': "请先在设置中添加同步来源",
             'error_deno': "未找到Deno。请安装Deno以解决JS挑战。",
             
             # Settings
@@ -183,6 +310,11 @@ class Translator:
             'settings_proxy_none': "无代理",
             'settings_proxy_socks5': "SOCKS5",
             'settings_proxy_http': "HTTP",
+            'settings_proxy_pool': "代理池:",
+            'settings_proxy_strategy': "分配策略:",
+            'proxy_strategy_round_robin': "轮询",
+            'proxy_strategy_least_loaded': "最少负载",
+            'proxy_strategy_lowest_latency': "最低延迟",
             'settings_save': "保存",
             'settings_cancel': "取消",
             
@@ -0,0 +1,58 @@
+# GUI update dispatcher for Fast-Horse-2026
+# Collects text, progress and style-state changes and applies them once per frame
+
+from PySide6.QtCore import QObject, QTimer
+
+# One frame at ~60 fps
+FRAME_INTERVAL_MS = 16
+
+
+class UiDispatcher(QObject):
+    """Coalesces widget updates into one pass per frame
+
+    Only the last requested value per widget and kind is kept, and a value
+    equal to what the widget already shows is not applied at all. Style
+    changes are dynamic properties matched by selectors in the .qss files
+    (e.g. QLabel#status_label[error="true"]), so switching state re-polishes
+    one widget instead of parsing a new stylesheet.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._pending = {}  # (widget, kind, name) -> value
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(FRAME_INTERVAL_MS)
+        self._timer.timeout.connect(self.flush)
+
+    def set_text(self, widget, text):
+        self._queue(widget, 'text', None, text)
+
+    def set_value(self, widget, value):
+        self._queue(widget, 'value', None, int(value))
+
+    def set_state(self, widget, name, value):
+        """Set a dynamic property used by the stylesheet"""
+        self._queue(widget, 'property', name, value)
+
+    def _queue(self, widget, kind, name, value):
+        self._pending[(widget, kind, name)] = value
+        if not self._timer.isActive():
+            self._timer.start()
+
+    def flush(self):
+        """Apply everything pending now (also called by the frame timer)"""
+        self._timer.stop()
+        pending, self._pending = self._pending, {}
+        for (widget, kind, name), value in pending.items():
+            if kind == 'text':
+                if widget.text() != value:
+                    widget.setText(value)
+            elif kind == 'value':
+                if widget.value() != value:
+                    widget.setValue(value)
+            elif widget.property(name) != value:
+                widget.setProperty(name, value)
+                # Re-evaluate property selectors for this widget only
+                widget.style().unpolish(widget)
+                widget.style().polish(widget)
@@ -0,0 +1,165 @@
+# URL router for Fast-Horse-2026
+# Classifies and normalizes URLs once, and sends them straight to the matching yt-dlp extractor
+
+import re
+import threading
+from collections import namedtuple
+from functools import lru_cache
+from urllib.parse import urlparse
+from yt_dlp.extractor import get_info_extractor
+from .http_client import get_http_client
+
+# Result of routing a URL
+# url: normalized URL, ie_key: yt-dlp extractor key (None = let yt-dlp search),
+# site: 'youtube', 'bilibili' or host, video_id: ID if the URL is a single video
+Route = namedtuple('Route', 'url ie_key site video_id')
+
+_YT_ID = r'(?P<id>[a-zA-Z0-9_-]{11})'
+_YT_HOST = r'(?:https?://)?(?:www\.|m\.|music\.)?'
+_BV_ID = r'(?P<id>BV[a-zA-Z0-9]{10})'
+_AV_ID = r'av(?P<aid>\d+)'
+
+_BILI_PART = re.compile(r'[?&]p=(\d+)')
+_YT_VIDEO_PARAM = re.compile(r'(?:[?&]v=|youtu\.be/)' + _YT_ID)
+
+
+def _bilibili_video(video_id):
+    """URL builder for Bilibili videos that keeps the part number (?p=N)"""
+    def build(match):
+        part = _BILI_PART.search(match.string)
+        url = f"https://www.bilibili.com/video/{video_id(match)}"
+        return f"{url}?p={part.group(1)}" if part else url
+    return build
+
+
+# (pattern, extractor key, site, URL builder) - first match wins
+_ROUTES = [
+    # A video opened from a playlist keeps its list (yt-dlp downloads the playlist)
+    (re.compile(_YT_HOST + r'youtube\.com/watch\?(?:.*&)?list='), 'YoutubeTab', 'youtube', None),
+    (re.compile(r'(?:https?://)?youtu\.be/[^?#]*\?(?:.*&)?list='), 'YoutubeYtBe', 'youtube', None),
+    (re.compile(_YT_HOST + r'youtube\.com/(?:watch\?(?:.*&)?v=|embed/|shorts/|live/|v/)' + _YT_ID),
+     'Youtube', 'youtube', lambda m: f"https://www.youtube.com/watch?v={m.group('id')}"),
+    (re.compile(r'(?:https?://)?youtu\.be/' + _YT_ID),
+     'Youtube', 'youtube', lambda m: f"https://www.youtube.com/watch?v={m.group('id')}"),
+    (re.compile(_YT_HOST + r'youtube\.com/playlist\?(?:.*&)?list=(?P<list>[a-zA-Z0-9_-]+)'),
+     'YoutubeTab', 'youtube', lambda m: f"https://www.youtube.com/playlist?list={m.group('list')}"),
+    (re.compile(_YT_HOST + r'youtube\.com/(?:@[^/?#]+|channel/[^/?#]+|c/[^/?#]+|user/[^/?#]+)'),
+     'YoutubeTab', 'youtube', None),
+    (re.compile(r'(?:https?://)?(?:www\.|m\.)?bilibili\.com/video/' + _BV_ID),
+     'BiliBili', 'bilibili', _bilibili_video(lambda m: m.group('id'))),
+    (re.compile(r'(?:https?://)?(?:www\.|m\.)?bilibili\.com/video/' + _AV_ID, re.IGNORECASE),
+     'BiliBili', 'bilibili', _bilibili_video(lambda m: f"av{m.group('aid')}")),
+    # Only the bare space page or its upload list; favlists, collections and audio stay unrouted
+    (re.compile(r'(?:https?://)?space\.bilibili\.com/(?P<mid>\d+)(?:/video)?/?(?:[?#]|$)'),
+     'BilibiliSpaceVideo', 'bilibili', lambda m: f"https://space.bilibili.com/{m.group('mid')}/video"),
+    # b23.tv short links that already carry the video ID need no redirect
+    (re.compile(r'(?:https?://)?b23\.tv/' + _BV_ID),
+     'BiliBili', 'bilibili', _bilibili_video(lambda m: m.group('id'))),
+    (re.compile(r'(?:https?://)?b23\.tv/' + _AV_ID, re.IGNORECASE),
+     'BiliBili', 'bilibili', _bilibili_video(lambda m: f"av{m.group('aid')}")),
+    # Bare IDs pasted without a URL
+    (re.compile(r'^' + _BV_ID + r'$'),
+     'BiliBili', 'bilibili', _bilibili_video(lambda m: m.group('id'))),
+    (re.compile(r'^' + _AV_ID + r'$', re.IGNORECASE),
+     'BiliBili', 'bilibili', _bilibili_video(lambda m: f"av{m.group('aid')}")),
+]
+
+# Hosts recognized when no route matches (e.g. b23.tv links that need a redirect)
+_BILIBILI_HOST = re.compile(r'(?:^|\.)(?:bilibili\.com|b23\.tv|biligame\.com|biligame\.net|bilibili\.tv)$')
+_YOUTUBE_HOST = re.compile(r'(?:^|\.)(?:youtube\.com|youtu\.be)$')
+_SHORT_LINK = re.compile(r'^(?:https?://)?b23\.tv/[^/?#]+', re.IGNORECASE)
+
+
+@lru_cache(maxsize=None)
+def _has_extractor(ie_key):
+    """Whether the installed yt-dlp has this extractor (keys change between versions)"""
+    try:
+        get_info_extractor(ie_key)
+        return True
+    except Exception:
+        return False
+
+
+@lru_cache(maxsize=16384)
+def route_url(url):
+    """Classify and normalize a URL without any network access"""
+    url = (url or '').strip()
+    for pattern, ie_key, site, build in _ROUTES:
+        match = pattern.match(url)
+        if not match:
+            continue
+        normalized = build(match) if build else url
+        if not normalized.startswith(('http://', 'https://')):
+            normalized = 'https://' + normalized
+        if not _has_extractor(ie_key):
+            ie_key = None
+        video_id = match.groupdict().get('id')
+        if video_id is None and match.groupdict().get('aid'):
+            video_id = f"av{match.group('aid')}"
+        if video_id is None and site == 'youtube':
+            # e.g. watch?v=...&list=... - the video the playlist was opened at
+            video_match = _YT_VIDEO_PARAM.search(url)
+            video_id = video_match.group('id') if video_match else None
+        return Route(normalized, ie_key, site, video_id)
+
+    host = (urlparse(url if '://' in url else 'https://' + url).hostname or '').lower()
+    if _YOUTUBE_HOST.search(host):
+        site = 'youtube'
+    elif _BILIBILI_HOST.search(host):
+        site = 'bilibili'
+    else:
+        site = host[4:] if host.startswith('www.') else host
+    return Route(url, None, site, None)
+
+
+_short_links = {}
+_short_links_lock = threading.Lock()
+
+
+def resolve_short_link(url, proxy_url='', timeout=10):
+    """Follow a b23.tv redirect once and cache the target URL"""
+    with _short_links_lock:
+        if url in _short_links:
+            return _short_links[url]
+    try:
+        with get_http_client().request(url if '://' in url else 'https://' + url, method='HEAD',
+                                       timeout=timeout, proxy_url=proxy_url) as response:
+            target = response.url
+    except Exception as e:
+        print(f"DEBUG: Short link {url} not resolved: {e}", flush=True)
+        return url
+    with _short_links_lock:
+        _short_links[url] = target
+    return target
+
+
+def resolve_route(url, proxy_url=''):
+    """Route a URL, resolving b23.tv short links that need a redirect first"""
+    route = route_url(url)
+    if route.ie_key is None and _SHORT_LINK.match(route.url):
+        target = resolve_short_link(route.url, proxy_url)
+        if target != route.url:
+            return route_url(target)
+    return route
+
+
+def extract_routed(ydl, url, download=False, **kwargs):
+    """ydl.extract_info() that skips yt-dlp's scan over its extractor list"""
+    route = route_url(url)
+    return ydl.extract_info(route.url, download=download, ie_key=route.ie_key, **kwargs)
+
+
+def is_youtube_url(url):
+    """Check if URL is from YouTube"""
+    return route_url(url).site == 'youtube'
+
+
+def is_bilibili_url(url):
+    """检测URL是否为B站URL"""
+    return route_url(url).site == 'bilibili'
+
+
+def get_youtube_video_id(url):
+    """Extract video ID from YouTube URL"""
+    route = route_url(url)
+    return route.video_id if route.site == 'youtube' else None
@@ -0,0 +1,204 @@
+# Pool of reusable YoutubeDL instances for Fast-Horse-2026
+# Keeps extractors, cookies and HTTP connections warm between jobs
+
+import threading
+import time
+from contextlib import contextmanager
+import yt_dlp
+from yt_dlp.postprocessor import get_postprocessor
+from yt_dlp.utils import POSTPROCESS_WHEN
+from .ytdlp_cache import install_shared_cache
+
+# Options that are fixed for the lifetime of an instance: they set up the
+# cookie jar, the HTTP handler stack, headers and the cache. Instances are
+# pooled by these; everything else is applied per checkout.
+SESSION_OPTIONS = (
+    'proxy', 'cookiesfrombrowser', 'cookiefile', 'user_agent', 'referer',
+    'http_headers', 'socket_timeout', 'cachedir', 'quiet', 'no_warnings',
+)
+
+# Idle instances kept per session key, and how long they stay warm
+MAX_IDLE_PER_KEY = 2
+MAX_IDLE_SECONDS = 300
+
+
+# YoutubeDL internals apply_job_options() resets; if a yt-dlp release renames
+# any of them, instances are built fresh per job instead of reused
+REUSE_ATTRIBUTES = (
+    '_parse_outtmpl', 'build_format_selector', 'format_selector', '_progress_hooks', '_post_hooks',
+    '_postprocessor_hooks', '_pps', 'archive', '_download_retcode', '_num_downloads', '_num_videos',
+    '_playlist_level', '_playlist_urls',
+)
+
+
+def supports_reuse(ydl):
+    """Whether this yt-dlp version has the internals apply_job_options() relies on"""
+    return all(hasattr(ydl, name) for name in REUSE_ATTRIBUTES)
+
+
+def session_key(opts):
+    """Key for the session part of a yt-dlp option dict"""
+    return repr(sorted((name, opts[name]) for name in SESSION_OPTIONS if name in opts))
+
+
+def apply_job_options(ydl, base_params, opts):
+    """Reset a pooled instance to its session params plus this job's options
+
+    YoutubeDL derives some state from its params in __init__ (format
+    selector, hooks, postprocessors, archive, output template); those are
+    rebuilt here the same way.
+    """
+    params = dict(base_params)
+    params['outtmpl'] = dict(base_params.get('outtmpl') or {})
+    params.update((k, v) for k, v in opts.items() if k not in SESSION_OPTIONS)
+    ydl.params = params
+    ydl._parse_outtmpl()
+
+    fmt = params.get('format')
+    ydl.format_selector = (fmt if fmt in (None, '-') or callable(fmt)
+                           else ydl.build_format_selector(fmt))
+
+    ydl._progress_hooks = []
+    ydl._post_hooks = []
+    ydl._postprocessor_hooks = []
+    for ph in params.get('progress_hooks', []):
+        ydl.add_progress_hook(ph)
+    for ph in params.get('post_hooks', []):
+        ydl.add_post_hook(ph)
+    for ph in params.get('postprocessor_hooks', []):
+        ydl.add_postprocessor_hook(ph)
+
+    ydl._pps = {when: [] for when in POSTPROCESS_WHEN}
+    for pp_def_raw in params.get('postprocessors', []):
+        pp_def = dict(pp_def_raw)
+        when = pp_def.pop('when', 'post_process')
+        ydl.add_post_processor(get_postprocessor(pp_def.pop('key'))(ydl, **pp_def), when=when)
+
+    # The app only passes archive objects, never archive file paths
+    # (an empty DownloadArchive is falsy, so test for None)
+    archive = params.get('download_archive')
+    ydl.archive = archive if archive is not None else set()
+
+    ydl._download_retcode = 0
+    ydl._num_downloads = 0
+    ydl._num_videos = 0
+    ydl._playlist_level = 0
+    ydl._playlist_urls = set()
+
+
+class _PooledYdl:
+    """An idle instance with the params it was created with"""
+
+    def __init__(self, ydl):
+        self.ydl = ydl
+        self.base_params = dict(ydl.params)
+        self.last_used = time.monotonic()
+
+
+class YdlPool:
+    """Pre-initialized YoutubeDL instances, keyed by their session options
+
+    checkout() hands out an instance for exclusive use and returns it to
+    the pool afterwards. Creating a YoutubeDL sets up extractors, the
+    browser cookie jar and the HTTP handler stack; reusing one also keeps
+    its keep-alive connections open for the next job on the same proxy.
+    """
+
+    def __init__(self, max_idle_per_key=MAX_IDLE_PER_KEY, max_idle_seconds=MAX_IDLE_SECONDS):
+        self.max_idle_per_key = max_idle_per_key
+        self.max_idle_seconds = max_idle_seconds
+        self._lock = threading.Lock()
+        self._idle = {}  # session key -> list of _PooledYdl
+        self.created = 0
+        self.reused = 0
+        # Checked on the first instance created
+        self.reuse_supported = None
+
+    def _take(self, key):
+        with self._lock:
+            self._evict_expired()
+            entries = self._idle.get(key)
+            if entries:
+                self.reused += 1
+                return entries.pop()
+        return None
+
+    def _put(self, key, entry):
+        entry.last_used = time.monotonic()
+        with self._lock:
+            entries = self._idle.setdefault(key, [])
+            if len(entries) < self.max_idle_per_key:
+                entries.append(entry)
+                return
+        entry.ydl.close()
+
+    def _evict_expired(self):
+        """Close instances idle for too long (called with the lock held)"""
+        now = time.monotonic()
+        for key, entries in list(self._idle.items()):
+            for entry in [e for e in entries if now - e.last_used > self.max_idle_seconds]:
+                entries.remove(entry)
+                entry.ydl.close()
+            if not entries:
+                del self._idle[key]
+
+    @contextmanager
+    def checkout(self, opts):
+        """Context manager yielding a YoutubeDL configured with opts"""
+        key = session_key(opts)
+        entry = self._take(key) if self.reuse_supported is not False else None
+        if entry is None:
+            session = {name: opts[name] for name in SESSION_OPTIONS if name in opts}
+            ydl = yt_dlp.YoutubeDL(session if self.reuse_supported is not False else opts)
+            install_shared_cache(ydl)
+            entry = _PooledYdl(ydl)
+            with self._lock:
+                self.created += 1
+            if self.reuse_supported is None:
+                self.reuse_supported = supports_reuse(ydl)
+                if not self.reuse_supported:
+                    print("DEBUG: YdlPool - Unsupported yt-dlp internals, creating a fresh instance per job",
+                          flush=True)
+                    ydl.close()
+                    entry = _PooledYdl(yt_dlp.YoutubeDL(opts))
+                    install_shared_cache(entry.ydl)
+        if self.reuse_supported:
+            apply_job_options(entry.ydl, entry.base_params, opts)
+
+        reusable = bool(self.reuse_supported)
+        try:
+            yield entry.ydl
+        except yt_dlp.utils.YoutubeDLError:
+            # Extraction/download errors (incl. cancellation) leave the instance usable
+            raise
+        except BaseException:
+            # Anything else may have left it in a bad state - start fresh next time
+            reusable = False
+            raise
+        finally:
+            entry.ydl.save_cookies()
+            if reusable:
+                self._put(key, entry)
+            else:
+                entry.ydl.close()
+
+    def clear(self):
+        """Close all idle instances (e.g. after proxy settings change)"""
+        with self._lock:
+            entries = [e for group in self._idle.values() for e in group]
+            self._idle.clear()
+        for entry in entries:
+            entry.ydl.close()
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_ydl_pool():
+    """Return the shared YdlPool"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = YdlPool()
+        return _pool
@@ -0,0 +1,195 @@
+# Shared yt-dlp cache for Fast-Horse-2026
+# One managed cache directory for player JS, signature and n-challenge results
+
+import json
+import os
+import threading
+from urllib.parse import unquote
+from yt_dlp.cache import Cache
+from yt_dlp.version import __version__ as ytdlp_version
+from .paths import get_cache_dir
+
+# Disk budget for the cache directory; oldest files are pruned first
+MAX_CACHE_BYTES = 64 * 1024 * 1024
+# Prune again after this many stores
+PRUNE_EVERY_STORES = 20
+# Sections worth keeping in memory: YouTube player data and challenge solver scripts
+PREWARM_SECTION_PREFIXES = ('youtube-', 'challenge-solver')
+# Memory budget for pre-warmed entries
+MAX_MEMORY_BYTES = 32 * 1024 * 1024
+
+_MISSING = object()
+
+
+class CacheStats:
+    """Hit/miss counters shared by every pooled YoutubeDL"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.sections = {}  # section -> [hits, misses, stores]
+
+    def count(self, section, index):
+        with self._lock:
+            self.sections.setdefault(section, [0, 0, 0])[index] += 1
+
+    def totals(self):
+        with self._lock:
+            counts = list(self.sections.values())
+        return {
+            'hits': sum(c[0] for c in counts),
+            'misses': sum(c[1] for c in counts),
+            'stores': sum(c[2] for c in counts),
+        }
+
+
+class _MemoryLayer:
+    """Size-bounded in-memory copy of cache entries, shared by all jobs"""
+
+    def __init__(self, max_bytes=MAX_MEMORY_BYTES):
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._entries = {}  # (section, key) -> (raw json dict, size)
+        self._size = 0
+
+    def get(self, section, key):
+        with self._lock:
+            entry = self._entries.get((section, key))
+            return entry[0] if entry else None
+
+    def put(self, section, key, raw, size):
+        if not section.startswith(PREWARM_SECTION_PREFIXES) or size > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop((section, key), None)
+            if old:
+                self._size -= old[1]
+            # Dicts keep insertion order - drop the oldest entries first
+            while self._entries and self._size + size > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._size -= self._entries.pop(oldest)[1]
+            self._entries[(section, key)] = (raw, size)
+            self._size += size
+
+
+stats = CacheStats()
+_memory = _MemoryLayer()
+_stores = 0
+_stores_lock = threading.Lock()
+
+
+class SharedCache(Cache):
+    """yt-dlp Cache with a shared memory layer and hit/miss counters"""
+
+    def load(self, section, key, dtype='json', default=None, *, min_ver=None):
+        if not self.enabled:
+            return default
+        raw = _memory.get(section, key)
+        if raw is not None:
+            data = self._validate(raw, min_ver)
+            if data is not None:
+                stats.count(section, 0)
+                return data
+        data = super().load(section, key, dtype, default=_MISSING, min_ver=min_ver)
+        if data is _MISSING or data is None:
+            stats.count(section, 1)
+            return default
+        stats.count(section, 0)
+        return data
+
+    def store(self, section, key, data, dtype='json'):
+        super().store(section, key, data, dtype)
+        if not self.enabled:
+            return
+        stats.count(section, 2)
+        try:
+            size = os.path.getsize(self._get_cache_fn(section, key, dtype))
+        except OSError:
+            size = 0
+        _memory.put(section, key, {'yt-dlp_version': ytdlp_version, 'data': data}, size)
+
+        global _stores
+        with _stores_lock:
+            _stores += 1
+            prune = _stores % PRUNE_EVERY_STORES == 0
+        if prune:
+            prune_cache()
+
+
+def get_ytdlp_cache_dir():
+    """The cache directory shared by all jobs and app processes"""
+    return get_cache_dir('yt-dlp')
+
+
+def install_shared_cache(ydl):
+    """Point a YoutubeDL at the shared cache directory and counters"""
+    ydl.params['cachedir'] = get_ytdlp_cache_dir()
+    ydl.cache = SharedCache(ydl)
+
+
+def _cache_files(root):
+    for dirpath, _, filenames in os.walk(root):
+        for filename in filenames:
+            path = os.path.join(dirpath, filename)
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            yield path, st.st_size, st.st_mtime
+
+
+def cache_size():
+    """Total bytes used by the cache directory"""
+    return sum(size for _, size, _ in _cache_files(get_ytdlp_cache_dir()))
+
+
+def prune_cache(max_bytes=MAX_CACHE_BYTES):
+    """Delete the least recently written files until the cache fits max_bytes"""
+    files = sorted(_cache_files(get_ytdlp_cache_dir()), key=lambda f: f[2])
+    total = sum(size for _, size, _ in files)
+    for path, size, _ in files:
+        if total <= max_bytes:
+            break
+        try:
+            os.remove(path)
+            total -= size
+        except OSError:
+            continue
+    return total
+
+
+def prewarm_cache():
+    """Prune the cache and load player/challenge entries into memory
+
+    Run once at startup (on a background thread) so the first YouTube
+    fetch finds solved signatures and solver scripts without disk reads.
+    """
+    root = get_ytdlp_cache_dir()
+    prune_cache()
+    loaded = 0
+    for section in sorted(os.listdir(root)):
+        section_dir = os.path.join(root, section)
+        if not section.startswith(PREWARM_SECTION_PREFIXES) or not os.path.isdir(section_dir):
+            continue
+        # Oldest first: when the memory budget runs out the oldest are dropped,
+        # so it goes to current player versions
+        files = sorted(_cache_files(section_dir), key=lambda f: f[2])
+        for path, size, _ in files:
+            if not path.endswith('.json'):
+                continue
+            key = os.path.basename(path)[:-len('.json')].replace(',', '%')
+            try:
+                with open(path, encoding='utf-8') as f:
+                    raw = json.load(f)
+            except (OSError, ValueError):
+                continue
+            _memory.put(section, unquote(key), raw, size)
+            loaded += 1
+    print(f"DEBUG: yt-dlp cache pre-warmed with {loaded} entries", flush=True)
+    return loaded
+
+
+def cache_stats():
+    """Hit/miss/store counters plus the size of the cache on disk"""
+    result = stats.totals()
+    result['bytes'] = cache_size()
+    return result
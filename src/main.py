@@ -1,18 +1,44 @@
 import sys
 import os
+import multiprocessing
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 from PySide6.QtWidgets import QApplication
-from app.main_window import MainWindow
+from app.single_instance import SingleInstanceServer, forward_to_running_instance, urls_from_args
 
 def main():
+    # A running instance takes the URLs (if any) and this launch exits
+    # before loading the window, yt-dlp or the stylesheets
+    urls = urls_from_args(sys.argv[1:])
+    if forward_to_running_instance(urls):
+        sys.exit(0)
+
     app = QApplication(sys.argv)
     app.setApplicationName("Fast-Horse-2026")
     app.setStyle("Fusion")  # Use Fusion style for consistent look
-    
+
+    # Listen before the slow window setup; later launches queue up until the event loop runs
+    server = SingleInstanceServer(app)
+    if not server.listen() and forward_to_running_instance(urls):
+        # Lost a simultaneous start to another launch - hand over to it
+        sys.exit(0)
+
+    from app.main_window import MainWindow
     window = MainWindow()
+    server.urls_received.connect(window.queue_forwarded_urls)
     window.show()
-    sys.exit(app.exec())
+    if urls:
+        window.queue_forwarded_urls(urls)
+    code = app.exec()
+    if window.threads_stuck:
+        # A download thread is blocked in a call that cannot be interrupted -
+        # exit without interpreter/Qt teardown rather than kill the thread.
+        # The journal already marks its job for resuming next session.
+        sys.stdout.flush()
+        os._exit(code)
+    sys.exit(code)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    # Extraction worker processes re-run this script in frozen builds
+    multiprocessing.freeze_support()
+    main()